@@ -5,8 +5,6 @@ from lib.patterns import Base, Singleton
 from alpaca.trading.models import Asset
 from alpaca.trading.requests import GetAssetsRequest
 
-from tqdm import tqdm
-
 class ETFs(Base, metaclass=Singleton):
 
     
@@ -23,13 +21,8 @@ class ETFs(Base, metaclass=Singleton):
         
     def getAllCandidates(self) -> list[str]:
         tradableStocksSymbols = [asset.symbol for asset in self.tradingClient.allTradableStocks]
-        res = []
-        for symbol in tqdm(tradableStocksSymbols, desc="filter for viable stocks"):
-            try:
-                if self.dataClient.getMarketCap(symbol) > 1_000_000:
-                    res.append(symbol)
-            except:
-                continue
+        marketCaps = self.dataClient.getBatchMarketCap(tradableStocksSymbols)
+        res = list(marketCaps[marketCaps > 1_000_000].index)
                 
         return res 
         
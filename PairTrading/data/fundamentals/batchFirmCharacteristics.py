@@ -0,0 +1,918 @@
+from PairTrading.data.fundamentals.statements import StatementMatrix, StatementPanel
+from PairTrading.data.fundamentals.batchutil import *
+from PairTrading.data.fundamentals.registry import CharacteristicRegistry
+from PairTrading.data.fundamentals.regression import getWeeklyReturns, getMarketReturns, getIdiosyncraticVolatility
+from lib.dataEngine.common import BarCollection
+
+import pandas as pd
+import numpy as np
+
+firmCharRegistry:CharacteristicRegistry = CharacteristicRegistry.create()
+
+
+def _div(numerator, denominator:np.ndarray) -> np.ndarray:
+    # division by zero gives NaN instead of failing the whole characteristic
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator != 0, numerator / np.where(denominator != 0, denominator, 1), np.nan)
+
+def _indicator(condition:np.ndarray, *operands:np.ndarray) -> np.ndarray:
+    # 1/0 indicator that is NaN wherever one of the compared values is missing
+    isValid:np.ndarray = np.logical_and.reduce([~np.isnan(operand) for operand in operands])
+    return np.where(isValid, condition.astype(float), np.nan)
+
+def _toFloat(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class BatchFirmCharGetter:
+    """
+        computes the firm characteristics for a whole universe at once. the quarterly statements are
+        stacked into (stocks x quarters x fields) panels and every characteristic is a numpy expression
+        over the stock axis, stocks a characteristic cannot be computed for get NaN. the characteristics
+        are evaluated through firmCharRegistry, which computes the shared intermediates once
+    """
+
+    INCOME_FIELDS:list[str] = [
+        "totalRevenue", "costOfRevenue", "researchDevelopment", "taxProvision", "incomeBeforeTax", "grossProfit",
+        "ebit", "nonOperatingIncomeNetOther", "sellingGeneralAdministrative", "interestExpense", "netIncome"
+    ]
+    BALANCE_FIELDS:list[str] = [
+        "totalAssets", "totalLiab", "cash", "longTermDebt", "commonStockSharesOutstanding", "inventory",
+        "totalCurrentAssets", "totalCurrentLiabilities", "propertyPlantEquipment", "propertyPlantAndEquipmentNet",
+        "shortTermDebt", "commonStock", "netReceivables", "capitalLeaseObligations"
+    ]
+    CASH_FIELDS:list[str] = [
+        "totalCashFromOperatingActivities", "dividendsPaid", "netIncome", "depreciation", "capitalExpenditures"
+    ]
+
+    def __init__(self, symbols:list[str], rawFiles:list[dict]):
+        self.symbols:list[str] = symbols
+        incomeStatements:list[StatementMatrix] = [
+            StatementMatrix.create(list(rawFile["Financials"]["Income_Statement"]["quarterly"].values()), self.INCOME_FIELDS) for rawFile in rawFiles]
+        balanceSheets:list[StatementMatrix] = [
+            StatementMatrix.create(list(rawFile["Financials"]["Balance_Sheet"]["quarterly"].values()), self.BALANCE_FIELDS) for rawFile in rawFiles]
+        cashFlows:list[StatementMatrix] = [
+            StatementMatrix.create(list(rawFile["Financials"]["Cash_Flow"]["quarterly"].values()), self.CASH_FIELDS) for rawFile in rawFiles]
+
+        # all panels share one quarter axis so that pairs across statements line up
+        numQuarters:int = max((len(statement) for statement in incomeStatements + balanceSheets + cashFlows), default=0)
+        self.incomeStatement:StatementPanel = StatementPanel.create(incomeStatements, self.INCOME_FIELDS, numQuarters)
+        self.balanceSheet:StatementPanel = StatementPanel.create(balanceSheets, self.BALANCE_FIELDS, numQuarters)
+        self.cashFlow:StatementPanel = StatementPanel.create(cashFlows, self.CASH_FIELDS, numQuarters)
+
+        # fundamental summary
+        self.marketCap:np.ndarray = np.array([_toFloat(rawFile["Highlights"].get("MarketCapitalization")) for rawFile in rawFiles])
+        self.earningsShare:np.ndarray = np.array([_toFloat(rawFile["Highlights"].get("EarningsShare")) for rawFile in rawFiles])
+        self.returnOnAssets:np.ndarray = np.array([_toFloat(rawFile["Highlights"].get("ReturnOnAssetsTTM")) for rawFile in rawFiles])
+        self.returnOnEquity:np.ndarray = np.array([_toFloat(rawFile["Highlights"].get("ReturnOnEquityTTM")) for rawFile in rawFiles])
+        self.beta:np.ndarray = np.array([_toFloat(rawFile["Technicals"].get("Beta")) for rawFile in rawFiles])
+        self.sharesOutstanding:np.ndarray = np.array([_toFloat(rawFile["SharesStats"].get("SharesOutstanding")) for rawFile in rawFiles])
+        self.subIndustry:list[str] = [rawFile.get("General", {}).get("GicSubIndustry") for rawFile in rawFiles]
+
+        # technical data as right-aligned (stocks x bars) matrices padded with NaN
+        self.monthlyClose:np.ndarray = None
+        self.monthlyVolume:np.ndarray = None
+        # weekly returns as a (week x stock) matrix aligned on the bar timestamps
+        self.weeklyReturns:np.ndarray = None
+        self.marketReturns:np.ndarray = None
+        self.dailyOpen:np.ndarray = None
+        self.dailyClose:np.ndarray = None
+        self.dailyVolume:np.ndarray = None
+        self.dailyVwap:np.ndarray = None
+        self.setBars({})
+
+    @classmethod
+    def create(cls, rawFiles:dict[str, dict]):
+        return cls(list(rawFiles.keys()), list(rawFiles.values()))
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    @staticmethod
+    def _stackBars(frames:list[pd.DataFrame], column:str) -> np.ndarray:
+        length:int = max((len(frame) for frame in frames), default=0)
+        res:np.ndarray = np.full((len(frames), length), np.nan)
+        for k, frame in enumerate(frames):
+            if len(frame):
+                res[k, length-len(frame):] = frame[column].to_numpy(dtype=float)
+        return res
+
+    def setBars(self, bars:dict[str, BarCollection], marketReturns:pd.Series=None) -> None:
+        """
+            marketReturns is the equal weighted weekly return of the universe, it is computed from
+            the given bars when not passed (pass it when this getter only sees a shard of the universe)
+        """
+        empty:pd.DataFrame = pd.DataFrame(columns=["open", "close", "volume", "vwap"])
+        collections:list[BarCollection] = [bars.get(symbol) for symbol in self.symbols]
+        monthly:list[pd.DataFrame] = [empty if collection is None else collection.monthly for collection in collections]
+        weekly:list[pd.DataFrame] = [empty if collection is None else collection.weekly for collection in collections]
+        daily:list[pd.DataFrame] = [empty if collection is None else collection.daily for collection in collections]
+
+        self.monthlyClose = self._stackBars(monthly, "close")
+        self.monthlyVolume = self._stackBars(monthly, "volume")
+        weeklyReturns:pd.DataFrame = getWeeklyReturns({symbol: bars[symbol] for symbol in self.symbols if symbol in bars})
+        if marketReturns is None:
+            marketReturns = getMarketReturns(weeklyReturns)
+        weeklyReturns = weeklyReturns.reindex(columns=self.symbols)
+        self.weeklyReturns = weeklyReturns.to_numpy(dtype=float)
+        self.marketReturns = marketReturns.reindex(weeklyReturns.index).to_numpy(dtype=float)
+        self.dailyOpen = self._stackBars(daily, "open")
+        self.dailyClose = self._stackBars(daily, "close")
+        self.dailyVolume = self._stackBars(daily, "volume")
+        self.dailyVwap = self._stackBars(daily, "vwap")
+
+    def _monthlyCloseAt(self, position:int) -> np.ndarray:
+        # close of the position-th bar from the end (iloc[-position]), NaN when the history is shorter
+        if self.monthlyClose.shape[1] < position:
+            return np.full(len(self), np.nan)
+        return self.monthlyClose[:, -position]
+
+    def _prevRangeSum(self, statement:StatementPanel, featureName:str, iCurrRange:np.ndarray) -> np.ndarray:
+        # trailing sum of the 4 valid quarters after the given ones
+        iPrevRange:np.ndarray = getNonNullIndexRange(arr=statement, featureName=featureName, initIndex=offsetIndex(iCurrRange[:, -1], 1))
+        return statement.sum(featureName, iPrevRange)
+
+    def _getSaleInv(self, initIndex=0) -> np.ndarray:
+        iCurrRange:np.ndarray = getNonNullIndexRangePair(self.incomeStatement, self.balanceSheet, "totalRevenue", "inventory", initIndex=initIndex)
+        return _div(self.incomeStatement.sum("totalRevenue", iCurrRange), self.balanceSheet.sum("inventory", iCurrRange))
+
+    # intermediate quantities shared by several characteristics
+
+    @firmCharRegistry.intermediate("avgTotalAssets")
+    def _getAvgTotalAssets(self) -> np.ndarray:
+        iRange:np.ndarray = getNonNullIndexRange(arr=self.balanceSheet, featureName="totalAssets")
+        return self.balanceSheet.sum("totalAssets", iRange) / iRange.shape[1]
+
+    @firmCharRegistry.intermediate("operatingCashFlow")
+    def _getOperatingCashFlow(self) -> np.ndarray:
+        iCash:np.ndarray = getFirstNonNullIndex(self.cashFlow, "totalCashFromOperatingActivities")
+        return self.cashFlow.take("totalCashFromOperatingActivities", iCash)
+
+    @firmCharRegistry.intermediate("bookIndex")
+    def _getBookIndex(self) -> np.ndarray:
+        return getFirstNonNullIndexPair(self.balanceSheet, self.balanceSheet, "totalAssets", "totalLiab")
+
+    @firmCharRegistry.intermediate("revenueRange")
+    def _getRevenueRange(self) -> np.ndarray:
+        return getNonNullIndexRange(self.incomeStatement, "totalRevenue")
+
+    @firmCharRegistry.intermediate("trailingRevenue", dependsOn=("revenueRange",))
+    def _getTrailingRevenue(self, revenueRange:np.ndarray) -> np.ndarray:
+        return self.incomeStatement.sum("totalRevenue", revenueRange)
+
+    @firmCharRegistry.intermediate("prevTrailingRevenue", dependsOn=("revenueRange",))
+    def _getPrevTrailingRevenue(self, revenueRange:np.ndarray) -> np.ndarray:
+        return self._prevRangeSum(self.incomeStatement, "totalRevenue", revenueRange)
+
+    @firmCharRegistry.intermediate("dividendRange")
+    def _getDividendRange(self) -> np.ndarray:
+        return getNonNullIndexRange(self.cashFlow, "dividendsPaid")
+
+    @firmCharRegistry.intermediate("trailingDividends", dependsOn=("dividendRange",))
+    def _getTrailingDividends(self, dividendRange:np.ndarray) -> np.ndarray:
+        return self.cashFlow.sum("dividendsPaid", dividendRange)
+
+    @firmCharRegistry.intermediate("prevTrailingDividends", dependsOn=("dividendRange",))
+    def _getPrevTrailingDividends(self, dividendRange:np.ndarray) -> np.ndarray:
+        return self._prevRangeSum(self.cashFlow, "dividendsPaid", dividendRange)
+
+    @firmCharRegistry.intermediate("prevCurrentRatio")
+    def _getPrevCurrentRatio(self) -> np.ndarray:
+        iPrev:np.ndarray = getFirstNonNullIndexPair(
+            self.balanceSheet, self.balanceSheet, "totalCurrentAssets", "totalCurrentLiabilities", initIndex=4)
+        return _div(self.balanceSheet.take("totalCurrentAssets", iPrev), self.balanceSheet.take("totalCurrentLiabilities", iPrev))
+
+    @firmCharRegistry.intermediate("deprIndex")
+    def _getDeprIndex(self) -> np.ndarray:
+        return getFirstNonNullIndexPair(self.cashFlow, self.balanceSheet, "depreciation", "propertyPlantEquipment")
+
+    @firmCharRegistry.intermediate("prevDepr", dependsOn=("deprIndex",))
+    def _getPrevDepr(self, deprIndex:np.ndarray) -> np.ndarray:
+        iPrev:np.ndarray = getFirstNonNullIndexPair(
+            self.cashFlow, self.balanceSheet, "depreciation", "propertyPlantEquipment", initIndex=offsetIndex(deprIndex, 4))
+        return _div(self.cashFlow.take("depreciation", iPrev), self.balanceSheet.take("propertyPlantEquipment", iPrev))
+
+    @firmCharRegistry.intermediate("prevSaleInv")
+    def _getPrevSaleInv(self) -> np.ndarray:
+        return self._getSaleInv(initIndex=4)
+
+    @firmCharRegistry.intermediate("dailyReturn")
+    def _getDailyReturn(self) -> np.ndarray:
+        return _div(self.dailyClose - self.dailyOpen, self.dailyOpen)
+
+    def _rangePairChange(self, arr1, arr2:StatementPanel, feature1Name, feature2Name:str) -> tuple:
+        iCurrRange:np.ndarray = getNonNullIndexRangePair(arr1=arr1, arr2=arr2, feature1Name=feature1Name, feature2Name=feature2Name)
+        iPrevRange:np.ndarray = getNonNullIndexRangePair(
+            arr1=arr1, arr2=arr2, feature1Name=feature1Name, feature2Name=feature2Name, initIndex=offsetIndex(iCurrRange[:, -1], 1))
+        return (arr1.sum(feature1Name, iCurrRange), arr1.sum(feature1Name, iPrevRange),
+                arr2.sum(feature2Name, iCurrRange), arr2.sum(feature2Name, iPrevRange))
+
+    @firmCharRegistry.feature()
+    def getBeta(self) -> np.ndarray:
+        """
+            beta -- Beta:
+            Estimated market beta from weekly returns and equal weighted market returns for 3 years
+            ending month t-1 with at least 52 weeks of returns.
+        """
+        return self.beta
+
+    @firmCharRegistry.feature(dependsOn=("bookIndex",))
+    def getBm(self, bookIndex:np.ndarray) -> np.ndarray:
+        """
+            bm -- Book-to-market:
+            Book value of equity (ceq) divided by end of fiscal-year-end market capitalization.
+        """
+        bookValue:np.ndarray = self.balanceSheet.take("totalAssets", bookIndex) - self.balanceSheet.take("totalLiab", bookIndex)
+        return _div(bookValue, self.marketCap)
+
+    @firmCharRegistry.feature(dependsOn=("avgTotalAssets",))
+    def getCash(self, avgTotalAssets:np.ndarray) -> np.ndarray:
+        """
+            cash -- Cash holdings:
+            Cash and cash equivalents divided by average total assets.
+        """
+        i:np.ndarray = getFirstNonNullIndex(self.balanceSheet, "cash")
+        return _div(self.balanceSheet.take("cash", i), avgTotalAssets)
+
+    @firmCharRegistry.feature(dependsOn=("avgTotalAssets",))
+    def getCashDebt(self, avgTotalAssets:np.ndarray) -> np.ndarray:
+        """
+            cashdebt -- Cash flow to debt:
+            Earnings before depreciation and extraordinary items (ib+dp) divided by avg. total liabilities (lt).
+        """
+        return _div(self.sharesOutstanding * self.earningsShare, avgTotalAssets)
+
+    @firmCharRegistry.feature()
+    def getCashPr(self) -> np.ndarray:
+        """
+            cashpr -- Cash productivity:
+            Fiscal year end market capitalization plus long term debt (dltt) minus total assets (at) divided by cash and equivalents (che).
+        """
+        iDebt:np.ndarray = getFirstNonNullIndexPair(self.balanceSheet, self.balanceSheet, "longTermDebt", "totalAssets")
+        iCash:np.ndarray = getFirstNonNullIndex(self.balanceSheet, "cash")
+        longTermDebt:np.ndarray = self.balanceSheet.take("longTermDebt", iDebt)
+        totalAsset:np.ndarray = self.balanceSheet.take("totalAssets", iDebt)
+        return _div(self.marketCap + longTermDebt - totalAsset, self.balanceSheet.take("cash", iCash))
+
+    @firmCharRegistry.feature(dependsOn=("operatingCashFlow",))
+    def getCfp(self, operatingCashFlow:np.ndarray) -> np.ndarray:
+        """
+            cfp -- cash flow to price ratio:
+            Operating cash flows divided by fiscal-year-end market capitalization
+        """
+        return _div(operatingCashFlow, self.marketCap)
+
+    def _getAnnualChange(self, statement:StatementPanel, featureName:str) -> np.ndarray:
+        curr:np.ndarray = statement.take(featureName, getFirstNonNullIndex(statement, featureName))
+        prev:np.ndarray = statement.take(featureName, getFirstNonNullIndex(statement, featureName, initIndex=4))
+        return _div(curr - prev, prev)
+
+    @firmCharRegistry.feature()
+    def getChcsho(self) -> np.ndarray:
+        """
+            Change in shares outstanding:
+            Annual percent change in shares outstanding (csho).
+        """
+        return self._getAnnualChange(self.balanceSheet, "commonStockSharesOutstanding")
+
+    @firmCharRegistry.feature(dependsOn=("avgTotalAssets",))
+    def getChinv(self, avgTotalAssets:np.ndarray) -> np.ndarray:
+        """
+            chinv -- Change in inventory:
+            Change in inventory (inv) scaled by average total assets (at).
+        """
+        curr:np.ndarray = self.balanceSheet.take("inventory", getFirstNonNullIndex(self.balanceSheet, "inventory"))
+        prev:np.ndarray = self.balanceSheet.take("inventory", getFirstNonNullIndex(self.balanceSheet, "inventory", initIndex=4))
+        return _div(curr - prev, avgTotalAssets)
+
+    @firmCharRegistry.feature()
+    def getAgr(self) -> np.ndarray:
+        """
+            agr -- Asset growth:
+            Annual percent change in total assets (at).
+        """
+        return self._getAnnualChange(self.balanceSheet, "totalAssets")
+
+    @firmCharRegistry.feature()
+    def getCurrat(self) -> np.ndarray:
+        """
+            currat -- Current ratio:
+            Current assets / current liabilities
+        """
+        i:np.ndarray = getFirstNonNullIndexPair(self.balanceSheet, self.balanceSheet, "totalCurrentAssets", "totalCurrentLiabilities")
+        return _div(self.balanceSheet.take("totalCurrentAssets", i), self.balanceSheet.take("totalCurrentLiabilities", i))
+
+    @firmCharRegistry.feature(dependsOn=("currat", "prevCurrentRatio"))
+    def getPchcurrat(self, currat:np.ndarray, prevCurrentRatio:np.ndarray) -> np.ndarray:
+        """
+            pchcurrat -- % change in current ratio:
+            Percent change in currat.
+        """
+        return _div(currat - prevCurrentRatio, prevCurrentRatio)
+
+    @firmCharRegistry.feature()
+    def getRoaq(self) -> np.ndarray:
+        """
+            roaq -- Return on assets:
+            Income before extraordinary items (ibq) divided by one quarter lagged total assets (atq).
+        """
+        return self.returnOnAssets
+
+    @firmCharRegistry.feature()
+    def getRoeq(self) -> np.ndarray:
+        """
+            roeq -- Return on equity:
+            Earnings before extraordinary items divided by lagged common shareholders' equity.
+        """
+        return self.returnOnEquity
+
+    @firmCharRegistry.feature(dependsOn=("trailingDividends",))
+    def getDy(self, trailingDividends:np.ndarray) -> np.ndarray:
+        """
+            dy -- Dividend to price:
+            Total dividends (dvt) divided by market capitalization at fiscal year-end.
+        """
+        return _div(trailingDividends, self.marketCap)
+
+    @firmCharRegistry.feature()
+    def getRd(self) -> np.ndarray:
+        """
+            rd -- R&D increase:
+            An indicator variable equal to 1 if R&D expense as a percentage of total assets has an increase greater than 5%.
+        """
+        iCurr:np.ndarray = getFirstNonNullIndexPair(self.incomeStatement, self.balanceSheet, "researchDevelopment", "totalAssets")
+        iPrev:np.ndarray = getFirstNonNullIndexPair(
+            self.incomeStatement, self.balanceSheet, "researchDevelopment", "totalAssets", initIndex=4)
+        currRD:np.ndarray = _div(self.incomeStatement.take("researchDevelopment", iCurr), self.balanceSheet.take("totalAssets", iCurr))
+        prevRD:np.ndarray = _div(self.incomeStatement.take("researchDevelopment", iPrev), self.balanceSheet.take("totalAssets", iPrev))
+        change:np.ndarray = _div(currRD - prevRD, prevRD)
+        return _indicator(change > 0.05, change)
+
+    @firmCharRegistry.feature()
+    def getRdMve(self) -> np.ndarray:
+        """
+            rd_mve: R&D expense divided by end-of-fiscal-year market capitalization
+        """
+        iRange:np.ndarray = getNonNullIndexRange(self.incomeStatement, "researchDevelopment")
+        return _div(self.incomeStatement.sum("researchDevelopment", iRange), self.marketCap)
+
+    @firmCharRegistry.feature()
+    def getChtx(self) -> np.ndarray:
+        """
+            chtx -- Change in tax expense:
+            Percent change in total taxes (txtq) from quarter t-4 to t.
+        """
+        return self._getAnnualChange(self.incomeStatement, "taxProvision")
+
+    @firmCharRegistry.feature()
+    def getEp(self) -> np.ndarray:
+        """
+            ep -- Earnings to price:
+            Annual income before extraordinary items (ib) divided by end of fiscal year market cap.
+        """
+        iRange:np.ndarray = getNonNullIndexRange(self.incomeStatement, "incomeBeforeTax")
+        return _div(self.incomeStatement.sum("incomeBeforeTax", iRange), self.marketCap)
+
+    @firmCharRegistry.feature()
+    def getGma(self) -> np.ndarray:
+        """
+            gma -- Gross profitability:
+            Revenues (revt) minus cost of goods sold (cogs) divided by lagged total assets (at).
+        """
+        iLagged:np.ndarray = getFirstNonNullIndex(self.balanceSheet, "totalAssets", initIndex=3)
+        iPair:np.ndarray = getFirstNonNullIndexPair(self.incomeStatement, self.incomeStatement, "totalRevenue", "costOfRevenue")
+        grossProfit:np.ndarray = self.incomeStatement.take("totalRevenue", iPair) - self.incomeStatement.take("costOfRevenue", iPair)
+        return _div(grossProfit, self.balanceSheet.take("totalAssets", iLagged))
+
+    @firmCharRegistry.feature()
+    def getLev(self) -> np.ndarray:
+        """
+            lev -- Leverage:
+            Total liabilities (lt) divided by fiscal year end market capitalization.
+        """
+        i:np.ndarray = getFirstNonNullIndex(self.balanceSheet, "totalLiab")
+        return _div(self.balanceSheet.take("totalLiab", i), self.marketCap)
+
+    @firmCharRegistry.feature()
+    def getInvest(self) -> np.ndarray:
+        """
+            invest -- Capital expenditures and inventory:
+            Annual change in gross property, plant, and equipment (ppegt) +
+            annual change in inventories (invt) all scaled by lagged total assets (at).
+        """
+        iPpegCurr, iPpegPrev = getFirstNonNullIndexPairDistance(self.balanceSheet, self.balanceSheet, "propertyPlantEquipment", "propertyPlantEquipment")
+        iInvCurr, iInvPrev = getFirstNonNullIndexPairDistance(self.balanceSheet, self.balanceSheet, "inventory", "inventory")
+        iLagged:np.ndarray = getFirstNonNullIndex(self.balanceSheet, "totalAssets")
+
+        ppegChange:np.ndarray = self.balanceSheet.take("propertyPlantEquipment", iPpegCurr) - self.balanceSheet.take("propertyPlantEquipment", iPpegPrev)
+        invChange:np.ndarray = self.balanceSheet.take("inventory", iInvCurr) - self.balanceSheet.take("inventory", iInvPrev)
+        return _div(ppegChange + invChange, self.balanceSheet.take("totalAssets", iLagged))
+
+    @firmCharRegistry.feature()
+    def getQuick(self) -> np.ndarray:
+        """
+            quick -- Quick ratio:
+            (current assets - inventory) / current liabilities.
+        """
+        currAsset:np.ndarray = self.balanceSheet.take("totalCurrentAssets", getFirstNonNullIndex(self.balanceSheet, "totalCurrentAssets"))
+        currInv:np.ndarray = self.balanceSheet.take("inventory", getFirstNonNullIndex(self.balanceSheet, "inventory"))
+        currLiab:np.ndarray = self.balanceSheet.take("totalCurrentLiabilities", getFirstNonNullIndex(self.balanceSheet, "totalCurrentLiabilities"))
+        return _div(currAsset - currInv, currLiab)
+
+    @firmCharRegistry.feature()
+    def getPchquick(self) -> np.ndarray:
+        """
+            pchquick -- % change in quick ratio
+            Percent change in quick
+        """
+        iCurrAsset, iPrevAsset = getFirstNonNullIndexPairDistance(self.balanceSheet, self.balanceSheet, "totalCurrentAssets", "totalCurrentAssets")
+        iCurrInv, iPrevInv = getFirstNonNullIndexPairDistance(self.balanceSheet, self.balanceSheet, "inventory", "inventory")
+        iCurrLiab, iPrevLiab = getFirstNonNullIndexPairDistance(
+            self.balanceSheet, self.balanceSheet, "totalCurrentLiabilities", "totalCurrentLiabilities")
+
+        currQuick:np.ndarray = _div(
+            self.balanceSheet.take("totalCurrentAssets", iCurrAsset) - self.balanceSheet.take("inventory", iCurrInv),
+            self.balanceSheet.take("totalCurrentLiabilities", iCurrLiab))
+        prevQuick:np.ndarray = _div(
+            self.balanceSheet.take("totalCurrentAssets", iPrevAsset) - self.balanceSheet.take("inventory", iPrevInv),
+            self.balanceSheet.take("totalCurrentLiabilities", iPrevLiab))
+        return _div(currQuick - prevQuick, prevQuick)
+
+    @firmCharRegistry.feature()
+    def getDolvol(self) -> np.ndarray:
+        """
+            dolvol -- Dollar trading volume:
+            Natural log of trading volume times price per share from month t-2.
+        """
+        if self.monthlyClose.shape[1] < 2:
+            return np.full(len(self), np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.log(self.monthlyVolume[:, -2] * self.monthlyClose[:, -2])
+
+    @firmCharRegistry.feature(dependsOn=("bookIndex",))
+    def getEgr(self, bookIndex:np.ndarray) -> np.ndarray:
+        """
+            egr -- Growth in common shareholder equity:
+            Annual percent change in book value of equity (ceq).
+        """
+        iPrev:np.ndarray = getFirstNonNullIndexPair(
+            self.balanceSheet, self.balanceSheet, "totalAssets", "totalLiab", initIndex=offsetIndex(bookIndex, 4))
+        currBook:np.ndarray = _div(self.balanceSheet.take("totalAssets", bookIndex), self.balanceSheet.take("totalLiab", bookIndex))
+        prevBook:np.ndarray = _div(self.balanceSheet.take("totalAssets", iPrev), self.balanceSheet.take("totalLiab", iPrev))
+        return _div(currBook - prevBook, prevBook)
+
+    @firmCharRegistry.feature()
+    def getLgr(self) -> np.ndarray:
+        """
+            lgr -- Growth in long-term debt:
+            Annual percent change in total liabilities (lt).
+        """
+        iCurr, iPrev = getFirstNonNullIndexPairDistance(self.balanceSheet, self.balanceSheet, "totalLiab", "totalLiab")
+        prevLiab:np.ndarray = self.balanceSheet.take("totalLiab", iPrev)
+        return _div(self.balanceSheet.take("totalLiab", iCurr) - prevLiab, prevLiab)
+
+    @firmCharRegistry.feature(dependsOn=("operatingCashFlow", "trailingRevenue", "prevTrailingRevenue"))
+    def getPs(self, operatingCashFlow:np.ndarray, trailingRevenue:np.ndarray, prevTrailingRevenue:np.ndarray) -> np.ndarray:
+        """
+            ps -- Financial statements score:
+            Sum of 8 indicator variables for fundamental performance
+            https://www.investopedia.com/terms/p/piotroski-score.asp
+        """
+        # profitability criteria
+        netIncome:np.ndarray = self.cashFlow.take("netIncome", getFirstNonNullIndex(self.cashFlow, "netIncome"))
+
+        roaInd:np.ndarray = _indicator(self.returnOnAssets > 0, self.returnOnAssets)
+        operatingCashFlowInd:np.ndarray = _indicator(operatingCashFlow > 0, operatingCashFlow)
+        netIncomeInd:np.ndarray = _indicator(operatingCashFlow > netIncome, operatingCashFlow, netIncome)
+
+        # Leverage, Liquidity, and Source of Funds Criteria
+        iCurrDebt, iPrevDebt = getFirstNonNullIndexPairDistance(self.balanceSheet, self.balanceSheet, "longTermDebt", "longTermDebt")
+        iCurrCurrent, iPrevCurrent = getFirstNonNullIndexPairDistance(
+            self.balanceSheet, self.balanceSheet, "totalCurrentAssets", "totalCurrentLiabilities")
+        currCurrentRatio:np.ndarray = _div(
+            self.balanceSheet.take("totalCurrentAssets", iCurrCurrent), self.balanceSheet.take("totalCurrentLiabilities", iCurrCurrent))
+        prevCurrentRatio:np.ndarray = _div(
+            self.balanceSheet.take("totalCurrentAssets", iPrevCurrent), self.balanceSheet.take("totalCurrentLiabilities", iPrevCurrent))
+        currDebt:np.ndarray = self.balanceSheet.take("longTermDebt", iCurrDebt)
+        prevDebt:np.ndarray = self.balanceSheet.take("longTermDebt", iPrevDebt)
+
+        longTermDebtInd:np.ndarray = _indicator(currDebt < prevDebt, currDebt, prevDebt)
+        currRatioInd:np.ndarray = _indicator(currCurrentRatio > prevCurrentRatio, currCurrentRatio, prevCurrentRatio)
+
+        # Operating Efficiency Criteria
+        iCurrProfitRange:np.ndarray = getNonNullIndexRange(self.incomeStatement, "grossProfit")
+        iPrevProfitRange:np.ndarray = getNonNullIndexRange(
+            self.incomeStatement, "grossProfit", initIndex=offsetIndex(iCurrProfitRange[:, -1], 4))
+        currYearGrossProfit:np.ndarray = self.incomeStatement.sum("grossProfit", iCurrProfitRange)
+        prevYearGrossProfit:np.ndarray = self.incomeStatement.sum("grossProfit", iPrevProfitRange)
+
+        # both turnovers are scaled by the same average total assets, over the first valid quarter pair 4 quarters apart
+        iCurrAsset, iPrevAsset = getFirstNonNullIndexPairDistance(self.balanceSheet, self.balanceSheet, "totalAssets", "totalAssets")
+        avgTotalAssets:np.ndarray = (self.balanceSheet.take("totalAssets", iCurrAsset) + self.balanceSheet.take("totalAssets", iPrevAsset)) / 2
+
+        currAssetTurnOver:np.ndarray = _div(trailingRevenue, avgTotalAssets)
+        prevAssetTurnOver:np.ndarray = _div(prevTrailingRevenue, avgTotalAssets)
+
+        grossMarginInd:np.ndarray = _indicator(currYearGrossProfit > prevYearGrossProfit, currYearGrossProfit, prevYearGrossProfit)
+        assetTurnOverInd:np.ndarray = _indicator(currAssetTurnOver > prevAssetTurnOver, currAssetTurnOver, prevAssetTurnOver)
+
+        return netIncomeInd + roaInd + operatingCashFlowInd + netIncomeInd + longTermDebtInd + currRatioInd + grossMarginInd + assetTurnOverInd
+
+    @firmCharRegistry.feature(dependsOn=("dailyReturn",))
+    def getMaxret(self, dailyReturn:np.ndarray) -> np.ndarray:
+        """
+            maxret -- Maximum daily return:
+            Maximum daily return from returns during calendar month t-1.
+        """
+        return self._nanReduce(np.nanmax, dailyReturn)
+
+    @staticmethod
+    def _nanReduce(func, values:np.ndarray, **kwargs) -> np.ndarray:
+        # pandas-style skipna reduction, stocks without any bar get NaN
+        res:np.ndarray = np.full(values.shape[0], np.nan)
+        hasValues:np.ndarray = (~np.isnan(values)).any(axis=1)
+        if hasValues.any():
+            with np.errstate(divide="ignore", invalid="ignore"):
+                res[hasValues] = func(values[hasValues], axis=1, **kwargs)
+        return res
+
+    @firmCharRegistry.feature()
+    def getRoic(self) -> np.ndarray:
+        """
+            roic -- Return on invested capital:
+            Annual earnings before interest and taxes (ebit) minus non-operating income (nopi)
+            divided by non-cash enterprise value (ceq+lt-che).
+            enterprise value = market cap + total debt - cash and cash equivalents
+        """
+        iEbitRange:np.ndarray = getNonNullIndexRange(self.incomeStatement, "ebit")
+        iIncome:np.ndarray = getNonNullIndexRange(self.incomeStatement, "nonOperatingIncomeNetOther")
+        shortTermDebt:np.ndarray = self.balanceSheet.take("shortTermDebt", getFirstNonNullIndex(self.balanceSheet, "shortTermDebt"))
+        longTermDebt:np.ndarray = self.balanceSheet.take("longTermDebt", getFirstNonNullIndex(self.balanceSheet, "longTermDebt"))
+        cash:np.ndarray = self.balanceSheet.take("cash", getFirstNonNullIndex(self.balanceSheet, "cash"))
+
+        ebit:np.ndarray = self.incomeStatement.sum("ebit", iEbitRange)
+        nonOperatingIncome:np.ndarray = self.incomeStatement.sum("nonOperatingIncomeNetOther", iIncome)
+        ev:np.ndarray = self.marketCap + shortTermDebt + longTermDebt - cash
+
+        return _div(ebit - nonOperatingIncome, ev)
+
+    @firmCharRegistry.feature(dependsOn=("deprIndex",))
+    def getDepr(self, deprIndex:np.ndarray) -> np.ndarray:
+        """
+            depr -- Depreciation / PP&E:
+            Depreciation divided by PP&E.
+        """
+        return _div(self.cashFlow.take("depreciation", deprIndex), self.balanceSheet.take("propertyPlantEquipment", deprIndex))
+
+    @firmCharRegistry.feature(dependsOn=("depr", "prevDepr"))
+    def getPchdepr(self, depr:np.ndarray, prevDepr:np.ndarray) -> np.ndarray:
+        """
+            pchdepr -- % change in depreciation
+            percent change in depr
+        """
+        return _div(depr - prevDepr, prevDepr)
+
+    @firmCharRegistry.feature(dependsOn=("trailingRevenue", "prevTrailingRevenue"))
+    def getSgr(self, trailingRevenue:np.ndarray, prevTrailingRevenue:np.ndarray) -> np.ndarray:
+        """
+            sgr -- Sales growth:
+            Annual percent change in sales (sale).
+        """
+        return _div(trailingRevenue - prevTrailingRevenue, prevTrailingRevenue)
+
+    @firmCharRegistry.feature(dependsOn=("trailingRevenue",))
+    def getSP(self, trailingRevenue:np.ndarray) -> np.ndarray:
+        """
+            SP -- Sales to price:
+            Annual revenue (sale) divided by fiscal-year-end market capitalization.
+        """
+        return _div(trailingRevenue, self.marketCap)
+
+    @firmCharRegistry.feature(dependsOn=("trailingDividends", "prevTrailingDividends"))
+    def getDivi(self, trailingDividends:np.ndarray, prevTrailingDividends:np.ndarray) -> np.ndarray:
+        """
+            divi -- Dividend initiation:
+            An indicator variable equal to 1 if company pays dividends but did not in prior year
+        """
+        return _indicator((trailingDividends > 0) & (prevTrailingDividends < 0), trailingDividends, prevTrailingDividends)
+
+    @firmCharRegistry.feature(dependsOn=("trailingDividends", "prevTrailingDividends"))
+    def getDivo(self, trailingDividends:np.ndarray, prevTrailingDividends:np.ndarray) -> np.ndarray:
+        """
+            divo -- Dividend omission:
+            An indicator variable equal to 1 if company does not pay dividend but did in prior year.
+        """
+        return _indicator((trailingDividends < 0) & (prevTrailingDividends > 0), trailingDividends, prevTrailingDividends)
+
+    @firmCharRegistry.feature()
+    def getTurn(self) -> np.ndarray:
+        """
+            turn -- Share turnover:
+            Average monthly trading volume for most recent 3 months scaled by number of shares outstanding in current month
+        """
+        avgTradeVol:np.ndarray = np.nansum(self.monthlyVolume[:, -3:], axis=1) / 3
+        return _div(avgTradeVol, self.sharesOutstanding)
+
+    @firmCharRegistry.feature()
+    def getMve(self) -> np.ndarray:
+        """
+            mve -- Size:
+            Natural log of market capitalization at end of month t-1.
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.log(self.marketCap)
+
+    @firmCharRegistry.feature(dependsOn=("trailingRevenue",))
+    def getSaleCash(self, trailingRevenue:np.ndarray) -> np.ndarray:
+        """
+            salecash -- Sales to cash:
+            Annual sales divided by cash and cash equivalents
+        """
+        iCash:np.ndarray = getNonNullIndexRange(self.balanceSheet, "cash")
+        return _div(trailingRevenue, self.balanceSheet.sum("cash", iCash))
+
+    @firmCharRegistry.feature()
+    def getSaleInv(self) -> np.ndarray:
+        """
+            saleinv -- Sales to inventory:
+            Annual sales divided by total inventory
+        """
+        return self._getSaleInv()
+
+    @firmCharRegistry.feature(dependsOn=("saleinv", "prevSaleInv"))
+    def getPchSaleInv(self, saleinv:np.ndarray, prevSaleInv:np.ndarray) -> np.ndarray:
+        """
+            pchsaleinv -- Percent change in saleinv
+        """
+        return _div(saleinv - prevSaleInv, prevSaleInv)
+
+    @firmCharRegistry.feature()
+    def getSaleRec(self) -> np.ndarray:
+        """
+            salerec -- Sales to receivables:
+            Annual sales divided by accounts receivable.
+        """
+        iCurrRange:np.ndarray = getNonNullIndexRangePair(self.incomeStatement, self.balanceSheet, "totalRevenue", "netReceivables")
+        return _div(self.incomeStatement.sum("totalRevenue", iCurrRange), self.balanceSheet.sum("netReceivables", iCurrRange))
+
+    @firmCharRegistry.feature()
+    def getSin(self) -> np.ndarray:
+        """
+            sin -- Sin stocks:
+            An indicator variable equal to 1 if a company's primary industry classification is in
+            smoke or tobacco, beer or alcohol, or gaming.
+        """
+        return np.array([
+            np.nan if subIndustry is None else float(subIndustry in ("Tobacco", "Brewers", "Casinos & Gaming"))
+            for subIndustry in self.subIndustry
+        ])
+
+    @firmCharRegistry.feature(dependsOn=("dailyReturn",))
+    def getRetvol(self, dailyReturn:np.ndarray) -> np.ndarray:
+        """
+            retvol -- Return volatility:
+            Standard deviation of daily returns from month t-1.
+        """
+        return self._nanReduce(np.nanstd, dailyReturn, ddof=1)
+
+    @firmCharRegistry.feature()
+    def getChmom(self) -> np.ndarray:
+        """
+            chmom -- Change in 6-month momentum:
+            Cumulative returns from months t-6 to t-1 minus months t-12 to t-7.
+        """
+        currMom:np.ndarray = _div(self._monthlyCloseAt(1) - self._monthlyCloseAt(6), self._monthlyCloseAt(6))
+        prevMom:np.ndarray = _div(self._monthlyCloseAt(7) - self._monthlyCloseAt(12), self._monthlyCloseAt(12))
+        return currMom - prevMom
+
+    @firmCharRegistry.feature()
+    def getMom6m(self) -> np.ndarray:
+        """
+            mom6m:
+            5-month cumulative returns ending one month before month end
+        """
+        return _div(self._monthlyCloseAt(1) - self._monthlyCloseAt(16), self._monthlyCloseAt(16))
+
+    @firmCharRegistry.feature()
+    def getMom12m(self) -> np.ndarray:
+        """
+            mom12m:
+            11-month cumulative returns ending one month before month end
+        """
+        return _div(self._monthlyCloseAt(1) - self._monthlyCloseAt(12), self._monthlyCloseAt(12))
+
+    @firmCharRegistry.feature()
+    def getMom36m(self) -> np.ndarray:
+        """
+            mom36m:
+            Cumulative returns from months t-36 to t-13
+        """
+        return _div(self._monthlyCloseAt(13) - self._monthlyCloseAt(36), self._monthlyCloseAt(36))
+
+    @firmCharRegistry.feature()
+    def getTb(self) -> np.ndarray:
+        """
+            tb -- Tax income to book income:
+            Tax income, calculated from current tax expense divided by maximum federal tax rate,
+            divided by income before extraordinary items
+        """
+        iRange:np.ndarray = getNonNullIndexRangePair(self.incomeStatement, self.incomeStatement, "taxProvision", "incomeBeforeTax")
+        tax:np.ndarray = self.incomeStatement.sum("taxProvision", iRange)
+        fedRate:float = 0.37
+        return _div(tax / fedRate, self.incomeStatement.sum("incomeBeforeTax", iRange))
+
+    @firmCharRegistry.feature()
+    def getOperProf(self) -> np.ndarray:
+        """
+            operprof -- Operating profitability:
+            Revenue minus cost of goods sold - SG&A expense - interest expense divided by lagged common shareholders' equity
+        """
+        iRevCost:np.ndarray = getFirstNonNullIndexPair(self.incomeStatement, self.incomeStatement, "totalRevenue", "costOfRevenue")
+        iSgaInterest:np.ndarray = getFirstNonNullIndexPair(
+            self.incomeStatement, self.incomeStatement, "sellingGeneralAdministrative", "interestExpense")
+        iEquity:np.ndarray = getFirstNonNullIndex(self.balanceSheet, "commonStock")
+
+        profit:np.ndarray = self.incomeStatement.take("totalRevenue", iRevCost) - self.incomeStatement.take("costOfRevenue", iRevCost) \
+            - self.incomeStatement.take("sellingGeneralAdministrative", iSgaInterest) - self.incomeStatement.take("interestExpense", iSgaInterest)
+        return _div(profit, self.balanceSheet.take("commonStock", iEquity))
+
+    @firmCharRegistry.feature()
+    def getPchgmPchsale(self) -> np.ndarray:
+        """
+            pchgm_pchsale -- % change in gross margin - % change in sales:
+            Percent change in gross margin (sale-cogs) minus percent change in sales (sale).
+        """
+        currGrossMargin, prevGrossMargin, currSales, prevSales = self._rangePairChange(
+            self.incomeStatement, self.incomeStatement, "grossProfit", "totalRevenue")
+        return _div(currGrossMargin - prevGrossMargin, prevGrossMargin) - _div(currSales - prevSales, prevSales)
+
+    @firmCharRegistry.feature()
+    def getCinvest(self) -> np.ndarray:
+        """
+            cinvest -- Corporate investment:
+            Change over one quarter in net PP&E (ppentq) divided by sales (saleq) - average of this variable
+            for prior 3 quarters; if saleq = 0, then scale by 0.01.
+        """
+        iRange:np.ndarray = getNonNullIndexRangePair(
+            self.balanceSheet, self.incomeStatement, "propertyPlantAndEquipmentNet", "totalRevenue", duration=5)
+        invest:np.ndarray = _div(self.balanceSheet.take("propertyPlantAndEquipmentNet", iRange), self.incomeStatement.take("totalRevenue", iRange))
+
+        # the quarter indices iRange[1:4] are used as positions into iRange,
+        # so only stocks where those positions (and the ones after them) exist get a value
+        positions:np.ndarray = iRange[:, 1:4]
+        isValid:np.ndarray = ((positions >= 0) & (positions + 1 < iRange.shape[1])).all(axis=1)
+        positions = np.where(isValid[:, None], positions, 0)
+        chInvest:np.ndarray = np.take_along_axis(invest, positions, axis=1) - np.take_along_axis(invest, np.minimum(positions + 1, iRange.shape[1]-1), axis=1)
+        avgChInvest:np.ndarray = np.where(isValid, chInvest.sum(axis=1) / 3, np.nan)
+
+        return invest[:, 0] - invest[:, 1] - avgChInvest
+
+    @firmCharRegistry.feature(dependsOn=("operatingCashFlow",))
+    def getAcc(self, operatingCashFlow:np.ndarray) -> np.ndarray:
+        """
+            acc -- Working capital accruals:
+            Annual income before extraordinary items (ib) minus operating cash flows (oancf) divided by average total assets (at);
+            if oancf is missing then set to change in act - change in che - change in lct + change in dlc + change in txp-dp.
+        """
+        iRange:np.ndarray = getNonNullIndexRangePair(self.incomeStatement, self.balanceSheet, "incomeBeforeTax", "totalAssets")
+        income:np.ndarray = self.incomeStatement.sum("incomeBeforeTax", iRange)
+        return _div(income - operatingCashFlow, self.balanceSheet.sum("totalAssets", iRange))
+
+    @firmCharRegistry.feature(dependsOn=("acc",))
+    def getAbsacc(self, acc:np.ndarray) -> np.ndarray:
+        """
+            absacc -- Absolute accruals:
+            Absolute value of acc
+        """
+        return np.abs(acc)
+
+    @firmCharRegistry.feature()
+    def getStdTurn(self) -> np.ndarray:
+        """
+            std_turn -- Volatility of liquidity (share turnover):
+            Monthly standard deviation of daily share turnover
+        """
+        iShare:np.ndarray = getFirstNonNullIndex(self.balanceSheet, "commonStockSharesOutstanding")
+        shareOutstanding:np.ndarray = self.balanceSheet.take("commonStockSharesOutstanding", iShare)
+        return self._nanReduce(np.nanstd, self.dailyVolume / shareOutstanding[:, None], ddof=1)
+
+    @firmCharRegistry.feature()
+    def getTang(self) -> np.ndarray:
+        """
+            tang -- Debt capacity/firm tangibility:
+            Cash holdings + 0.715 × receivables + 0.547 × inventory + 0.535 × PPE/ total assets
+        """
+        cash:np.ndarray = self.balanceSheet.take("cash", getFirstNonNullIndex(self.balanceSheet, "cash"))
+        rec:np.ndarray = self.balanceSheet.take("netReceivables", getFirstNonNullIndex(self.balanceSheet, "netReceivables"))
+        inv:np.ndarray = self.balanceSheet.take("inventory", getFirstNonNullIndex(self.balanceSheet, "inventory"))
+        ppeg:np.ndarray = self.balanceSheet.take("propertyPlantAndEquipmentNet", getFirstNonNullIndex(self.balanceSheet, "propertyPlantAndEquipmentNet"))
+        assets:np.ndarray = self.balanceSheet.take("totalAssets", getFirstNonNullIndex(self.balanceSheet, "totalAssets"))
+        return cash + 0.715*rec + 0.547*inv + 0.535*_div(ppeg, assets)
+
+    @firmCharRegistry.feature()
+    def getStdDolvol(self) -> np.ndarray:
+        """
+            std_dolvol -- Volatility of liquidity (dollar trading volume):
+            Monthly standard deviation of daily dollar trading volume
+        """
+        return self._nanReduce(np.nanstd, self.dailyVolume * self.dailyVwap, ddof=1)
+
+    @firmCharRegistry.feature()
+    def getIdiovol(self) -> np.ndarray:
+        """
+            idiovol -- Idiosyncratic return volatility:
+            Standard deviation of residuals of weekly returns on weekly equal weighted market returns for 3 years
+            prior to month end
+        """
+        return getIdiosyncraticVolatility(self.weeklyReturns, self.marketReturns)
+
+    @firmCharRegistry.feature()
+    def getIll(self) -> np.ndarray:
+        """
+            ill -- Illiquidity:
+            Average of daily (absolute return / dollar volume)
+        """
+        return self._nanReduce(np.nanmean, self.dailyClose - _div(self.dailyOpen, self.dailyVwap))
+
+    @firmCharRegistry.feature()
+    def getRsup(self) -> np.ndarray:
+        """
+            rsup -- Revenue surprise:
+            Sales from quarter t minus sales from quarter t-4 (saleq) divided by fiscal-quarter-end market capitalization
+            (cshoq * prccq).
+        """
+        iCurr, iPrev = getFirstNonNullIndexPairDistance(self.incomeStatement, self.incomeStatement, "totalRevenue", "totalRevenue")
+        currSales:np.ndarray = self.incomeStatement.take("totalRevenue", iCurr)
+        prevSales:np.ndarray = self.incomeStatement.take("totalRevenue", iPrev)
+        return _div(currSales - prevSales, self.marketCap)
+
+    @firmCharRegistry.feature()
+    def getPchsalePchrect(self) -> np.ndarray:
+        """
+            pchsale_pchrect -- % change in sales - % change in A/R:
+            Annual percent change in sales (sale) minus annual percent change in receivables (rect)
+        """
+        currSales, prevSales, currRec, prevRec = self._rangePairChange(self.incomeStatement, self.balanceSheet, "totalRevenue", "netReceivables")
+        return _div(currSales - prevSales, prevSales) - _div(currRec - prevRec, prevRec)
+
+    @firmCharRegistry.feature()
+    def getNincr(self) -> np.ndarray:
+        """
+            nincr -- Number of earnings increases:
+            Number of consecutive quarters (up to eight quarters) with an increase in earnings (ibq)
+            over same quarter in the prior year.
+        """
+        iRange:np.ndarray = getNonNullIndexRange(self.incomeStatement, "netIncome", duration=13)
+        earnings:np.ndarray = self.incomeStatement.take("netIncome", iRange)
+        isIncrease:np.ndarray = earnings[:, :8] > earnings[:, 4:12]
+
+        nincr:np.ndarray = np.zeros(len(self))
+        tmp:np.ndarray = np.zeros(len(self))
+        for i in range(8):
+            tmp = np.where(isIncrease[:, i], tmp + 1, 0)
+            nincr = np.maximum(nincr, tmp)
+
+        return np.where((iRange >= 0).all(axis=1), nincr, np.nan)
+
+    @firmCharRegistry.feature()
+    def getGrCAPX(self) -> np.ndarray:
+        """
+            grCAPX:
+            Percent change in capital expenditures from year t-2 to year t.
+        """
+        iCurrRange:np.ndarray = getNonNullIndexRange(self.cashFlow, "capitalExpenditures")
+        iPrevRange:np.ndarray = getNonNullIndexRange(self.cashFlow, "capitalExpenditures", initIndex=8)
+        currCapExp:np.ndarray = self.cashFlow.sum("capitalExpenditures", iCurrRange)
+        prevCapExp:np.ndarray = self.cashFlow.sum("capitalExpenditures", iPrevRange)
+        return _div(currCapExp - prevCapExp, prevCapExp)
+
+    @firmCharRegistry.feature()
+    def getPchsalePchinvt(self) -> np.ndarray:
+        """
+            pchsale_pchinvt:
+            Annual percent change in sales (sale) minus annual percent change in inventory (invt).
+        """
+        currYearSales, prevYearSales, currYearInv, prevYearInv = self._rangePairChange(
+            self.incomeStatement, self.balanceSheet, "totalRevenue", "inventory")
+        return _div(currYearSales - prevYearSales, prevYearSales) - _div(currYearInv - prevYearInv, prevYearInv)
+
+    @firmCharRegistry.feature()
+    def getPchsalePchxsga(self) -> np.ndarray:
+        """
+            pchsale_pchxsga:
+            Annual percent change in sales (sale) minus annual percent change in SG&A (xsga).
+        """
+        currYearSales, prevYearSales, currYearSga, prevYearSga = self._rangePairChange(
+            self.incomeStatement, self.incomeStatement, "totalRevenue", "sellingGeneralAdministrative")
+        return _div(currYearSales - prevYearSales, prevYearSales) - _div(currYearSga - prevYearSga, prevYearSga)
+
+    @firmCharRegistry.feature()
+    def getRealEstate(self) -> np.ndarray:
+        """
+            realestate -- Buildings and capitalized leases divided by gross PP&E.
+        """
+        iCurr:np.ndarray = getFirstNonNullIndexPair(self.balanceSheet, self.balanceSheet, "capitalLeaseObligations", "propertyPlantEquipment")
+        return _div(self.balanceSheet.take("capitalLeaseObligations", iCurr), self.balanceSheet.take("propertyPlantEquipment", iCurr))
@@ -0,0 +1,52 @@
+from PairTrading.data.fundamentals.statements import StatementPanel
+
+import numpy as np
+
+# quarter index helpers over the stock axis of a StatementPanel. instead of raising, every function
+# returns MISSING (-1) for the stocks without a valid index
+MISSING:int = -1
+
+
+def offsetIndex(indices:np.ndarray, offset:int) -> np.ndarray:
+    # shifts found indices, missing ones stay missing
+    return np.where(indices >= 0, indices + offset, MISSING)
+
+def _getBothValid(arr1, arr2:StatementPanel, feature1Name, feature2Name:str) -> np.ndarray:
+    return arr1.isValid(feature1Name) & arr2.isValid(feature2Name)
+
+def _getWindowStart(isValid:np.ndarray, initIndex, duration:int) -> np.ndarray:
+    quarters:np.ndarray = np.arange(isValid.shape[1])
+    initIndex = np.broadcast_to(np.asarray(initIndex), (isValid.shape[0],))[:, None]
+    window:np.ndarray = isValid & (quarters >= initIndex) & (quarters < initIndex + duration) & (initIndex >= 0)
+    return np.where(window.any(axis=1), window.argmax(axis=1), MISSING)
+
+def _getIndexRange(isValid:np.ndarray, initIndex, duration:int) -> np.ndarray:
+    quarters:np.ndarray = np.arange(isValid.shape[1])
+    initIndex = np.broadcast_to(np.asarray(initIndex), (isValid.shape[0],))[:, None]
+    mask:np.ndarray = isValid & (quarters >= initIndex) & (initIndex >= 0)
+    if mask.shape[1] < duration:
+        mask = np.pad(mask, ((0, 0), (0, duration - mask.shape[1])))
+    # stable sort keeps the valid quarters first and in order
+    res:np.ndarray = np.argsort(~mask, axis=1, kind="stable")[:, :duration]
+    return np.where((mask.sum(axis=1) >= duration)[:, None], res, MISSING)
+
+def getFirstNonNullIndex(arr:StatementPanel, featureName:str, initIndex=0, duration:int=4) -> np.ndarray:
+    return _getWindowStart(arr.isValid(featureName), initIndex, duration)
+
+def getFirstNonNullIndexPair(arr1, arr2:StatementPanel, feature1Name, feature2Name:str, initIndex=0, duration:int=4) -> np.ndarray:
+    return _getWindowStart(_getBothValid(arr1, arr2, feature1Name, feature2Name), initIndex, duration)
+
+def getFirstNonNullIndexPairDistance(arr1, arr2:StatementPanel, feature1Name, feature2Name:str, initIndex=0, distance:int=4) -> (np.ndarray, np.ndarray):
+    # initIndex is only taken for the signature shared with the other helpers, it is not used
+    numQuarters:int = max(arr1.numQuarters - distance, 0)
+    quarters:np.ndarray = np.arange(numQuarters)
+    isValid:np.ndarray = arr1.isValid(feature1Name)[:, :numQuarters] & arr2.isValid(feature2Name)[:, distance:distance+numQuarters] \
+        & (quarters < (arr1.lengths - distance)[:, None])
+    indices:np.ndarray = np.where(isValid.any(axis=1), isValid.argmax(axis=1), MISSING)
+    return indices, offsetIndex(indices, distance)
+
+def getNonNullIndexRange(arr:StatementPanel, featureName:str, initIndex=0, duration:int=4) -> np.ndarray:
+    return _getIndexRange(arr.isValid(featureName), initIndex, duration)
+
+def getNonNullIndexRangePair(arr1, arr2:StatementPanel, feature1Name, feature2Name:str, initIndex=0, duration:int=4) -> np.ndarray:
+    return _getIndexRange(_getBothValid(arr1, arr2, feature1Name, feature2Name), initIndex, duration)
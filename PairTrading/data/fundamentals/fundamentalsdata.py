@@ -1,6 +1,8 @@
-from PairTrading.data.fundamentals.firmCharacteristics import FirmCharGetter
+from PairTrading.data.fundamentals.batchFirmCharacteristics import BatchFirmCharGetter, firmCharRegistry
+from PairTrading.data.fundamentals.regression import getWeeklyReturns, getMarketReturns
 from lib.dataEngine.common import BarCollection
-from pandas import Series
+from pandas import Series, DataFrame
+import numpy as np
 
 class FundamentalsData:
     
@@ -9,7 +11,9 @@ class FundamentalsData:
         rawFile: dict
     ) -> None:
         self._rawFile:dict = rawFile
-        self.firmCharacteristics:FirmCharGetter = FirmCharGetter.create(rawFile)
+        self.symbol:str = rawFile["General"].get("Code")
+        self._bars:BarCollection = None
+        self._marketReturns:Series = None
 
         
     @classmethod
@@ -19,30 +23,68 @@ class FundamentalsData:
         
         return cls(rawFile)
     
-    def setTechnicalBars(self, bars:BarCollection) -> None:
-        self.firmCharacteristics.setDailyBar(bars.daily)
-        self.firmCharacteristics.setWeeklyBar(bars.weekly)
-        self.firmCharacteristics.setMonthlyBar(bars.monthly)
+    def setTechnicalBars(self, bars:BarCollection, marketReturns:Series=None) -> None:
+        self._bars = bars
+        self._marketReturns = marketReturns
     
-    def getFundamentals(self) -> Series:
-        if not self.firmCharacteristics:
-            raise AttributeError("No firm characteristics getter detected")
+    @staticmethod
+    def getMarketReturns(bars:dict[str, BarCollection]) -> Series:
+        """
+            equal weighted weekly returns of the given universe, the market regressor of idiovol
+        """
+        return getMarketReturns(getWeeklyReturns(bars))
+    
+    def getFundamentals(self, features:list[str]=None) -> Series:
+        """
+            the requested features (all of them by default) of this stock, a batch of one stock.
+            features that cannot be computed are NaN
+        """
+        bars:dict[str, BarCollection] = {} if self._bars is None else {self.symbol: self._bars}
+        return FundamentalsData.getBatchFundamentals({self.symbol: self._rawFile}, bars, features, self._marketReturns).iloc[0]
+    
+    @staticmethod
+    def getBatchFundamentals(rawFiles:dict[str, dict], bars:dict[str, BarCollection], features:list[str]=None, marketReturns:Series=None) -> DataFrame:
+        """
+            firm characteristics of many stocks at once, one row per stock with a valid raw file.
+            characteristics that cannot be computed for a stock are NaN. the market returns default 
+            to the equal weighted returns of the given bars
+        """
+        validFiles:dict[str, dict] = {stock: rawFile for stock, rawFile in rawFiles.items() if FundamentalsData.isFileValid(rawFile)}
+        firmCharacteristics:BatchFirmCharGetter = BatchFirmCharGetter.create(validFiles)
+        firmCharacteristics.setBars(bars, marketReturns)
         
-        fundamentalsDict:dict = {}
+        # shared intermediates are computed once for all the requested features
+        fundamentalsDict:dict = firmCharRegistry.evaluate(firmCharacteristics, FundamentalsData.getFeatureNames(features))
+        for feature, values in fundamentalsDict.items():
+            if values is None:
+                fundamentalsDict[feature] = np.full(len(firmCharacteristics), np.nan)
         
-        getList:list = [method for method in dir(self.firmCharacteristics) if method.startswith("get")]
+        return DataFrame(fundamentalsDict, index=list(validFiles.keys()), dtype=float)
+    
+    @staticmethod
+    def getFeatureNames(features:list[str]=None) -> list[str]:
+        """
+            all registered features in column order, or the given subset after checking it
+        """
+        if features is None:
+            return firmCharRegistry.getFeatureNames()
         
-        for getMethod in getList:
-            try:
-                fundamentalsDict[getMethod.split("get")[1].lower()] = getattr(self.firmCharacteristics, getMethod)()
-            except Exception as ex:
-                fundamentalsDict[getMethod.split("get")[1].lower()] = None
-            
-        return Series(fundamentalsDict)
+        unknown:list[str] = [feature for feature in features if feature not in firmCharRegistry.getFeatureNames()]
+        if unknown:
+            raise ValueError(f"unknown firm characteristics {unknown}")
+        return list(features)
+    
+    @staticmethod
+    def isFileValid(rawFile:dict) -> bool:
+        try:
+            return bool(FundamentalsData._isFileValid(rawFile))
+        except (KeyError, TypeError, AttributeError):
+            return False
     
     @staticmethod
     def _isFileValid(rawFile:dict) -> bool:
-        return ("Highlights" in rawFile.keys() and 
+        return ("General" in rawFile.keys() and
+        "Highlights" in rawFile.keys() and 
         "Technicals" in rawFile.keys() and 
         "SharesStats" in rawFile.keys() and
         "Financials" in rawFile.keys() and
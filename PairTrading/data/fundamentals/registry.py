@@ -0,0 +1,112 @@
+from lib.patterns.base import Base
+
+from dataclasses import dataclass
+from typing import Callable
+
+
+@dataclass(frozen=True)
+class Characteristic:
+    name: str
+    func: Callable
+    dependsOn: tuple[str, ...]
+    isFeature: bool
+
+
+class _Failed:
+    """
+        memo entry of a characteristic that raised, its dependents fail without being evaluated
+    """
+    def __init__(self, ex:Exception):
+        self.ex:Exception = ex
+
+
+class CharacteristicRegistry(Base):
+    """
+        explicit registry of firm characteristics. every entry declares the entries it depends on and
+        receives their values as arguments, so one evaluation computes each node of the dependency
+        graph once. intermediates are shared quantities that are not features themselves
+    """
+
+    def __init__(self):
+        self._characteristics:dict[str, Characteristic] = {}
+
+    @classmethod
+    def create(cls):
+        return cls()
+
+    def _register(self, name:str, dependsOn:tuple, isFeature:bool):
+        def decorator(func:Callable) -> Callable:
+            # features are named after their getter, getPchSaleInv -> pchsaleinv
+            characteristicName:str = name or func.__name__.split("get")[1].lower()
+            if characteristicName in self._characteristics:
+                raise ValueError(f"characteristic {characteristicName} is already registered")
+            self._characteristics[characteristicName] = Characteristic(
+                name=characteristicName,
+                func=func,
+                dependsOn=tuple(dependsOn),
+                isFeature=isFeature
+            )
+            return func
+        return decorator
+
+    def feature(self, dependsOn:tuple=(), name:str=None):
+        return self._register(name, dependsOn, isFeature=True)
+
+    def intermediate(self, name:str, dependsOn:tuple=()):
+        return self._register(name, dependsOn, isFeature=False)
+
+    def __getitem__(self, name:str) -> Characteristic:
+        if name not in self._characteristics:
+            raise KeyError(f"unknown characteristic {name}")
+        return self._characteristics[name]
+
+    def getFeatureNames(self) -> list[str]:
+        # ordered by getter name, the column order the feature matrix has always used
+        features:list[Characteristic] = [characteristic for characteristic in self._characteristics.values() if characteristic.isFeature]
+        return [characteristic.name for characteristic in sorted(features, key=lambda characteristic: characteristic.func.__name__)]
+
+    def resolve(self, names:list[str]) -> list[str]:
+        """
+            the requested characteristics and everything they depend on, in evaluation order
+        """
+        order:list[str] = []
+        visiting:set = set()
+        visited:set = set()
+
+        def visit(name:str) -> None:
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"dependency cycle detected at characteristic {name}")
+            visiting.add(name)
+            for dependency in self[name].dependsOn:
+                visit(dependency)
+            visiting.remove(name)
+            visited.add(name)
+            order.append(name)
+
+        for name in names:
+            visit(name)
+        return order
+
+    def evaluate(self, getter:object, names:list[str]=None) -> dict[str, object]:
+        """
+            evaluates the requested features (all of them by default) on the getter.
+            features that fail, or depend on something that failed, are None
+        """
+        names = self.getFeatureNames() if names is None else names
+        memo:dict[str, object] = {}
+
+        for name in self.resolve(names):
+            characteristic:Characteristic = self[name]
+            dependencies:list = [memo[dependency] for dependency in characteristic.dependsOn]
+            failed:list = [dependency for dependency in dependencies if isinstance(dependency, _Failed)]
+            if failed:
+                memo[name] = failed[0]
+                continue
+            try:
+                memo[name] = characteristic.func(getter, *dependencies)
+            except Exception as ex:
+                memo[name] = _Failed(ex)
+
+        return {name: None if isinstance(memo[name], _Failed) else memo[name] for name in names}
@@ -0,0 +1,55 @@
+from lib.dataEngine.common import BarCollection
+
+import pandas as pd
+import numpy as np
+
+
+def getWeeklyReturns(bars:dict[str, BarCollection]) -> pd.DataFrame:
+    """
+        (week x symbol) matrix of weekly close returns aligned on the bar timestamps.
+        the input frames are only read, never modified
+    """
+    weekly:dict[str, pd.DataFrame] = {
+        symbol: collection.weekly for symbol, collection in bars.items() if collection is not None and not collection.weekly.empty
+    }
+    timestamps:list[np.ndarray] = [pd.DatetimeIndex(frame.index.get_level_values(-1)).asi8 for frame in weekly.values()]
+    weeks:np.ndarray = np.unique(np.concatenate(timestamps)) if timestamps else np.empty(0, dtype=np.int64)
+
+    # returns are taken on each symbol's own series so gaps in other symbols do not leak in
+    returns:np.ndarray = np.full((len(weeks), len(weekly)), np.nan)
+    for k, (frame, timestamp) in enumerate(zip(weekly.values(), timestamps)):
+        close:np.ndarray = frame["close"].to_numpy(dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns[np.searchsorted(weeks, timestamp[1:]), k] = close[1:] / close[:-1] - 1
+
+    index:pd.DatetimeIndex = pd.to_datetime(weeks, utc=True).rename("timestamp")
+    return pd.DataFrame(returns, index=index, columns=list(weekly.keys()))
+
+def getMarketReturns(weeklyReturns:pd.DataFrame) -> pd.Series:
+    """
+        equal weighted market return of every week over the symbols that have a return that week
+    """
+    return weeklyReturns.mean(axis=1, skipna=True).rename("market")
+
+def getIdiosyncraticVolatility(returns:np.ndarray, market:np.ndarray) -> np.ndarray:
+    """
+        standard deviation of the residuals of r = alpha + beta * market for every column of a (weeks x stocks)
+        returns matrix, all regressions solved at once from the closed-form normal equations.
+        weeks where the stock or the market return is missing are left out of that stock's regression
+    """
+    market = np.broadcast_to(np.asarray(market, dtype=float).reshape(-1, 1), returns.shape)
+    isValid:np.ndarray = ~np.isnan(returns) & ~np.isnan(market)
+    n:np.ndarray = isValid.sum(axis=0).astype(float)
+    y:np.ndarray = np.where(isValid, returns, 0.)
+    x:np.ndarray = np.where(isValid, market, 0.)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        yDemeaned:np.ndarray = np.where(isValid, y - y.sum(axis=0) / n, 0.)
+        xDemeaned:np.ndarray = np.where(isValid, x - x.sum(axis=0) / n, 0.)
+        sxx:np.ndarray = (xDemeaned ** 2).sum(axis=0)
+        beta:np.ndarray = np.where(sxx > 0, (xDemeaned * yDemeaned).sum(axis=0) / np.where(sxx > 0, sxx, 1), np.nan)
+        resid:np.ndarray = yDemeaned - beta * xDemeaned
+        volatility:np.ndarray = np.sqrt((resid ** 2).sum(axis=0) / (n - 1))
+
+    # alpha and beta need at least three weeks to leave a residual
+    return np.where(n >= 3, volatility, np.nan)
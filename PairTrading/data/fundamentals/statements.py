@@ -0,0 +1,98 @@
+import numpy as np
+
+
+class StatementMatrix:
+    """
+        quarterly statement parsed once into a dense float64 (quarters x fields) matrix,
+        null or empty values are stored as NaN
+    """
+
+    def __init__(self, values:np.ndarray, fields:list[str]):
+        self.values:np.ndarray = values
+        self.fields:list[str] = fields
+        self._fieldIndex:dict[str, int] = {field: j for j, field in enumerate(fields)}
+
+    @classmethod
+    def create(cls, statement:list[dict], fields:list[str]=None):
+        # only the given fields are parsed when a field list is passed
+        if fields is None:
+            fields = list(dict.fromkeys(field for quarter in statement for field in quarter.keys()))
+        values:np.ndarray = np.array(
+            [[cls._parse(quarter.get(field)) for field in fields] for quarter in statement],
+            dtype=np.float64
+        ).reshape(len(statement), len(fields))
+        return cls(values, fields)
+
+    @staticmethod
+    def _parse(value) -> float:
+        # falsy values count as missing, the same way the raw json records were checked
+        if not value:
+            return np.nan
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return np.nan
+
+    def __len__(self) -> int:
+        return self.values.shape[0]
+
+    def getColumn(self, field:str) -> np.ndarray:
+        if field not in self._fieldIndex:
+            return np.full(len(self), np.nan)
+        return self.values[:, self._fieldIndex[field]]
+
+
+class StatementPanel:
+    """
+        the statement matrices of a whole universe stacked into one (stocks x quarters x fields) array.
+        shorter statements are padded with NaN, so padded quarters count as missing like null values do
+    """
+
+    def __init__(self, values:np.ndarray, fields:list[str], lengths:np.ndarray):
+        self.values:np.ndarray = values
+        self.fields:list[str] = fields
+        self.lengths:np.ndarray = lengths
+        self._fieldIndex:dict[str, int] = {field: j for j, field in enumerate(fields)}
+
+    @classmethod
+    def create(cls, statements:list[StatementMatrix], fields:list[str], numQuarters:int=None):
+        if numQuarters is None:
+            numQuarters = max((len(statement) for statement in statements), default=0)
+        values:np.ndarray = np.full((len(statements), numQuarters, len(fields)), np.nan)
+        for k, statement in enumerate(statements):
+            length:int = min(len(statement), numQuarters)
+            for j, field in enumerate(fields):
+                values[k, :length, j] = statement.getColumn(field)[:length]
+        lengths:np.ndarray = np.array([min(len(statement), numQuarters) for statement in statements], dtype=np.int64)
+        return cls(values, fields, lengths)
+
+    def __len__(self) -> int:
+        return self.values.shape[0]
+
+    @property
+    def numQuarters(self) -> int:
+        return self.values.shape[1]
+
+    def get(self, field:str) -> np.ndarray:
+        if field not in self._fieldIndex:
+            return np.full(self.values.shape[:2], np.nan)
+        return self.values[:, :, self._fieldIndex[field]]
+
+    def isValid(self, field:str) -> np.ndarray:
+        return ~np.isnan(self.get(field))
+
+    def take(self, field:str, indices:np.ndarray) -> np.ndarray:
+        """
+            values of every stock at its own quarter index, indices is (stocks,) or (stocks, k).
+            missing indices (negative) give NaN
+        """
+        values:np.ndarray = self.get(field)
+        indices = np.asarray(indices)
+        columns:np.ndarray = indices if indices.ndim == 2 else indices[:, None]
+        res:np.ndarray = np.take_along_axis(values, np.clip(columns, 0, max(self.numQuarters-1, 0)), axis=1) \
+            if self.numQuarters else np.full(columns.shape, np.nan)
+        res = np.where(columns >= 0, res, np.nan)
+        return res if indices.ndim == 2 else res[:, 0]
+
+    def sum(self, field:str, indices:np.ndarray) -> np.ndarray:
+        return self.take(field, indices).sum(axis=1)
@@ -1,4 +1,5 @@
 import pandas as pd
+import numpy as np
 
 class TechnicalData:
     def __init__(self, rawFile:pd.DataFrame):
@@ -15,6 +16,10 @@ class TechnicalData:
             return True 
         return False 
     
+    @staticmethod
+    def getMomentumNames(numMonths:int=48) -> list[str]:
+        return [f"m{i}" for i in range(numMonths)]
+    
     def getMomentums(self) -> pd.Series:
         return self.priceData["close"]\
             .pct_change()\
@@ -22,4 +27,44 @@ class TechnicalData:
             .reset_index(drop=True)\
             .add_prefix("m")\
             .rename(self.symbol)
-        
\ No newline at end of file
+    
+    @staticmethod
+    def getCloseMatrix(closes:pd.Series, numBars:int) -> (list[str], np.ndarray, np.ndarray):
+        """
+            pivots a (symbol, timestamp) close series into a (symbol x bar) matrix holding the last
+            numBars closes of every symbol, right aligned and NaN padded for shorter histories.
+            also returns the number of bars every symbol has
+        """
+        symbols:np.ndarray
+        codes, symbols = pd.factorize(closes.index.get_level_values(0))
+        timestamps:np.ndarray = pd.DatetimeIndex(closes.index.get_level_values(-1)).asi8
+        
+        # rows ordered by symbol and time, each bar's distance from its symbol's latest bar picks the column
+        order:np.ndarray = np.lexsort((timestamps, codes))
+        codes = codes[order]
+        counts:np.ndarray = np.bincount(codes, minlength=len(symbols))
+        ends:np.ndarray = np.cumsum(counts)
+        fromEnd:np.ndarray = ends[codes] - 1 - np.arange(len(codes))
+        
+        matrix:np.ndarray = np.full((len(symbols), numBars), np.nan)
+        isKept:np.ndarray = fromEnd < numBars
+        matrix[codes[isKept], numBars - 1 - fromEnd[isKept]] = closes.to_numpy(dtype=float)[order][isKept]
+        return list(symbols), matrix, counts
+    
+    @classmethod
+    def getMomentumMatrix(cls, closes:pd.Series, numMonths:int=48) -> pd.DataFrame:
+        """
+            the monthly returns m0 (oldest) .. m{numMonths-1} (latest) of the whole universe computed
+            at once from a (symbol, timestamp) panel of monthly closes. symbols with fewer than
+            numMonths + 1 closes are masked out
+        """
+        symbols, matrix, counts = cls.getCloseMatrix(closes, numMonths + 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            momentums:np.ndarray = matrix[:, 1:] / matrix[:, :-1] - 1
+        
+        hasHistory:np.ndarray = counts >= numMonths + 1
+        return pd.DataFrame(
+            momentums[hasHistory], 
+            index=pd.Index(symbols, dtype=object)[hasHistory], 
+            columns=cls.getMomentumNames(numMonths)
+        )
@@ -1,24 +1,32 @@
 from lib.dataEngine.alpacadata import AlpacaDataClient
 from lib.dataEngine.eoddata import EodDataClient
+from lib.dataEngine.common import BarCollection
 from PairTrading.data.fundamentals import FundamentalsData
 from PairTrading.data.technicals import TechnicalData
 from authentication.auth import AlpacaAuth, EodAuth
-from PairTrading.util.write import writeToJson
-from PairTrading.util.read import readFromJson
 from lib.patterns import Singleton
 from authentication.enums import ConfigType
 
 from pandas import DataFrame, Series, concat
-import json 
-import os
-import shutil
 import numpy as np
 
 from tqdm import tqdm
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 import warnings
+import logging
 
+logger = logging.getLogger(__name__)
 
 
+def _computeFeatures(stocks:list, bars:dict[str, BarCollection], allFundamentals:list[dict], features:list[str]=None, marketReturns:Series=None) -> DataFrame:
+    """
+        cpu-bound firm characteristics of a shard of the universe, kept at module level 
+        so it can run in a process pool
+    """
+    rawFiles:dict[str, dict] = {stock: fundamentals for stock, fundamentals in zip(stocks, allFundamentals) if fundamentals}
+    return FundamentalsData.getBatchFundamentals(rawFiles, bars, features, marketReturns)
+
 
 class FeatureGenerator(metaclass=Singleton):
     
@@ -26,73 +34,112 @@ class FeatureGenerator(metaclass=Singleton):
         self,
         alpacaAuth:AlpacaAuth, 
         eodAuth:EodAuth,
-        stocks:list
+        stocks:list,
+        ioWorkers:int=1,
+        cpuWorkers:int=1,
+        features:list[str]=None,
+        eodRequestsPerMinute:int=600
         ):
         self.alpacaClient:AlpacaDataClient = AlpacaDataClient.create(alpacaAuth)
         self.eodClient:EodDataClient = EodDataClient.create(eodAuth)
         self.stocks:list = stocks
+        self.ioWorkers:int = ioWorkers
+        self.cpuWorkers:int = cpuWorkers
+        self.eodRequestsPerMinute:int = eodRequestsPerMinute
+        # firm characteristics to compute, all registered ones when None
+        self.features:list[str] = features
+        # idiovol market regressor of the last run
+        self.marketReturns:Series = None
         
     @classmethod
-    def create(cls, alpacaAuth:AlpacaAuth, eodAuth:EodAuth, stockList:list):
+    def create(cls, alpacaAuth:AlpacaAuth, eodAuth:EodAuth, stockList:list, ioWorkers:int=1, cpuWorkers:int=1, features:list[str]=None, eodRequestsPerMinute:int=600):
+        if ioWorkers < 1 or cpuWorkers < 1:
+            raise ValueError("the number of workers must be positive")
+        if eodRequestsPerMinute < 1:
+            raise ValueError("the eod request budget must be positive")
+        # fail before any data is fetched when a requested feature does not exist
+        FundamentalsData.getFeatureNames(features)
         if (alpacaAuth.configType in (ConfigType.ALPACA_MAIN, ConfigType.ALPACA_SIDE) and eodAuth.configType==ConfigType.EOD):
             return cls(
                 alpacaAuth=alpacaAuth,
                 eodAuth=eodAuth,
-                stocks=stockList
+                stocks=stockList,
+                ioWorkers=ioWorkers,
+                cpuWorkers=cpuWorkers,
+                features=features,
+                eodRequestsPerMinute=eodRequestsPerMinute
             )        
         else:
             raise AttributeError("invalid auth object detected")
     
-    def getFeatureData(self, useExistingFiles:bool=False, writeToFile:bool=True, cleanOldData:bool=False) -> DataFrame:
-        res:DataFrame = DataFrame()
-        storedStockList = os.listdir("saveddata/tmp") if os.path.exists("saveddata/tmp") else []
+    def _getAllFundamentals(self, stocks:list, forceRefresh:bool) -> list[dict]:
+        # downloads run concurrently within the eod request budget, failed symbols come back as None
+        fundamentals, _ = self.eodClient.getBulkFundamentals(
+            stocks,
+            forceRefresh=forceRefresh,
+            maxWorkers=self.ioWorkers,
+            requestsPerMinute=self.eodRequestsPerMinute
+        )
+        return [fundamentals.get(stock) for stock in stocks]
+            
+    def _getAllFeatures(self, stocks:list, allBars:dict[str, BarCollection], allFundamentals:list[dict], marketReturns:Series=None) -> DataFrame:
+        # the idiovol market regressor is the equal weighted return of the whole universe, not of a shard
+        if marketReturns is None:
+            marketReturns = FundamentalsData.getMarketReturns({stock: allBars[stock] for stock in stocks})
+        self.marketReturns = marketReturns
+        if self.cpuWorkers == 1 or len(stocks) < 2:
+            return _computeFeatures(stocks, allBars, allFundamentals, self.features, marketReturns)
         
+        # one contiguous shard per worker, concatenated back in submission order
+        bounds:np.ndarray = np.linspace(0, len(stocks), min(self.cpuWorkers, len(stocks)) + 1).astype(int)
+        shards:list[slice] = [slice(start, end) for start, end in zip(bounds[:-1], bounds[1:])]
+        with ProcessPoolExecutor(max_workers=self.cpuWorkers) as executor:
+            return concat(list(tqdm(
+                executor.map(
+                    _computeFeatures,
+                    [stocks[shard] for shard in shards],
+                    [{stock: allBars[stock] for stock in stocks[shard]} for shard in shards],
+                    [allFundamentals[shard] for shard in shards],
+                    repeat(self.features),
+                    repeat(marketReturns)
+                ),
+                total=len(shards),
+                desc="calculate fundamental features"
+            )))
+    
+    def getFeatureData(self, useExistingFiles:bool=True, cleanOldData:bool=False, marketReturns:Series=None) -> DataFrame:
+        """
+            useExistingFiles serves fundamentals from the cache while they are fresh, otherwise every 
+            symbol is refetched. cleanOldData empties the fundamentals cache before a full refetch.
+            marketReturns replaces the market of the given stocks, e.g. with the training universe's
+        """
         if cleanOldData and not useExistingFiles:
-            if os.path.exists("saveddata/tmp"):
-                shutil.rmtree("saveddata/tmp")
-                os.mkdir("saveddata/tmp")
-                
+            self.eodClient.fundamentalsCache.clear()
         
-        for stock in tqdm(self.stocks, desc="calculate technical and fundamental features"):
-            priceData:DataFrame = self.alpacaClient.getMonthly(stock)
-            
-            # we will not consider stocks that have less than 4 years of data
-            if priceData.shape[0] < 49:
-                continue
-            else:
-                priceData:DataFrame = priceData.iloc[priceData.shape[0]-49:]
-            
-            if useExistingFiles and f"{stock}.json" in storedStockList:
-                fundamentals:dict = readFromJson(f"saveddata/tmp/{stock}.json")
-            else:
-                fundamentals:dict = self.eodClient.getFundamentals(stock)
-                       
-            try:
-                # initialize generators
-                technicalsGenerator:TechnicalData = TechnicalData.create(priceData)
-                firmCharGenerator:FundamentalsData = FundamentalsData.create(fundamentals)
-                firmCharGenerator.setTechnicalBars(self.alpacaClient.getAllBars(stock))
-                
-                momentums:Series = technicalsGenerator.getMomentums()
-                firmChars:Series = firmCharGenerator.getFundamentals()
-                
-                combinedFeatures = DataFrame([momentums.append(firmChars).rename(stock)])
-                res = combinedFeatures if res.empty else concat([res, combinedFeatures])
-                
-                if writeToFile and f"{stock}.json" not in storedStockList:
-                    if not os.path.exists("saveddata/tmp"):
-                        os.makedirs("saveddata/tmp")
-                    writeToJson(fundamentals, f"saveddata/tmp/{stock}.json")           
-            except:
-                continue
+        # bars for the whole universe are fetched in a handful of batched requests up front
+        allBars:dict[str, BarCollection] = self.alpacaClient.getBatchAllBars(self.stocks)
         
-        res.replace([np.inf, -np.inf], np.nan, inplace=True)
-        res.fillna(0, inplace=True)
-        return res
-            
-            
-            
-            
-            
+        columns:list[str] = TechnicalData.getMomentumNames() + FundamentalsData.getFeatureNames(self.features)
+        monthlyCloses:list[Series] = [allBars[stock].monthly["close"] for stock in self.stocks if stock in allBars]
+        if not monthlyCloses:
+            logger.warning("no bars retrieved for any stock of the universe")
+            return DataFrame(columns=columns, dtype=float)
+        
+        # momentums of the whole universe in one pass, stocks with less than 4 years of data are masked out
+        momentums:DataFrame = TechnicalData.getMomentumMatrix(concat(monthlyCloses))
+        stocks:list = [stock for stock in self.stocks if stock in momentums.index]
+        if len(stocks) < len(self.stocks):
+            logger.info(f"{len(self.stocks) - len(stocks)} stocks without 4 years of monthly bars are skipped")
+        if not stocks:
+            logger.warning("no stock of the universe has 4 years of monthly bars")
+            return DataFrame(columns=columns, dtype=float)
+        
+        allFundamentals:list[dict] = self._getAllFundamentals(stocks, forceRefresh=not useExistingFiles)
+        allFeatures:DataFrame = concat([momentums, self._getAllFeatures(stocks, allBars, allFundamentals, marketReturns)], axis=1, join="inner")
+        
+        # rows keep the universe order and columns a fixed schema, missing features are zero
+        index:list[str] = [stock for stock in stocks if stock in allFeatures.index]
+        featureMatrix:np.ndarray = allFeatures.reindex(index=index, columns=columns).to_numpy(dtype=float)
         
-        
\ No newline at end of file
+        featureMatrix[~np.isfinite(featureMatrix)] = 0
+        return DataFrame(featureMatrix, index=index, columns=columns)
@@ -1,10 +1,117 @@
 from statsmodels.tsa.stattools import coint
+from statsmodels.tsa.adfvalues import mackinnonp
 from numpy import array
+from pandas import DataFrame
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 
 class CointTest:
-        
+
     @staticmethod
     def isCointegrated(stock1, stock2:array) -> bool:
         _, pvalue, _ = coint(stock1, stock2, maxlag=1)
         return pvalue < 0.05
 
+
+def _engleGranger(y:array, x:array, lags:int) -> tuple[array, array, array]:
+    """
+        two-step engle-granger test for many pairs at once. y and x are (observations, pairs) matrices;
+        returns the hedge ratios, adf t-statistics and asymptotic p-values of every column pair
+    """
+    nobs, numPairs = y.shape
+
+    # step 1: y = alpha + beta * x for every pair, in closed form
+    xDemeaned:array = x - x.mean(axis=0)
+    yDemeaned:array = y - y.mean(axis=0)
+    xVariance:array = (xDemeaned ** 2).sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        beta:array = (xDemeaned * yDemeaned).sum(axis=0) / xVariance
+    # a constant x leaves the hedge ratio undefined, such pairs are never cointegrated
+    degenerate:array = ~(xVariance > 0) | ~np.isfinite(beta)
+    beta[degenerate] = 0
+    resid:array = yDemeaned - beta * xDemeaned
+
+    # step 2: adf regression without constant on the residuals,
+    # d(e_t) = gamma * e_(t-1) + sum(phi_i * d(e_(t-i))), stacked as (pairs, observations, regressors)
+    diff:array = np.diff(resid, axis=0)
+    dep:array = diff[lags:].T
+    regressors:array = np.stack(
+        [resid[lags:-1].T] + [diff[lags-i:-i].T for i in range(1, lags+1)],
+        axis=2
+    )
+    xtx:array = np.einsum("pnk,pnj->pkj", regressors, regressors)
+    xty:array = np.einsum("pnk,pn->pk", regressors, dep)
+
+    tstats:array = np.full(numPairs, -np.inf)
+    solvable:array = np.abs(np.linalg.det(xtx)) > 1e-12
+    if solvable.any():
+        xtxInv:array = np.linalg.inv(xtx[solvable])
+        coefs:array = np.einsum("pkj,pj->pk", xtxInv, xty[solvable])
+        fitted:array = np.einsum("pnk,pk->pn", regressors[solvable], coefs)
+        dof:int = dep.shape[1] - (lags + 1)
+        sigma2:array = ((dep[solvable] - fitted) ** 2).sum(axis=1) / dof
+        tstats[solvable] = coefs[:, 0] / np.sqrt(sigma2 * xtxInv[:, 0, 0])
+
+    tstats[degenerate] = np.nan
+    pvalues:array = np.array([mackinnonp(t, regression="c", N=2) for t in tstats])
+    pvalues[degenerate] = 1
+    beta[degenerate] = np.nan
+    return beta, tstats, pvalues
+
+
+class BatchCointTest:
+    """
+        engle-granger cointegration test for many candidate pairs at once,
+        optionally sharded across a process pool. the adf regression uses a fixed number of lags,
+        as coint(..., maxlag=lags, autolag=None) does, while CointTest picks up to maxlag lags by aic,
+        so the two can disagree on pairs close to the threshold
+    """
+
+    def __init__(self, lags:int, numWorkers:int, shardSize:int):
+        self.lags:int = lags
+        self.numWorkers:int = numWorkers
+        self.shardSize:int = shardSize
+
+    @classmethod
+    def create(cls, lags:int=1, numWorkers:int=1, shardSize:int=2000):
+        if lags < 1 or numWorkers < 1 or shardSize < 1:
+            raise ValueError("lags, number of workers and shard size must all be positive")
+        return cls(lags, numWorkers, shardSize)
+
+    def run(self, prices:DataFrame, pairs:list[tuple]) -> DataFrame:
+        """
+            prices is a (timestamp, symbol) close matrix. pairs missing a leg or with gaps in
+            either price series are reported with NaN statistics
+        """
+        res:DataFrame = DataFrame(
+            {"hedge_ratio": np.nan, "adf_stat": np.nan, "pvalue": np.nan},
+            index=[",".join(pair) for pair in pairs]
+        )
+        completeSymbols:set = set(prices.columns[prices.notna().all(axis=0)])
+        validPairs:list[tuple] = [pair for pair in pairs if pair[0] in completeSymbols and pair[1] in completeSymbols]
+        if not validPairs or len(prices) < self.lags + 4:
+            return res
+
+        y:array = prices[[pair[0] for pair in validPairs]].to_numpy(dtype=float)
+        x:array = prices[[pair[1] for pair in validPairs]].to_numpy(dtype=float)
+        shards:list[slice] = [slice(i, i+self.shardSize) for i in range(0, len(validPairs), self.shardSize)]
+
+        if self.numWorkers > 1 and len(shards) > 1:
+            with ProcessPoolExecutor(max_workers=self.numWorkers) as executor:
+                results:list = list(executor.map(
+                    _engleGranger,
+                    [y[:, shard] for shard in shards],
+                    [x[:, shard] for shard in shards],
+                    [self.lags] * len(shards)
+                ))
+        else:
+            results:list = [_engleGranger(y[:, shard], x[:, shard], self.lags) for shard in shards]
+
+        res.loc[[",".join(pair) for pair in validPairs]] = np.column_stack(
+            [np.concatenate([result[i] for result in results]) for i in range(3)]
+        )
+        return res
+
+    def getCointegratedPairs(self, prices:DataFrame, pairs:list[tuple], pvalue:float=0.05) -> list[tuple]:
+        res:DataFrame = self.run(prices, pairs)
+        return [pair for pair, isCointegrated in zip(pairs, (res["pvalue"] < pvalue).to_numpy()) if isCointegrated]
@@ -1,79 +1,113 @@
 from pandas import DataFrame, Series, concat
-from numpy import array, dot
+from numpy import array, dot, isnan, flatnonzero
 from sklearn.preprocessing import StandardScaler
 from datetime import date, datetime
 from dateutil.relativedelta import relativedelta
 from lib.dataEngine import AlpacaDataClient
+from lib.dataEngine.common import MarketSnapshot
 from lib.patterns import Singleton, Base
-from PairTrading.pairs.cointegration import CointTest
-
-from tqdm import tqdm
+from PairTrading.pairs.cointegration import CointTest, BatchCointTest
+from PairTrading.util.conversion import serializePairData
 
+import logging
 
+logger = logging.getLogger(__name__)
 
 
 class PairCreator(Base, metaclass=Singleton):
     
-    def __init__(self, clusterDF:DataFrame, dataClient:AlpacaDataClient):
+    def __init__(self, clusterDF:DataFrame, dataClient:AlpacaDataClient, cointTest:BatchCointTest=None):
         self.clusterDF:DataFrame = clusterDF
         self.dataClient:AlpacaDataClient = dataClient
+        self.cointTest:BatchCointTest = cointTest
         
         
     @classmethod
-    def create(cls, clusterDF:DataFrame, client:AlpacaDataClient):
-        return cls(clusterDF, client)
+    def create(cls, clusterDF:DataFrame, client:AlpacaDataClient, cointegrationFilter:bool=False, numWorkers:int=1):
+        cointTest:BatchCointTest = BatchCointTest.create(numWorkers=numWorkers) if cointegrationFilter else None
+        return cls(clusterDF, client, cointTest)
     
     def getFinalPairs(self, trainDate:date) -> dict[str, list]:
         self._getMomentum()
         res = {"time": trainDate.strftime("%Y-%m-%d")}
-        finalPairs:dict = {}
         pairsDF:DataFrame = self._getTradeablePairs()
-        viablePairs:list = [(val.split(",")[0], val.split(",")[1]) for val in pairsDF.index]
-        
-        meanMomentum:float = pairsDF["momentum"].mean()
         
-        tmpDict:dict = {}
-        for pair in viablePairs:           
-            tmpDict[",".join(pair)] = (pairsDF.loc[",".join(pair)]["momentum"] - pairsDF.loc[",".join(pair)]["mean"]) * 2 / \
-                pairsDF.loc[",".join(pair)]["momentum_zscore"]
-
-                
-        for pair in list(tmpDict.keys()):
-            finalPairs[pair] = tmpDict[pair]
-        res["final_pairs"] = finalPairs 
+        exitProfits:Series = (pairsDF["momentum"] - pairsDF["mean"]) * 2 / pairsDF["momentum_zscore"]
+        res["final_pairs"] = serializePairData(dict(zip(zip(pairsDF["short"], pairsDF["long"]), exitProfits)))
         return res
     
     
     def _getTradeablePairs(self) -> DataFrame:
         
-        pairCandidates:Series = Series(self._formPairs()).sort_values(ascending=False)
-        pairData:array = array(pairCandidates).reshape(-1, 1)
+        pairsDF:DataFrame = self._formPairs().sort_values(by="momentum", ascending=False)
         
         sc = StandardScaler()
-        pairsDF:DataFrame = concat({
-            "momentum_zscore": Series(sc.fit_transform(pairData).flatten(), index=pairCandidates.index), 
-            "momentum": pairCandidates, 
-            "mean": Series(sc.mean_[0], index=pairCandidates.index)}, axis=1)  
+        pairsDF["momentum_zscore"] = sc.fit_transform(pairsDF[["momentum"]].to_numpy()).flatten()
+        pairsDF["mean"] = sc.mean_[0]
+        
+        pairsDF = pairsDF.loc[pairsDF["momentum_zscore"] > 1]
+        if self.cointTest is not None:
+            pairsDF = self._filterCointegrated(pairsDF)
+        
+        return pairsDF.sort_values(by=["momentum_zscore"], ascending=False)
+    
+    def _filterCointegrated(self, pairsDF:DataFrame) -> DataFrame:
+        if pairsDF.empty:
+            return pairsDF
+        symbols:list = list(dict.fromkeys(list(pairsDF["short"]) + list(pairsDF["long"])))
+        bars:DataFrame = self.dataClient.getBatchLongDaily(symbols)
+        if bars.empty or "close" not in bars.columns:
+            # pairs that could not be tested are not traded
+            logger.warning(f"no daily bars for the cointegration filter, none of the {len(pairsDF)} pairs are kept")
+            return pairsDF.iloc[0:0]
+        closes:DataFrame = bars["close"].unstack(level=0)
+        
+        pairs:list[tuple] = list(zip(pairsDF["short"], pairsDF["long"]))
+        stats:DataFrame = self.cointTest.run(closes, pairs)
+        isCointegrated:array = (stats["pvalue"] < 0.05).to_numpy()
+        logger.info(f"{isCointegrated.sum()} of {len(pairs)} pairs are cointegrated")
         
-        return pairsDF.loc[pairsDF["momentum_zscore"] > 1].sort_values(by=["momentum_zscore"], ascending=False)
+        return pairsDF.loc[isCointegrated]
                       
         
-    def _formPairs(self) -> dict:
-        pairCandidates:dict = {}       
-        for clusterID in self.clusterDF["cluster_id"].unique():
-            clusterDF = self.clusterDF.loc[self.clusterDF["cluster_id"] == clusterID].sort_values(by="momentum", ascending=False)
-            head, tail = 0, len(clusterDF)-1
-            while head < tail:
-                pairCandidates[f"{clusterDF.iloc[head].name},{clusterDF.iloc[tail].name}"] = \
-                abs(clusterDF.iloc[head]["momentum"] - clusterDF.iloc[tail]["momentum"])
-                head += 1
-                tail -= 1
-                
-        return pairCandidates
+    def _formPairs(self) -> DataFrame:
+        """
+            pairs the i-th highest with the i-th lowest momentum stock of every cluster,
+            returned as a (short, long, momentum spread) frame
+        """
+        clusterDF:DataFrame = self.clusterDF.dropna(subset=["momentum"])\
+            .sort_values(by=["cluster_id", "momentum"], ascending=[True, False])
+        clusters = clusterDF.groupby("cluster_id", sort=False)
+        
+        rank:array = clusters.cumcount().to_numpy()
+        clusterSize:array = clusters["momentum"].transform("size").to_numpy()
+        
+        headPos:array = flatnonzero(rank < clusterSize // 2)
+        tailPos:array = headPos - rank[headPos] + clusterSize[headPos] - 1 - rank[headPos]
+        
+        symbols:array = clusterDF.index.to_numpy()
+        momentum:array = clusterDF["momentum"].to_numpy()
+        return DataFrame({
+            "short": symbols[headPos],
+            "long": symbols[tailPos],
+            "momentum": abs(momentum[headPos] - momentum[tailPos])
+        })
     
     def _getMomentum(self) -> None:
-        for stock in tqdm(self.clusterDF.index, desc="get latest momentum data"):
-            currPrice:float = self.dataClient.getLastMinute(stock)
-            prevPrice:float = self.dataClient.getMonthly(stock, 2).iloc[-2]["close"]            
-            self.clusterDF.loc[stock]["momentum"] = (currPrice - prevPrice) / prevPrice
-    
+        symbols:list = list(self.clusterDF.index)
+        snapshot:MarketSnapshot = self.dataClient.getMarketSnapshot(symbols)
+        monthly:DataFrame = self.dataClient.getBatchMonthly(symbols, 2)
+        
+        # the second to last monthly bar of every symbol holds the prior month close
+        prevClose:Series = Series(dtype=float)
+        if not monthly.empty:
+            isPrevMonth:array = monthly.groupby(level=0).cumcount(ascending=False).to_numpy() == 1
+            prevClose = monthly.loc[isPrevMonth, "close"].droplevel(1)
+        
+        currPrices:array = Series(snapshot.prices, dtype=float).reindex(symbols).to_numpy()
+        prevPrices:array = prevClose.reindex(symbols).to_numpy()
+        self.clusterDF["momentum"] = (currPrices - prevPrices) / prevPrices
+        
+        missing:int = int(isnan(self.clusterDF["momentum"].to_numpy()).sum())
+        if missing:
+            logger.info(f"no latest momentum for {missing} stocks")
@@ -1,2 +1,3 @@
 from .manager import *
-from .helper import * 
\ No newline at end of file
+from .helper import *
+from .engine import *
\ No newline at end of file
@@ -0,0 +1,209 @@
+from PairTrading.trading.manager import TradingManager
+from lib.patterns import Base
+from authentication.auth import AlpacaAuth
+
+from alpaca.data.live import StockDataStream
+from alpaca.data.enums import DataFeed
+from alpaca.data.models import Quote
+from alpaca.trading.models import Clock
+
+from typing import Callable
+from datetime import date
+import threading
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class TradingEngine(Base):
+    """
+        event driven trading loop. quotes of the opened pairs' legs arrive over the market data stream
+        and only the pairs whose legs ticked are checked for an exit, against the streamed quotes.
+        the clock and the opened positions are refreshed on timers instead of on every pass. when no
+        quote arrived for staleSeconds, e.g. the stream cannot authenticate or went silent, all opened
+        pairs are checked against rest quotes on the account timer
+    """
+
+    def __init__(
+        self,
+        manager:TradingManager,
+        stream:StockDataStream,
+        onPreClose:Callable[[], None]=None,
+        clockInterval:float=30,
+        accountInterval:float=60,
+        evaluationInterval:float=0.5,
+        preCloseSeconds:float=900,
+        staleSeconds:float=60
+    ):
+        self.manager:TradingManager = manager
+        self.stream:StockDataStream = stream
+        self.onPreClose:Callable[[], None] = onPreClose
+        self.clockInterval:float = clockInterval
+        self.accountInterval:float = accountInterval
+        self.evaluationInterval:float = evaluationInterval
+        self.preCloseSeconds:float = preCloseSeconds
+        self.staleSeconds:float = staleSeconds
+
+        # written by the stream thread, read by the engine loop
+        self._lock:threading.Lock = threading.Lock()
+        self._tick:threading.Event = threading.Event()
+        self.quotes:dict[str, Quote] = {}
+        self._dirtyPairs:set[tuple] = set()
+        self._lastQuoteTime:float = time.monotonic()
+        # session date on which onPreClose last ran, it runs once per session
+        self._preCloseDate:date = None
+
+        self.pairsBySymbol:dict[str, list[tuple]] = {}
+        self._subscribed:set[str] = set()
+        self._streamThread:threading.Thread = None
+
+    @classmethod
+    def create(cls, alpacaAuth:AlpacaAuth, manager:TradingManager, streamUrl:str=None, feed:DataFeed=DataFeed.SIP, **kwargs):
+        """
+            streamUrl overrides the alpaca market data stream endpoint, e.g. with a local fake server.
+            the feed defaults to sip like the rest quotes, iex quotes are thin and their wide spreads
+            would move the exit profits
+        """
+        stream:StockDataStream = StockDataStream(alpacaAuth.api_key, alpacaAuth.secret_key, feed=DataFeed(feed), url_override=streamUrl)
+        return cls(manager, stream, **kwargs)
+
+    async def _onQuote(self, quote:Quote) -> None:
+        # one sided quotes cannot price the exit of either leg
+        if not quote.bid_price or not quote.ask_price:
+            return
+        with self._lock:
+            self.quotes[quote.symbol] = quote
+            self._lastQuoteTime = time.monotonic()
+            self._dirtyPairs.update(self.pairsBySymbol.get(quote.symbol, ()))
+        self._tick.set()
+
+    def _takeDirtyPairs(self) -> (set[tuple], dict[str, Quote]):
+        with self._lock:
+            pairs, self._dirtyPairs = self._dirtyPairs, set()
+            # a pair is checked once both legs have a streamed quote, the later leg marks it again
+            return {pair for pair in pairs if pair[0] in self.quotes and pair[1] in self.quotes}, dict(self.quotes)
+
+    def _syncSubscriptions(self) -> None:
+        """
+            subscribes to the legs of the currently opened pairs and drops the closed ones
+        """
+        openedPairs:dict[tuple, list] = self.manager.pairInfoRetriever.getCurrentlyOpenedPairs(
+            pairs=self.manager.tradingRecord,
+            openedPositions=self.manager.openedPositions
+        ) or {}
+        pairsBySymbol:dict[str, list[tuple]] = {}
+        for pair in openedPairs.keys():
+            for symbol in pair:
+                pairsBySymbol.setdefault(symbol, []).append(pair)
+
+        symbols:set[str] = set(pairsBySymbol.keys())
+        added:list[str] = sorted(symbols - self._subscribed)
+        removed:list[str] = sorted(self._subscribed - symbols)
+        with self._lock:
+            self.pairsBySymbol = pairsBySymbol
+            for symbol in removed:
+                self.quotes.pop(symbol, None)
+        if added:
+            self.stream.subscribe_quotes(self._onQuote, *added)
+        if removed:
+            self.stream.unsubscribe_quotes(*removed)
+        self._subscribed = symbols
+        # the stream busy-waits while it has no subscriptions, so it is only started once it has one
+        if self._subscribed and self._streamThread is None:
+            self._streamThread = threading.Thread(target=self.stream.run, name="quote-stream", daemon=True)
+            self._streamThread.start()
+        logger.info(f"streaming quotes of {len(openedPairs)} opened pairs")
+
+    def _refreshClock(self) -> Clock:
+        clock:Clock = self.manager.tradingClient.clock
+        self.manager.clock = clock
+        return clock
+
+    def _refreshAccount(self) -> None:
+        self.manager.openedPositions = self.manager.tradingClient.openedPositions
+        self.manager.closeUnpairedLegs()
+        self._syncSubscriptions()
+        if self._subscribed and time.monotonic() - self._lastQuoteTime >= self.staleSeconds:
+            self._evaluateFromRest()
+
+    def _isPreClose(self, clock:Clock) -> bool:
+        return self.onPreClose is not None and self._preCloseDate != clock.timestamp.date() \
+            and (clock.next_close - clock.timestamp).total_seconds() <= self.preCloseSeconds
+
+    def _runPreClose(self, clock:Clock) -> None:
+        # marked first, a failed run is not repeated on every clock refresh
+        self._preCloseDate = clock.timestamp.date()
+        try:
+            self.onPreClose()
+        except Exception as ex:
+            logger.exception(f"pre-close run failed ({ex})")
+
+    def _evaluateFromRest(self) -> None:
+        logger.warning(f"no streamed quote for {self.staleSeconds:.0f}s, checking all opened pairs against rest quotes")
+        try:
+            if self.manager.closePositions():
+                self._syncSubscriptions()
+        except Exception as ex:
+            logger.exception(f"rest exit check failed ({ex})")
+
+    def _evaluate(self) -> None:
+        pairs, quotes = self._takeDirtyPairs()
+        if not pairs:
+            return
+        try:
+            if self.manager.closePositions(pairs=pairs, quotes=quotes):
+                self._syncSubscriptions()
+        except Exception as ex:
+            # the pairs are checked again on their next tick
+            logger.exception(f"exit check of {len(pairs)} pairs failed ({ex})")
+
+    def stop(self) -> None:
+        if self._streamThread is None:
+            return
+        try:
+            self.stream.stop()
+        except Exception as ex:
+            logger.warning(f"failed to stop the quote stream ({ex})")
+        self._streamThread.join(timeout=10)
+        self._streamThread = None
+
+    def run(self) -> None:
+        """
+            runs until the market closes
+        """
+        self._syncSubscriptions()
+        nextClock:float = 0
+        nextAccount:float = time.monotonic() + self.accountInterval
+        nextEvaluation:float = 0
+        try:
+            while True:
+                now:float = time.monotonic()
+                if now >= nextClock:
+                    clock:Clock = self._refreshClock()
+                    if not clock.is_open:
+                        logger.info("the market has closed")
+                        return
+                    if self._isPreClose(clock):
+                        self._runPreClose(clock)
+                        self._refreshAccount()
+                        nextAccount = time.monotonic() + self.accountInterval
+                    nextClock = time.monotonic() + self.clockInterval
+                if now >= nextAccount:
+                    self._refreshAccount()
+                    nextAccount = time.monotonic() + self.accountInterval
+
+                # exit checks are batched to at most one pass per evaluation interval
+                if now >= nextEvaluation and self._tick.is_set():
+                    self._tick.clear()
+                    self._evaluate()
+                    nextEvaluation = time.monotonic() + self.evaluationInterval
+
+                wakeUp:float = min(nextClock, nextAccount)
+                if self._tick.is_set():
+                    wakeUp = min(wakeUp, nextEvaluation)
+                    time.sleep(max(wakeUp - time.monotonic(), 0))
+                else:
+                    self._tick.wait(timeout=max(wakeUp - time.monotonic(), 0))
+        finally:
+            self.stop()
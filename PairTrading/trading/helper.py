@@ -1,6 +1,6 @@
 from lib.tradingClient.client import AlpacaTradingClient
-from PairTrading.util.read import getRecentlyClosed, getPairsFromTrainingJson
-from PairTrading.util.write import dumpRecentlyClosed
+from PairTrading.util.read import getPairsFromTrainingJson
+from PairTrading.util.state import TradingStateStore
 from lib.patterns.singleton import Singleton
 
 from alpaca.trading.models import Position
@@ -14,6 +14,7 @@ class PairInfoRetriever(metaclass=Singleton):
         tradingClient: AlpacaTradingClient
     ):
         self.tradingClent:AlpacaTradingClient = tradingClient
+        self.stateStore:TradingStateStore = TradingStateStore.create()
         
     @classmethod
     def create(cls, tradingClient:AlpacaTradingClient):
@@ -28,11 +29,7 @@ class PairInfoRetriever(metaclass=Singleton):
         
     @property
     def recentlyClosedPositions(self) -> dict[str, date]:
-        return getRecentlyClosed()
-    
-    @recentlyClosedPositions.setter
-    def recentlyClosedPositions(self, rec:dict[str, date]) -> None:
-        dumpRecentlyClosed(rec)
+        return self.stateStore.recentlyClosed
     
     def getTradablePairs(self, pairs:dict[tuple, float], openedPositions:dict[str, Position]) -> dict[tuple, list]:
         if not pairs:
@@ -41,7 +38,7 @@ class PairInfoRetriever(metaclass=Singleton):
         for stock1, stock2 in pairs.keys():
             if stock1 in openedPositions or stock2 in openedPositions:
                 del res[(stock1, stock2)]
-            elif stock1 in self.recentlyClosedPositions or stock2 in self.recentlyClosedPositions:
+            elif self.stateStore.isRecentlyClosed(stock1) or self.stateStore.isRecentlyClosed(stock2):
                 del res[(stock1, stock2)]
         return res
     
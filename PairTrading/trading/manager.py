@@ -1,7 +1,9 @@
-from lib.tradingClient import AlpacaTradingClient
+from lib.tradingClient import AlpacaTradingClient, UnpairedLegError
 from lib.dataEngine import AlpacaDataClient
-from PairTrading.util.read import readFromJson, getRecentlyClosed, getTradingRecord, getPairsFromTrainingJson
-from PairTrading.util.write import writeToJson, dumpRecentlyClosed, dumpTradingRecord
+from lib.dataEngine.common import MarketSnapshot
+from PairTrading.util.read import readFromJson, getPairsFromTrainingJson
+from PairTrading.util.write import writeToJson
+from PairTrading.util.state import TradingStateStore
 from lib.patterns import Singleton, Base
 from PairTrading.trading.helper import PairInfoRetriever
 from authentication.auth import AlpacaAuth
@@ -10,7 +12,10 @@ from alpaca.trading.models import TradeAccount, Position, Order, Clock
 from alpaca.data.models import Quote
 
 
+from itertools import islice
+from typing import Iterator
 import os
+import time
 import logging
 import numpy as np 
 from datetime import date, datetime
@@ -21,51 +26,62 @@ logger = logging.getLogger(__name__)
 
 class TradingManager(Base, metaclass=Singleton):
     
-    def __init__(self, tradingClient:AlpacaTradingClient, dataClient:AlpacaDataClient, entryPercent:float, maxPositions:int):
+    def __init__(self, tradingClient:AlpacaTradingClient, dataClient:AlpacaDataClient, entryPercent:float, maxPositions:int, maxInFlight:int=4):
         self.tradingClient:AlpacaTradingClient = tradingClient
         self.dataClient:AlpacaDataClient = dataClient
         self.pairInfoRetriever:PairInfoRetriever = PairInfoRetriever.create(tradingClient)
+        self.stateStore:TradingStateStore = TradingStateStore.create()
         self.entryPercent:float = entryPercent
         self.maxPositions:int = maxPositions
+        # pairs whose orders are executed concurrently
+        self.maxInFlight:int = maxInFlight
+        # entry date of every opened pair, kept by the trade journal and looked up once for older pairs
+        self.entryDates:dict[tuple, date] = self.stateStore.entryDates
+        # pairs without a closed order to take the entry date from, looked up once per session
+        self.unknownEntryPairs:set[tuple] = set()
         self.openedPositions:dict[str, Position] = self.tradingClient.openedPositions
         self.clock:Clock = self.tradingClient.clock
+        # the profits of the opened pairs are logged at most once per interval
+        self.profitLogInterval:float = 60
+        self.nextProfitLog:float = 0
         
     @classmethod
-    def create(cls, alpacaAuth:AlpacaAuth, entryPercent:float, maxPositions:int):
+    def create(cls, alpacaAuth:AlpacaAuth, entryPercent:float, maxPositions:int, maxInFlight:int=4):
+        if maxInFlight < 1:
+            raise ValueError("the number of pairs in flight must be positive")
         tradingClient:AlpacaTradingClient = AlpacaTradingClient.create(alpacaAuth)
         dataClient:AlpacaDataClient = AlpacaDataClient.create(alpacaAuth)
         return cls(
             tradingClient=tradingClient,
             dataClient=dataClient,
             entryPercent=entryPercent,
-            maxPositions=maxPositions
+            maxPositions=maxPositions,
+            maxInFlight=maxInFlight
         )
         
     @property 
     def tradingRecord(self) -> dict[tuple, float]:
-        return getTradingRecord()
-    
-    @tradingRecord.setter
-    def tradingRecord(self, rec:dict[tuple, float]) -> None:
-        dumpTradingRecord(rec)
+        return self.stateStore.tradingRecord
          
-    def _getShortableQty(self, symbol:str, notionalAmount) -> float:
+    def _getShortableQty(self, symbol:str, notionalAmount, snapshot:MarketSnapshot) -> float:
         
-        latestPrice:float = self.dataClient.getLastMinute(symbol)
+        latestPrice:float = snapshot.prices.get(symbol)
+        if not latestPrice:
+            return 0
         rawQty:float = notionalAmount // latestPrice
         offset:float = (rawQty % 100) if (rawQty % 100) >= 50 else 0
         return ((rawQty // 100) * 100) + offset
     
-    def _getViableTradesNum(self, entryAmount:float, tradingPairs:dict[tuple, list]) -> int:
+    def _getViableTradesNum(self, entryAmount:float, tradingPairs:dict[tuple, list], snapshot:MarketSnapshot) -> int:
         res:int = 0
         
         for pair, _ in tradingPairs.items():
-            shortQty:float = self._getShortableQty(pair[0], entryAmount)
+            shortQty:float = self._getShortableQty(pair[0], entryAmount, snapshot)
             if shortQty:
                 res += 1 
         return res 
     
-    def _getOptimalTradingNum(self, tradingPairs, availableCash:float, openedPositions:dict[str, Position]) -> (int, float):
+    def _getOptimalTradingNum(self, tradingPairs, availableCash:float, openedPositions:dict[str, Position], snapshot:MarketSnapshot) -> (int, float):
         if availableCash <= 0:
             return (0, 0)
                
@@ -80,14 +96,14 @@ class TradingManager(Base, metaclass=Singleton):
             avgEntryAmount:float = (np.sum(openedEquities) + availableCash) // self.maxPositions
             tradingNum:int = min([
                 availableCash//avgEntryAmount, 
-                self._getViableTradesNum(avgEntryAmount, tradingPairs), 
+                self._getViableTradesNum(avgEntryAmount, tradingPairs, snapshot), 
                 self.maxPositions-len(openedPositions) if self.maxPositions-len(openedPositions) > 0 else 0
                 ])
                 
         else:
             tradingNum:int = len(tradingPairs)
             avgEntryAmount = availableCash / tradingNum
-            while tradingNum > self._getViableTradesNum(avgEntryAmount, tradingPairs) or tradingNum > self.maxPositions:
+            while tradingNum > self._getViableTradesNum(avgEntryAmount, tradingPairs, snapshot) or tradingNum > self.maxPositions:
                 tradingNum -= 1
                 avgEntryAmount = availableCash / tradingNum
                 
@@ -121,104 +137,181 @@ class TradingManager(Base, metaclass=Singleton):
         availableCash:float = (min(float(tradingAccount.equity), float(tradingAccount.cash)) * self.entryPercent - totalPosition) / 2
         logger.info(f"available cash: ${round(availableCash, 2)*2}")
         
-        tradeNums, notionalAmount = self._getOptimalTradingNum(tradingPairs, availableCash, self.openedPositions)          
+        # one batched price request serves both position sizing and order quantities
+        snapshot:MarketSnapshot = self.dataClient.getMarketSnapshot([pair[0] for pair in tradingPairs.keys()])
+        tradeNums, notionalAmount = self._getOptimalTradingNum(tradingPairs, availableCash, self.openedPositions, snapshot)          
         if tradeNums < 1:
             logger.info("No more trades can be placed currently")
             return 
             
-        tradingRecord:dict[tuple, float] = self.tradingRecord
-        pairsList:list[tuple] = list(tradingPairs.keys())
+        trainedPairs:dict[tuple, float] = self.pairInfoRetriever.trainedPairs
+        candidates:Iterator[tuple] = iter(tradingPairs.keys())
         executedTrades:int = 0
-        for pair in pairsList:
-            if executedTrades >= tradeNums:
+        # pairs are opened concurrently in waves, the pairs that fail are replaced by the next candidates
+        while executedTrades < tradeNums:
+            wave:list[tuple] = list(islice(candidates, int(tradeNums - executedTrades)))
+            if not wave:
                 break
-            try:
-                shortOrder, longOrder = self.tradingClient.openArbitragePositions(
-                    stockPair=(pair[0], pair[1]), 
-                    shortQty=self._getShortableQty(pair[0], notionalAmount)
-                )           
-                tradingRecord[pair] = self.pairInfoRetriever.trainedPairs[pair]
+            results:list = self.tradingClient.openManyArbitragePositions(
+                [(pair, self._getShortableQty(pair[0], notionalAmount, snapshot)) for pair in wave], 
+                maxInFlight=self.maxInFlight
+            )
+            for pair, result in zip(wave, results):
+                if isinstance(result, UnpairedLegError):
+                    # the short leg stays open, it is closed again by closeUnpairedLegs
+                    self.stateStore.addUnpairedLeg(pair, result.symbol, result.orders)
+                    logger.error(f"{result}, recorded as unpaired leg")
+                    continue
+                if isinstance(result, Exception):
+                    logger.warning(f"{pair[0]} - {pair[1]}: failed to open pair position ({result})")
+                    continue
+                self.stateStore.openPair(pair, trainedPairs[pair], result)
+                self.entryDates[pair] = result[0].submitted_at.date()
                 logger.info(f"short {pair[0]} long {pair[1]} pair position opened")
-                self.tradingRecord = tradingRecord
                 executedTrades += 1
-            except Exception:
-                continue
             
         if executedTrades > 0:
             self.openedPositions = self.tradingClient.openedPositions
         
             
         
-    def _getLatestProfit(self, position:Position, is_short:bool) -> float:        
-        quote:Quote = self.dataClient.getLatestQuote(position.symbol)
-        if is_short:
-            return (float(position.avg_entry_price) - quote.ask_price) / float(position.avg_entry_price)
-        else:
-            return (quote.bid_price - float(position.avg_entry_price)) / float(position.avg_entry_price)
-            
-                         
+    def _getEntryDates(self, pairs:list[tuple]) -> list[date]:
+        """
+            the entry date is None for a pair without a closed order, its time based exit is skipped
+        """
+        for pair in pairs:
+            if pair not in self.entryDates and pair not in self.unknownEntryPairs:
+                # pairs opened before this session, the latest closed order of the pair is the entry
+                orders:list[Order] = self.tradingClient.getOrders(pair)
+                if not orders:
+                    self.unknownEntryPairs.add(pair)
+                    logger.warning(f"{pair[0]} <-> {pair[1]}: no closed orders found, the pair is not closed by its holding time")
+                    continue
+                self.entryDates[pair] = orders[0].submitted_at.date()
+        return [self.entryDates.get(pair) for pair in pairs]
                          
-    def _getCloseablePairs(self, openedPositions:dict[str, Position]) -> list[tuple]:
-        updateLogTime:bool = (datetime.now() - self.clock.timestamp.replace(tzinfo=None)).total_seconds() >= 60
-        res:list[tuple] = []        
-        openedPairs:dict[tuple, float] = self.tradingRecord     
+    def _getCloseablePairs(self, openedPositions:dict[str, Position], pairs:set[tuple]=None, quotes:dict[str, Quote]=None) -> list[tuple]:
+        """
+            exit check of the opened pairs, restricted to the given pairs when an event only touched some of them.
+            legs without a given quote are priced from one batched quote request and the exit
+            conditions are evaluated for all pairs at once
+        """
+        updateLogTime:bool = time.monotonic() >= self.nextProfitLog
+        tradingRecord:dict[tuple, float] = self.tradingRecord 
         openedPairsPositions:dict[tuple, list] = self.pairInfoRetriever.getCurrentlyOpenedPairs(
-            pairs=openedPairs, 
+            pairs=tradingRecord, 
             openedPositions=openedPositions)    
-        tradingRecord:dict[tuple, float] = self.tradingRecord 
         
         if not openedPairsPositions:
             logger.info("No pairs opened")
             return
+        if pairs is not None:
+            openedPairsPositions = {pair: positions for pair, positions in openedPairsPositions.items() if pair in pairs}
+        if not openedPairsPositions:
+            return []
         
-        for pair, positions in openedPairsPositions.items():
-            
-            currProfit:float = (self._getLatestProfit(positions[0], True) + self._getLatestProfit(positions[1], False)) / 2
-            ordersList:list[Order] = self.tradingClient.getOrders(pair)
-            daysElapsed:int = (date.today() - ordersList[0].submitted_at.date()).days
-            
-            if updateLogTime:
+        quotes = dict(quotes or {})
+        missing:list[str] = [symbol for pair in openedPairsPositions.keys() for symbol in pair if symbol not in quotes]
+        if missing:
+            # one sided rest quotes cannot price an exit either, like the streamed ones they are dropped
+            quotes.update({
+                symbol: quote for symbol, quote in self.dataClient.getLatestQuotes(missing).items() 
+                if quote.bid_price and quote.ask_price
+            })
+        unpriced:list[tuple] = [pair for pair in openedPairsPositions.keys() if pair[0] not in quotes or pair[1] not in quotes]
+        if unpriced:
+            logger.info(f"{len(unpriced)} pairs without a two sided quote are checked on the next pass")
+            openedPairsPositions = {pair: positions for pair, positions in openedPairsPositions.items() if pair not in unpriced}
+        if not openedPairsPositions:
+            return []
+        
+        pairsList:list[tuple] = list(openedPairsPositions.keys())
+        shortEntry:np.ndarray = np.array([float(positions[0].avg_entry_price) for positions in openedPairsPositions.values()])
+        longEntry:np.ndarray = np.array([float(positions[1].avg_entry_price) for positions in openedPairsPositions.values()])
+        shortAsk:np.ndarray = np.array([quotes[pair[0]].ask_price for pair in pairsList], dtype=float)
+        longBid:np.ndarray = np.array([quotes[pair[1]].bid_price for pair in pairsList], dtype=float)
+        exitProfits:np.ndarray = np.array([tradingRecord[pair] for pair in pairsList], dtype=float)
+        
+        today:date = date.today()
+        # a pair without an entry date never reaches the holding time
+        daysElapsed:np.ndarray = np.array([
+            (today - entryDate).days if entryDate is not None else 0 for entryDate in self._getEntryDates(pairsList)
+        ])
+        isClosing:bool = (self.clock.next_close - self.clock.timestamp).total_seconds() <= 600
+        
+        profits:np.ndarray = ((shortEntry - shortAsk) / shortEntry + (longBid - longEntry) / longEntry) / 2
+        isCloseable:np.ndarray = (profits > exitProfits) | (profits < -0.1) | ((daysElapsed > 30) & isClosing)
+        
+        if updateLogTime:
+            self.nextProfitLog = time.monotonic() + self.profitLogInterval
+            for pair, profit, days, exitProfit in zip(pairsList, profits, daysElapsed, exitProfits):
                 logger.info(
-                    f"{pair[0]}--{pair[1]}, profit: {round(currProfit*100, 2)}%, days: {daysElapsed}, exit_profit: {round(tradingRecord[pair]*100, 2)}%"
+                    f"{pair[0]}--{pair[1]}, profit: {round(profit*100, 2)}%, days: {days}, exit_profit: {round(exitProfit*100, 2)}%"
                     )
-            
-            if currProfit > tradingRecord[pair] or currProfit < -0.1:
-                res.append(pair)
-            else:                 
-                if daysElapsed > 30 and (self.clock.next_close - self.clock.timestamp).total_seconds() <= 600:
-                    res.append(pair)
-                    
-        if updateLogTime:
             print()
             print("========================================================================")
             print()
-        self.clock:Clock = self.tradingClient.clock if updateLogTime else self.clock
-        return res 
+        # event driven checks (pairs given) run against the clock the engine refreshes on its timer
+        self.clock:Clock = self.tradingClient.clock if updateLogTime and pairs is None else self.clock
+        return [pair for pair, closeable in zip(pairsList, isCloseable) if closeable]
+    
+    def closeUnpairedLegs(self) -> bool:
+        """
+            closes the legs that were left open without the other leg of their pair,
+            returns whether any of them was closed
+        """
+        unpairedLegs:dict[str, tuple] = self.stateStore.unpairedLegs
+        if not unpairedLegs:
+            return False
+        # the account is read first, a leg opened a moment ago may be missing from the held positions
+        openedPositions:dict[str, Position] = self.tradingClient.openedPositions
+        closed:bool = False
+        for symbol, pair in unpairedLegs.items():
+            if symbol not in openedPositions:
+                self.stateStore.closeUnpairedLeg(symbol)
+                logger.info(f"{symbol}: unpaired leg of {pair[0]} <-> {pair[1]} is no longer held")
+                continue
+            try:
+                order:Order = self.tradingClient.closePosition(symbol)
+            except Exception as ex:
+                logger.error(f"{symbol}: unpaired leg of {pair[0]} <-> {pair[1]} is still open ({ex})")
+                continue
+            self.stateStore.closeUnpairedLeg(symbol, order)
+            logger.info(f"{symbol}: unpaired leg of {pair[0]} <-> {pair[1]} closed")
+            closed = True
+        self.openedPositions = self.tradingClient.openedPositions if closed else openedPositions
+        return closed
     
-    def closePositions(self) -> bool:        
-        closeablePairs:list[tuple] = self._getCloseablePairs(self.openedPositions)
+    def closePositions(self, pairs:set[tuple]=None, quotes:dict[str, Quote]=None) -> bool:        
+        if pairs is None:
+            self.closeUnpairedLegs()
+        closeablePairs:list[tuple] = self._getCloseablePairs(self.openedPositions, pairs, quotes)
         
         if not closeablePairs:
             logger.info("no closeable pairs detected currently ...")
             return False
         
-        tradingRecord:dict[tuple, float] = self.tradingRecord
-        recentlyClosed:dict[str, date] = self.pairInfoRetriever.recentlyClosedPositions
-        
         tradesExecuted:int = 0
-        for pair in closeablePairs:
-            order1, order2 = self.tradingClient.closeArbitragePositions(pair)
+        results:list = self.tradingClient.closeManyArbitragePositions(closeablePairs, maxInFlight=self.maxInFlight)
+        for pair, result in zip(closeablePairs, results):
+            if isinstance(result, UnpairedLegError):
+                # one leg is closed, the pair cannot be checked anymore and the open leg is closed on its own
+                self.stateStore.closePair(pair, result.orders, unpairedSymbol=result.symbol)
+                self.entryDates.pop(pair, None)
+                logger.error(f"{result}, recorded as unpaired leg")
+                tradesExecuted += 1
+                continue
+            if isinstance(result, Exception):
+                # nothing was closed, the pair stays on record and is checked again
+                logger.error(f"{pair[0]} <-> {pair[1]}: failed to close pair position ({result})")
+                continue
             tradesExecuted += 1
-            del tradingRecord[pair]
-            recentlyClosed[order1.symbol] = order1.submitted_at.date()
-            recentlyClosed[order2.symbol] = order2.submitted_at.date()       
-            self.tradingRecord = tradingRecord
-            logger.info(f"recently closed: {list(recentlyClosed.keys())}")
-            self.pairInfoRetriever.recentlyClosedPositions = recentlyClosed      
-
+            self.stateStore.closePair(pair, result)
+            self.entryDates.pop(pair, None)
             logger.info(f"closed {pair[0]} <-> {pair[1]} pair position.")
             
         if tradesExecuted > 0:
+            logger.info(f"recently closed: {list(self.pairInfoRetriever.recentlyClosedPositions.keys())}")
             self.openedPositions = self.tradingClient.openedPositions
         return True
         
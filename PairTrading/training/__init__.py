@@ -1,4 +1,5 @@
 from .pipeline import *
+from .clustermodel import *
 
 
         
\ No newline at end of file
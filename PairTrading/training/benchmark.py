@@ -0,0 +1,65 @@
+"""
+    compares the exact and the sparse clustering modes on synthetic feature matrices shaped like the
+    training data (48 momentums + 65 firm characteristics).
+
+        python -m PairTrading.training.benchmark --sizes 2500 10000 50000 --exact-max 10000
+
+    the exact mode keeps a condensed n^2 / 2 distance matrix, sizes above --exact-max only run the sparse mode
+"""
+from PairTrading.training.pipeline import Clustering, ClusteringMode
+
+from sklearn.metrics import adjusted_rand_score
+from pandas import DataFrame
+import numpy as np
+
+import argparse
+import time
+
+
+def makeFeatures(numRows:int, numFeatures:int=113, numGroups:int=None, seed:int=0) -> np.ndarray:
+    # stocks scattered around group centres with heavy tailed noise, roughly like real characteristics
+    rng:np.random.Generator = np.random.default_rng(seed)
+    numGroups = numGroups or max(numRows // 50, 2)
+    centres:np.ndarray = rng.normal(size=(numGroups, numFeatures))
+    groups:np.ndarray = rng.integers(0, numGroups, size=numRows)
+    return centres[groups] + 0.5 * rng.standard_t(df=4, size=(numRows, numFeatures))
+
+
+def runMode(scaledData:np.ndarray, mode:ClusteringMode, distanceThreshold:float, maxComponentSize:int) -> (np.ndarray, float):
+    start:float = time.perf_counter()
+    labels:np.ndarray = Clustering.fitPredict(scaledData, mode, distanceThreshold, maxComponentSize)
+    return labels, time.perf_counter() - start
+
+
+def main() -> None:
+    parser:argparse.ArgumentParser = argparse.ArgumentParser(description="exact vs sparse clustering benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2500, 10000, 50000])
+    parser.add_argument("--exact-max", type=int, default=10000, help="largest size the exact mode is run on")
+    parser.add_argument("--max-component", type=int, default=10000, help="largest component the sparse mode clusters exactly")
+    parser.add_argument("--threshold", type=float, default=0.3)
+    args = parser.parse_args()
+
+    rows:list[dict] = []
+    for size in args.sizes:
+        scaledData:np.ndarray = Clustering.buildDataPipeline().fit_transform(makeFeatures(size))
+        labels:dict[ClusteringMode, np.ndarray] = {}
+        for mode in ClusteringMode:
+            if mode == ClusteringMode.EXACT and size > args.exact_max:
+                print(f"{size:>6} {mode.value:>6}: skipped, needs ~{size * size * 4 / 1e9:.1f} GB of pairwise distances")
+                continue
+            labels[mode], seconds = runMode(scaledData, mode, args.threshold, args.max_component)
+            rows.append({
+                "rows": size,
+                "mode": mode.value,
+                "seconds": round(seconds, 2),
+                "clusters": len(np.unique(labels[mode])),
+                "ari_vs_exact": round(adjusted_rand_score(labels[ClusteringMode.EXACT], labels[mode]), 3) \
+                    if ClusteringMode.EXACT in labels else np.nan
+            })
+            print(f"{size:>6} {mode.value:>6}: {seconds:.2f}s, {rows[-1]['clusters']} clusters")
+
+    print(DataFrame(rows).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+from sklearn.pipeline import Pipeline
+from lib.patterns.base import Base
+
+from pandas import DataFrame, Series
+import numpy as np
+import joblib
+import os
+
+
+class ClusterModel(Base):
+    """
+        fitted preprocessing pipeline and cluster summary of a training run, used to attach stocks
+        to the existing clusters without reclustering. every cluster keeps the mean of its members'
+        unit vectors, its dot product with a stock's unit vector is one minus the average cosine
+        distance to the members, the same distance the average linkage merges on. the market returns
+        of the training universe are kept so idiovol of new stocks is measured against the same market,
+        and the stocks without features are kept so they are not fetched again until the next training
+    """
+
+    def __init__(self, dataPipeline:Pipeline, columns:list[str], clusterIds:np.ndarray, centroids:np.ndarray, distanceThreshold:float):
+        self.dataPipeline:Pipeline = dataPipeline
+        self.columns:list[str] = columns
+        self.clusterIds:np.ndarray = clusterIds
+        self.centroids:np.ndarray = centroids
+        self.distanceThreshold:float = distanceThreshold
+        self.marketReturns:Series = None
+        # stocks of the training universe left out of the clusters and stocks that failed assignment since
+        self.unassignable:set[str] = set()
+
+    @classmethod
+    def create(cls, dataPipeline:Pipeline, columns:list[str], scaledData:np.ndarray, labels:np.ndarray, distanceThreshold:float):
+        clusterIds, inverse = np.unique(labels, return_inverse=True)
+        centroids:np.ndarray = np.zeros((len(clusterIds), scaledData.shape[1]))
+        np.add.at(centroids, inverse, cls._normalize(scaledData))
+        centroids /= np.bincount(inverse)[:, None]
+        return cls(dataPipeline, list(columns), clusterIds, centroids, distanceThreshold)
+
+    @staticmethod
+    def _normalize(data:np.ndarray) -> np.ndarray:
+        norms:np.ndarray = np.linalg.norm(data, axis=1, keepdims=True)
+        return data / np.where(norms > 0, norms, 1)
+
+    def save(self, path:str="saveddata/cluster_model.joblib") -> None:
+        tmpPath:str = f"{path}.tmp"
+        joblib.dump(self, tmpPath)
+        os.replace(tmpPath, path)
+
+    @classmethod
+    def load(cls, path:str="saveddata/cluster_model.joblib"):
+        model = joblib.load(path)
+        if not isinstance(model, cls):
+            raise ValueError(f"{path} does not hold a cluster model")
+        # models saved before the market returns were kept
+        model.marketReturns = getattr(model, "marketReturns", None)
+        model.unassignable = getattr(model, "unassignable", set())
+        return model
+
+    def getDistances(self, inputData:DataFrame) -> np.ndarray:
+        """
+            (stock x cluster) average cosine distance of every stock to the members of every cluster
+        """
+        # the pipeline was fitted on this column order, missing features are zero like in training
+        scaledData:np.ndarray = self.dataPipeline.transform(inputData.reindex(columns=self.columns, fill_value=0))
+        return 1 - self._normalize(scaledData) @ self.centroids.T
+
+    def assign(self, inputData:DataFrame, nextId:int=None) -> DataFrame:
+        """
+            attaches every stock to the closest existing cluster. stocks that are not within the
+            threshold of any cluster would not have been merged in training and get their own cluster,
+            numbered from nextId (pass the next free id of the current assignment, the model does not
+            know the ids given out since training)
+        """
+        distances:np.ndarray = self.getDistances(inputData)
+        nearest:np.ndarray = distances.argmin(axis=1)
+        isWithin:np.ndarray = distances[np.arange(len(nearest)), nearest] < self.distanceThreshold
+
+        clusterIds:np.ndarray = self.clusterIds[nearest]
+        nextId = max(nextId or 0, int(self.clusterIds.max()) + 1 if len(self.clusterIds) else 0)
+        clusterIds[~isWithin] = np.arange(nextId, nextId + (~isWithin).sum())
+
+        res = DataFrame(clusterIds, index=inputData.index, columns=["cluster_id"])
+        res["momentum"] = inputData["m47"]
+        return res
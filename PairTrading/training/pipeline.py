@@ -1,39 +1,220 @@
-from sklearn.pipeline import Pipeline 
+from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
-from sklearn.decomposition import PCA
+from sklearn.decomposition import PCA, IncrementalPCA
 from sklearn.cluster import AgglomerativeClustering
+from sklearn.neighbors import kneighbors_graph, radius_neighbors_graph
 
 from lib.patterns.singleton import Singleton
+from PairTrading.training.clustermodel import ClusterModel
 
-from pandas import DataFrame
+from pandas import DataFrame, Series, read_csv, concat
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+from enum import Enum
+from typing import Iterator
 import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ClusteringMode(str, Enum):
+    # full pairwise average linkage, quadratic in memory and time
+    EXACT = "exact"
+    # average linkage run separately on the components of the sparse graph of pairs within the threshold
+    SPARSE = "sparse"
+
+
+class PCASolver(str, Enum):
+    # exact svd of the whole standardized matrix
+    FULL = "full"
+    # randomized svd of at most maxComponents components, still in memory
+    RANDOMIZED = "randomized"
+    # scaler and pca fitted chunk by chunk, the input can be streamed from a csv file
+    INCREMENTAL = "incremental"
+
 
 class Clustering(metaclass=Singleton):
-    
-    def __init__(self, inputData:DataFrame):
+
+    def __init__(
+        self,
+        inputData:DataFrame,
+        mode:ClusteringMode=ClusteringMode.EXACT,
+        distanceThreshold:float=0.3,
+        maxComponentSize:int=10000,
+        pcaSolver:PCASolver=PCASolver.FULL,
+        targetVariance:float=0.99,
+        maxComponents:int=None,
+        chunkSize:int=5000
+    ):
+        # either the feature matrix or the path of a csv holding it, which is read in chunks
         self.inputData:DataFrame = inputData
-        self.dataPipeline:Pipeline = Pipeline([
+        self.mode:ClusteringMode = ClusteringMode(mode)
+        self.distanceThreshold:float = distanceThreshold
+        self.maxComponentSize:int = maxComponentSize
+        self.pcaSolver:PCASolver = PCASolver(pcaSolver)
+        self.targetVariance:float = targetVariance
+        self.chunkSize:int = chunkSize
+        self.dataPipeline:Pipeline = self.buildDataPipeline(self.pcaSolver, targetVariance, maxComponents)
+        # fitted pipeline and centroids of the last run
+        self.model:ClusterModel = None
+        self.explainedVariance:float = None
+        self.columns:list[str] = None
+        self.momentum:Series = None
+
+    @staticmethod
+    def buildDataPipeline(pcaSolver:PCASolver=PCASolver.FULL, targetVariance:float=0.99, maxComponents:int=None) -> Pipeline:
+        """
+            the full solver keeps the components reaching targetVariance directly, the other solvers fit
+            maxComponents components (all of them when None) and are truncated to the target afterwards
+        """
+        pca:PCA
+        if PCASolver(pcaSolver) == PCASolver.RANDOMIZED:
+            pca = PCA(n_components=maxComponents, svd_solver="randomized", random_state=0)
+        elif PCASolver(pcaSolver) == PCASolver.INCREMENTAL:
+            pca = IncrementalPCA(n_components=maxComponents)
+        else:
+            pca = PCA(n_components=targetVariance)
+        return Pipeline([
             ("scaler", StandardScaler()),
-            ("pca", PCA(n_components=0.99)),
-        ])
-        self.trainingPipeline:Pipeline = Pipeline([
-            ("agglomerative_clustering", 
-             AgglomerativeClustering(n_clusters=None, affinity="cosine", linkage="average", distance_threshold=0.3))
+            ("pca", pca),
         ])
-        
+
+    @staticmethod
+    def truncateComponents(pca:PCA, targetVariance:float) -> float:
+        """
+            drops the trailing components that are not needed to reach targetVariance,
+            returns the explained variance ratio that is kept
+        """
+        cumulative:np.ndarray = np.cumsum(pca.explained_variance_ratio_)
+        numComponents:int = min(int(np.searchsorted(cumulative, targetVariance)) + 1, len(cumulative))
+        for attribute in ("components_", "explained_variance_", "explained_variance_ratio_", "singular_values_"):
+            setattr(pca, attribute, getattr(pca, attribute)[:numComponents])
+        pca.n_components = pca.n_components_ = numComponents
+        return float(cumulative[numComponents - 1])
+
+    @staticmethod
+    def _buildAgglomerativeClustering(distanceThreshold:float, connectivity:csr_matrix=None) -> AgglomerativeClustering:
+        return AgglomerativeClustering(
+            n_clusters=None,
+            metric="cosine",
+            linkage="average",
+            distance_threshold=distanceThreshold,
+            connectivity=connectivity
+        )
+
+    @classmethod
+    def fitPredictSparse(cls, scaledData:np.ndarray, distanceThreshold:float=0.3, maxComponentSize:int=10000, nNeighbors:int=30) -> np.ndarray:
+        """
+            average linkage only merges two clusters when some pair across them is closer than the
+            threshold, so every cluster lies within one connected component of the graph of such
+            pairs. clustering the components one by one gives the exact mode's clusters while memory
+            grows with the largest component instead of the universe. components above
+            maxComponentSize are linked along a k-nearest-neighbour graph, which is approximate
+        """
+        graph:csr_matrix = radius_neighbors_graph(scaledData, radius=distanceThreshold, metric="cosine", mode="connectivity")
+        numComponents, components = connected_components(graph, directed=False)
+
+        labels:np.ndarray = np.empty(len(scaledData), dtype=int)
+        order:np.ndarray = np.argsort(components, kind="stable")
+        bounds:np.ndarray = np.cumsum(np.bincount(components, minlength=numComponents))[:-1]
+        nextLabel:int = 0
+        for members in np.split(order, bounds):
+            # a pair within the threshold always merges, larger components need the linkage
+            if len(members) <= 2:
+                labels[members] = nextLabel
+                nextLabel += 1
+                continue
+
+            connectivity:csr_matrix = None
+            if len(members) > maxComponentSize:
+                logger.warning(f"component of {len(members)} stocks exceeds {maxComponentSize}, clustering it along a {nNeighbors}-nearest-neighbour graph")
+                connectivity = kneighbors_graph(scaledData[members], n_neighbors=min(nNeighbors, len(members) - 1), metric="cosine")
+            componentLabels:np.ndarray = cls._buildAgglomerativeClustering(distanceThreshold, connectivity).fit_predict(scaledData[members])
+            labels[members] = componentLabels + nextLabel
+            nextLabel += componentLabels.max() + 1
+        return labels
+
+    @classmethod
+    def fitPredict(
+        cls,
+        scaledData:np.ndarray,
+        mode:ClusteringMode=ClusteringMode.EXACT,
+        distanceThreshold:float=0.3,
+        maxComponentSize:int=10000
+    ) -> np.ndarray:
+        """
+            both modes cut the average cosine linkage tree at distanceThreshold
+        """
+        if ClusteringMode(mode) == ClusteringMode.SPARSE:
+            return cls.fitPredictSparse(scaledData, distanceThreshold, maxComponentSize)
+        return cls._buildAgglomerativeClustering(distanceThreshold).fit_predict(scaledData)
+
+    def _readChunks(self, path:str) -> Iterator[DataFrame]:
+        # a short trailing chunk is merged into the one before, incremental pca needs at least
+        # as many rows per batch as it keeps components
+        previous:DataFrame = None
+        for chunk in read_csv(path, index_col=0, chunksize=self.chunkSize):
+            if previous is not None and len(chunk) < self.chunkSize:
+                chunk = concat([previous, chunk])
+            elif previous is not None:
+                yield previous
+            previous = chunk
+        if previous is not None:
+            yield previous
+
+    def _processFeaturesFromFile(self, path:str) -> DataFrame:
+        """
+            three passes over the csv: scaler statistics, incremental pca and projection. only one
+            chunk of the standardized matrix is held at a time
+        """
+        scaler:StandardScaler = self.dataPipeline.named_steps["scaler"]
+        pca:IncrementalPCA = self.dataPipeline.named_steps["pca"]
+        for chunk in self._readChunks(path):
+            scaler.partial_fit(chunk)
+        for chunk in self._readChunks(path):
+            pca.partial_fit(scaler.transform(chunk))
+        self.explainedVariance = self.truncateComponents(pca, self.targetVariance)
+
+        projections:list[DataFrame] = []
+        momentums:list[Series] = []
+        for chunk in self._readChunks(path):
+            projections.append(DataFrame(self.dataPipeline.transform(chunk), index=chunk.index))
+            momentums.append(chunk["m47"])
+            self.columns = list(chunk.columns)
+        self.momentum = concat(momentums)
+        return concat(projections)
+
     def _processFeatures(self, inputData:DataFrame) -> DataFrame:
+        if isinstance(inputData, str):
+            if self.pcaSolver != PCASolver.INCREMENTAL:
+                raise ValueError("only the incremental pca solver reads the features from disk")
+            return self._processFeaturesFromFile(inputData)
+
         processedData:np.array = self.dataPipeline.fit_transform(inputData)
+        pca:PCA = self.dataPipeline.named_steps["pca"]
+        if self.pcaSolver == PCASolver.FULL:
+            self.explainedVariance = float(pca.explained_variance_ratio_.sum())
+        else:
+            self.explainedVariance = self.truncateComponents(pca, self.targetVariance)
+            processedData = processedData[:, :pca.n_components_]
+        self.columns = list(inputData.columns)
+        self.momentum = inputData["m47"]
         return DataFrame(processedData, index=inputData.index)
-    
+
     def _train_predict(self, scaledData:DataFrame) -> DataFrame:
-        predictionNP:np.array = self.trainingPipeline.fit_predict(scaledData)
+        predictionNP:np.array = self.fitPredict(scaledData.to_numpy(), self.mode, self.distanceThreshold, self.maxComponentSize)
         res = DataFrame(predictionNP, index=scaledData.index, columns=["cluster_id"])
-        res["momentum"] = self.inputData["m47"]
-        
+        res["momentum"] = self.momentum
+
+        self.model = ClusterModel.create(self.dataPipeline, self.columns, scaledData.to_numpy(), predictionNP, self.distanceThreshold)
         return res
-    
+
     def run(self) -> DataFrame:
-        return self._train_predict(
-            self._processFeatures(self.inputData)
-        )
-        
\ No newline at end of file
+        scaledData:DataFrame = self._processFeatures(self.inputData)
+        pca:PCA = self.dataPipeline.named_steps["pca"]
+        logger.info(f"{self.pcaSolver.value} pca keeps {pca.n_components_} components explaining {self.explainedVariance:.2%} of the variance")
+        if self.explainedVariance < self.targetVariance:
+            logger.warning(f"explained variance {self.explainedVariance:.2%} is below the target {self.targetVariance:.2%}, raise maxComponents")
+        return self._train_predict(scaledData)
+
@@ -1,3 +1,5 @@
 from .read import * 
 from .write import *
-from .clean import *
\ No newline at end of file
+from .clean import *
+from .journal import *
+from .state import *
@@ -1,25 +1,18 @@
-from PairTrading.util.read import getRecentlyClosed
-from PairTrading.util.write import dumpRecentlyClosed
+from PairTrading.util.state import TradingStateStore
 
-from datetime import datetime, date 
+from datetime import date, timedelta
 import logging 
 
 logger = logging.getLogger(__name__)
 
 
 def cleanClosedTrades() -> None:    
-    closedTrades:dict[str, date] = getRecentlyClosed()
-    if not closedTrades:
+    store:TradingStateStore = TradingStateStore.create()
+    if not store.recentlyClosed:
         logger.info("There are no trades that were closed less than 31 days ago")
         return 
-    today:date = date.today()
     
-    delNum:int = 0
-    for symbol, time in closedTrades.items():
-        if (today - time).days > 31:
-            del closedTrades[symbol]
-            delNum += 1
-            
-    dumpRecentlyClosed(closedTrades)
+    # symbols closed more than 31 days ago can be traded again
+    delNum:int = store.releaseClosedBefore(date.today() - timedelta(days=31))
     logger.info(f"{delNum} past trading records removed")
-    
\ No newline at end of file
+    
@@ -0,0 +1,234 @@
+from lib.patterns import Singleton, Base
+
+from alpaca.trading.models import Order
+
+from pandas import DataFrame, read_sql_query
+from datetime import datetime, date, timedelta
+import threading
+import sqlite3
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class TradeJournal(Base, metaclass=Singleton):
+    """
+        sqlite trade journal in wal mode: opened pairs with their exit profits, order fills, closed
+        trades and cooldowns. every change is one small transaction instead of a rewrite of a whole
+        file, and the closed trades and fills stay queryable by symbol and date
+    """
+
+    SCHEMA_VERSION:int = 1
+    SCHEMA:str = """
+        CREATE TABLE IF NOT EXISTS open_pairs (
+            short_symbol TEXT NOT NULL,
+            long_symbol TEXT NOT NULL,
+            exit_profit REAL NOT NULL,
+            opened_at TEXT,
+            PRIMARY KEY (short_symbol, long_symbol)
+        );
+        CREATE INDEX IF NOT EXISTS open_pairs_long_symbol ON open_pairs (long_symbol);
+
+        CREATE TABLE IF NOT EXISTS fills (
+            order_id TEXT PRIMARY KEY,
+            short_symbol TEXT NOT NULL,
+            long_symbol TEXT NOT NULL,
+            action TEXT NOT NULL,
+            symbol TEXT NOT NULL,
+            side TEXT,
+            qty REAL,
+            price REAL,
+            submitted_at TEXT NOT NULL,
+            filled_at TEXT
+        );
+        CREATE INDEX IF NOT EXISTS fills_symbol ON fills (symbol, submitted_at);
+        CREATE INDEX IF NOT EXISTS fills_submitted_at ON fills (submitted_at);
+
+        CREATE TABLE IF NOT EXISTS closed_trades (
+            id INTEGER PRIMARY KEY,
+            short_symbol TEXT NOT NULL,
+            long_symbol TEXT NOT NULL,
+            exit_profit REAL,
+            opened_at TEXT,
+            closed_at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS closed_trades_short_symbol ON closed_trades (short_symbol, closed_at);
+        CREATE INDEX IF NOT EXISTS closed_trades_long_symbol ON closed_trades (long_symbol, closed_at);
+        CREATE INDEX IF NOT EXISTS closed_trades_closed_at ON closed_trades (closed_at);
+
+        CREATE TABLE IF NOT EXISTS cooldowns (
+            symbol TEXT PRIMARY KEY,
+            closed_on TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS cooldowns_closed_on ON cooldowns (closed_on);
+
+        CREATE TABLE IF NOT EXISTS unpaired_legs (
+            symbol TEXT PRIMARY KEY,
+            short_symbol TEXT NOT NULL,
+            long_symbol TEXT NOT NULL,
+            since TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, path:str="saveddata/trading.db"):
+        self.path:str = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # one connection shared by the trading threads, the lock serializes its use
+        self.connection:sqlite3.Connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock:threading.Lock = threading.Lock()
+        self.isNew:bool = self._initSchema()
+
+    @classmethod
+    def create(cls, path:str="saveddata/trading.db"):
+        return cls(path)
+
+    def _initSchema(self) -> bool:
+        """
+            returns whether the journal is new, the schema version is only set once it was migrated into
+        """
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        # with wal a commit survives a crash of the process, only a power loss can drop the last ones
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        version:int = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version > self.SCHEMA_VERSION:
+            raise ValueError(f"{self.path} has schema version {version}, newer than {self.SCHEMA_VERSION}")
+        with self.connection:
+            self.connection.executescript(self.SCHEMA)
+        return version == 0
+
+    @staticmethod
+    def _toText(value) -> str:
+        return value.isoformat() if isinstance(value, (datetime, date)) else value
+
+    @classmethod
+    def getFill(cls, order:Order, pair:tuple, action:str) -> dict:
+        return {
+            "order_id": str(order.id),
+            "short_symbol": pair[0],
+            "long_symbol": pair[1],
+            "action": action,
+            "symbol": order.symbol,
+            "side": getattr(order.side, "value", order.side),
+            "qty": float(order.filled_qty) if order.filled_qty else None,
+            "price": float(order.filled_avg_price) if order.filled_avg_price else None,
+            "submitted_at": cls._toText(order.submitted_at),
+            "filled_at": cls._toText(order.filled_at),
+        }
+
+    def _execute(self, entry:dict) -> None:
+        op:str = entry["op"]
+        if op == "open":
+            self.connection.execute(
+                "INSERT OR REPLACE INTO open_pairs VALUES (?, ?, ?, ?)",
+                (*entry["pair"], entry["exit_profit"], self._toText(entry.get("opened_at")))
+            )
+        elif op == "close":
+            if entry.get("closed_at") is not None:
+                self.connection.execute(
+                    """
+                        INSERT INTO closed_trades (short_symbol, long_symbol, exit_profit, opened_at, closed_at)
+                        SELECT short_symbol, long_symbol, exit_profit, opened_at, ? FROM open_pairs
+                        WHERE short_symbol = ? AND long_symbol = ?
+                    """,
+                    (self._toText(entry["closed_at"]), *entry["pair"])
+                )
+            self.connection.execute("DELETE FROM open_pairs WHERE short_symbol = ? AND long_symbol = ?", tuple(entry["pair"]))
+        elif op == "cooldown":
+            self.connection.execute("INSERT OR REPLACE INTO cooldowns VALUES (?, ?)", (entry["symbol"], self._toText(entry["date"])))
+        elif op == "release":
+            self.connection.execute("DELETE FROM cooldowns WHERE symbol = ?", (entry["symbol"],))
+        elif op == "unpair":
+            self.connection.execute(
+                "INSERT OR REPLACE INTO unpaired_legs VALUES (?, ?, ?, ?)",
+                (entry["symbol"], *entry["pair"], self._toText(entry["since"]))
+            )
+        elif op == "closeleg":
+            self.connection.execute("DELETE FROM unpaired_legs WHERE symbol = ?", (entry["symbol"],))
+
+        fills:list[dict] = entry.get("fills", [])
+        if fills:
+            self.connection.executemany(
+                """
+                    INSERT OR REPLACE INTO fills VALUES
+                    (:order_id, :short_symbol, :long_symbol, :action, :symbol, :side, :qty, :price, :submitted_at, :filled_at)
+                """,
+                fills
+            )
+
+    def apply(self, entries:list[dict]) -> None:
+        """
+            writes the changes in one transaction, see TradingStateStore for the entries
+        """
+        with self._lock, self.connection:
+            for entry in entries:
+                self._execute(entry)
+
+    def migrate(self, entries:list[dict]) -> None:
+        """
+            writes the state carried over from the json files and marks the journal as migrated in
+            the same transaction, an interrupted migration is run again on the next start
+        """
+        with self._lock, self.connection:
+            for entry in entries:
+                self._execute(entry)
+            self.connection.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+        self.isNew = False
+
+    def releaseCooldownsBefore(self, cutoff:date) -> int:
+        with self._lock, self.connection:
+            return self.connection.execute("DELETE FROM cooldowns WHERE closed_on < ?", (cutoff.isoformat(),)).rowcount
+
+    def getOpenPairs(self) -> dict[tuple, tuple[float, date]]:
+        """
+            exit profit and entry date of every opened pair, the entry date is None for migrated pairs
+        """
+        with self._lock:
+            rows:list = self.connection.execute("SELECT short_symbol, long_symbol, exit_profit, opened_at FROM open_pairs").fetchall()
+        return {
+            (short, long): (exitProfit, datetime.fromisoformat(openedAt).date() if openedAt else None)
+            for short, long, exitProfit, openedAt in rows
+        }
+
+    def getCooldowns(self) -> dict[str, date]:
+        with self._lock:
+            rows:list = self.connection.execute("SELECT symbol, closed_on FROM cooldowns").fetchall()
+        return {symbol: date.fromisoformat(closedOn) for symbol, closedOn in rows}
+
+    def getUnpairedLegs(self) -> dict[str, tuple]:
+        """
+            legs left open without the other leg of their pair, with the pair they belonged to
+        """
+        with self._lock:
+            rows:list = self.connection.execute("SELECT symbol, short_symbol, long_symbol FROM unpaired_legs").fetchall()
+        return {symbol: (short, long) for symbol, short, long in rows}
+
+    def _query(self, table:str, symbolColumns:tuple, dateColumn:str, symbol:str=None, start:date=None, end:date=None) -> DataFrame:
+        conditions:list[str] = []
+        params:list = []
+        if symbol is not None:
+            conditions.append("(" + " OR ".join(f"{column} = ?" for column in symbolColumns) + ")")
+            params += [symbol] * len(symbolColumns)
+        if start is not None:
+            conditions.append(f"{dateColumn} >= ?")
+            params.append(start.isoformat())
+        if end is not None:
+            # dates are compared as iso text, the end day is included
+            conditions.append(f"{dateColumn} < ?")
+            params.append((end + timedelta(days=1)).isoformat())
+        query:str = f"SELECT * FROM {table}" + (" WHERE " + " AND ".join(conditions) if conditions else "") + f" ORDER BY {dateColumn}"
+        with self._lock:
+            return read_sql_query(query, self.connection, params=params)
+
+    def getClosedTrades(self, symbol:str=None, start:date=None, end:date=None) -> DataFrame:
+        """
+            closed pairs, optionally those with symbol as either leg and closed between start and end
+        """
+        return self._query("closed_trades", ("short_symbol", "long_symbol"), "closed_at", symbol, start, end)
+
+    def getFills(self, symbol:str=None, start:date=None, end:date=None) -> DataFrame:
+        return self._query("fills", ("symbol",), "submitted_at", symbol, start, end)
+
+    def close(self) -> None:
+        with self._lock:
+            self.connection.close()
@@ -1,5 +1,5 @@
 import json 
-from datetime import datetime, date
+from datetime import datetime
 import logging
 import os
 
@@ -18,21 +18,6 @@ def readFromJson(filePath:str) -> dict:
         pass 
     return res if res else {}
     
-def getRecentlyClosed() -> dict[str, date]:
-    if os.path.exists(("saveddata/recently_closed.json")):
-        res:dict[str, str] = readFromJson("saveddata/recently_closed.json")
-        for symbol, submitTime in res.items():
-            res[symbol] = datetime.strptime(submitTime, "%Y-%m-%d").date()
-        return res if res else {}
-    
-def getTradingRecord() -> dict[tuple, float]:
-    if os.path.exists("saveddata/openedpairs.json"):
-        source:dict[str, float] = readFromJson("saveddata/openedpairs.json")       
-        if not source:
-            return {}
-        res:dict[tuple, float] = deserializePairData(source)
-        return res 
-    
 def getPairsFromTrainingJson() -> dict:
     if not os.path.exists("saveddata/pairs/pairs.json"):
         logger.info("pairs.json file does not exist")
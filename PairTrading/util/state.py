@@ -0,0 +1,271 @@
+from PairTrading.util.read import readFromJson
+from PairTrading.util.conversion import serializePairData, deserializePairData
+from PairTrading.util.journal import TradeJournal
+from lib.patterns import Singleton, Base
+
+from alpaca.trading.models import Order
+
+from datetime import datetime, date
+import threading
+import atexit
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class TradingStateStore(Base, metaclass=Singleton):
+    """
+        trading record (opened pairs and their exit profits) and recently closed symbols, loaded once
+        from the sqlite trade journal and served from memory. every change is committed to the journal
+        right away, a background writer exports the state to the json files, which are written
+        atomically and are not read back once the journal was migrated
+    """
+
+    def __init__(self, rootDir:str="saveddata", flushInterval:float=1.0):
+        self.rootDir:str = rootDir
+        self.flushInterval:float = flushInterval
+        self.recordPath:str = os.path.join(rootDir, "openedpairs.json")
+        self.closedPath:str = os.path.join(rootDir, "recently_closed.json")
+        # append-only json journal of earlier versions, only read by the migration
+        self.legacyJournalPath:str = os.path.join(rootDir, "state.journal")
+
+        self._lock:threading.Lock = threading.Lock()
+        self._changed:threading.Event = threading.Event()
+        self._stopped:threading.Event = threading.Event()
+        self._tradingRecord:dict[tuple, float] = {}
+        self._entryDates:dict[tuple, date] = {}
+        self._recentlyClosed:dict[str, date] = {}
+        self._unpairedLegs:dict[str, tuple] = {}
+        self.journal:TradeJournal = None
+        self._writer:threading.Thread = None
+
+    @classmethod
+    def create(cls, rootDir:str="saveddata", flushInterval:float=1.0):
+        store = cls(rootDir, flushInterval)
+        if store._writer is None:
+            store._load()
+            store._writer = threading.Thread(target=store._writeBehind, name="state-writer", daemon=True)
+            store._writer.start()
+            atexit.register(store.close)
+        return store
+
+    def _load(self) -> None:
+        self.journal = TradeJournal.create(os.path.join(self.rootDir, "trading.db"))
+        if self.journal.isNew:
+            self._migrate()
+        for pair, (exitProfit, openedAt) in self.journal.getOpenPairs().items():
+            self._tradingRecord[pair] = exitProfit
+            if openedAt is not None:
+                self._entryDates[pair] = openedAt
+        self._recentlyClosed = self.journal.getCooldowns()
+        self._unpairedLegs = self.journal.getUnpairedLegs()
+
+    def _migrate(self) -> None:
+        """
+            carries the json files, and the json journal written on top of them, over into the trade journal
+        """
+        tradingRecord:dict[tuple, float] = deserializePairData(readFromJson(self.recordPath))
+        recentlyClosed:dict[str, date] = {
+            symbol: datetime.strptime(closeDate, "%Y-%m-%d").date()
+            for symbol, closeDate in readFromJson(self.closedPath).items()
+        }
+        legacyPaths:list[str] = [f"{self.legacyJournalPath}.compacting", self.legacyJournalPath]
+        for entry in self._readLegacyJournal(legacyPaths):
+            if entry["op"] == "open":
+                tradingRecord[tuple(entry["pair"])] = entry["exit_profit"]
+            elif entry["op"] == "close":
+                tradingRecord.pop(tuple(entry["pair"]), None)
+            elif entry["op"] == "cooldown":
+                recentlyClosed[entry["symbol"]] = datetime.strptime(entry["date"], "%Y-%m-%d").date()
+            elif entry["op"] == "release":
+                recentlyClosed.pop(entry["symbol"], None)
+
+        self.journal.migrate(
+            [{"op": "open", "pair": list(pair), "exit_profit": exitProfit} for pair, exitProfit in tradingRecord.items()] + \
+            [{"op": "cooldown", "symbol": symbol, "date": closeDate} for symbol, closeDate in recentlyClosed.items()]
+        )
+        for path in legacyPaths:
+            if os.path.exists(path):
+                os.remove(path)
+        logger.info(f"trade journal migrated: {len(tradingRecord)} opened pairs, {len(recentlyClosed)} recently closed symbols")
+
+    @staticmethod
+    def _readLegacyJournal(paths:list[str]) -> list[dict]:
+        entries:list[dict] = []
+        for path in paths:
+            if not os.path.exists(path):
+                continue
+            with open(path, "r") as inFile:
+                for line in inFile:
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # only the last line can be torn by a crash while it was appended
+                        logger.warning(f"skipped a torn entry in {path}")
+        return entries
+
+    def _apply(self, entry:dict) -> None:
+        op:str = entry["op"]
+        if op == "open":
+            self._tradingRecord[tuple(entry["pair"])] = entry["exit_profit"]
+            if entry.get("opened_at") is not None:
+                self._entryDates[tuple(entry["pair"])] = entry["opened_at"].date()
+        elif op == "close":
+            self._tradingRecord.pop(tuple(entry["pair"]), None)
+            self._entryDates.pop(tuple(entry["pair"]), None)
+        elif op == "cooldown":
+            self._recentlyClosed[entry["symbol"]] = entry["date"]
+        elif op == "release":
+            self._recentlyClosed.pop(entry["symbol"], None)
+        elif op == "unpair":
+            self._unpairedLegs[entry["symbol"]] = tuple(entry["pair"])
+        elif op == "closeleg":
+            self._unpairedLegs.pop(entry["symbol"], None)
+
+    def _record(self, entries:list[dict]) -> None:
+        """
+            commits the changes to the journal and applies them to the held state
+        """
+        if not entries:
+            return
+        with self._lock:
+            self.journal.apply(entries)
+            for entry in entries:
+                self._apply(entry)
+        self._changed.set()
+
+    @property
+    def tradingRecord(self) -> dict[tuple, float]:
+        with self._lock:
+            return dict(self._tradingRecord)
+
+    @property
+    def entryDates(self) -> dict[tuple, date]:
+        """
+            entry dates of the opened pairs that were opened since the journal exists
+        """
+        with self._lock:
+            return dict(self._entryDates)
+
+    @property
+    def recentlyClosed(self) -> dict[str, date]:
+        with self._lock:
+            return dict(self._recentlyClosed)
+
+    def isRecentlyClosed(self, symbol:str) -> bool:
+        return symbol in self._recentlyClosed
+
+    @property
+    def unpairedLegs(self) -> dict[str, tuple]:
+        with self._lock:
+            return dict(self._unpairedLegs)
+
+    def openPair(self, pair:tuple, exitProfit:float, orders:tuple[Order, Order]) -> None:
+        self._record([{
+            "op": "open",
+            "pair": list(pair),
+            "exit_profit": exitProfit,
+            "opened_at": orders[0].submitted_at,
+            "fills": [TradeJournal.getFill(order, pair, "open") for order in orders],
+        }])
+
+    def closePair(self, pair:tuple, orders:tuple[Order, Order], unpairedSymbol:str=None) -> None:
+        """
+            moves the pair to the closed trades and starts the cooldown of the closed legs. a leg that
+            could not be closed is kept as unpaired until closeUnpairedLeg
+        """
+        entries:list[dict] = [{
+            "op": "close",
+            "pair": list(pair),
+            "closed_at": orders[0].submitted_at,
+            "fills": [TradeJournal.getFill(order, pair, "close") for order in orders],
+        }] + [
+            {"op": "cooldown", "symbol": order.symbol, "date": order.submitted_at.date()} for order in orders
+        ]
+        if unpairedSymbol is not None:
+            entries.append({"op": "unpair", "symbol": unpairedSymbol, "pair": list(pair), "since": orders[0].submitted_at})
+        self._record(entries)
+
+    def addUnpairedLeg(self, pair:tuple, symbol:str, orders:list[Order]) -> None:
+        """
+            a leg opened without the other one, e.g. a short whose long leg failed and could not be closed
+        """
+        self._record([{
+            "op": "unpair",
+            "symbol": symbol,
+            "pair": list(pair),
+            "since": datetime.now().astimezone(),
+            "fills": [TradeJournal.getFill(order, pair, "open") for order in orders],
+        }])
+
+    def closeUnpairedLeg(self, symbol:str, order:Order=None) -> None:
+        """
+            order is None when the leg is no longer held, e.g. it was closed by hand
+        """
+        if order is None:
+            self._record([{"op": "closeleg", "symbol": symbol}])
+            return
+        pair:tuple = self._unpairedLegs[symbol]
+        self._record([
+            {"op": "closeleg", "symbol": symbol, "fills": [TradeJournal.getFill(order, pair, "close")]},
+            {"op": "cooldown", "symbol": symbol, "date": order.submitted_at.date()},
+        ])
+
+    def releaseClosedBefore(self, cutoff:date) -> int:
+        """
+            ends the cooldown of the symbols closed before cutoff, returns how many were released
+        """
+        with self._lock:
+            released:int = self.journal.releaseCooldownsBefore(cutoff)
+            self._recentlyClosed = {symbol: closeDate for symbol, closeDate in self._recentlyClosed.items() if closeDate >= cutoff}
+        if released:
+            self._changed.set()
+        return released
+
+    @staticmethod
+    def _writeAtomic(data:dict, filePath:str) -> None:
+        tmpPath:str = f"{filePath}.tmp"
+        with open(tmpPath, "w") as outFile:
+            json.dump(data, outFile, indent=4)
+            outFile.flush()
+            os.fsync(outFile.fileno())
+        os.replace(tmpPath, filePath)
+
+    def flush(self) -> None:
+        """
+            exports the state to the json files if it changed since the last export
+        """
+        with self._lock:
+            if not self._changed.is_set():
+                return
+            self._changed.clear()
+            tradingRecord:dict[str, float] = serializePairData(self._tradingRecord)
+            recentlyClosed:dict[str, str] = {
+                symbol: closeDate.strftime("%Y-%m-%d") for symbol, closeDate in self._recentlyClosed.items()
+            }
+
+        try:
+            self._writeAtomic(tradingRecord, self.recordPath)
+            self._writeAtomic(recentlyClosed, self.closedPath)
+        except Exception as ex:
+            # the journal holds the state, the export is tried again on the next change
+            logger.error(f"failed to export the trading state ({ex})")
+
+    def _writeBehind(self) -> None:
+        while not self._stopped.is_set():
+            self._changed.wait()
+            # changes arriving within one interval are exported together
+            self._stopped.wait(self.flushInterval)
+            try:
+                self.flush()
+            except Exception as ex:
+                logger.error(f"trading state writer failed ({ex})")
+
+    def close(self) -> None:
+        self._stopped.set()
+        self._changed.set()
+        if self._writer is not None:
+            self._writer.join(timeout=10)
+        self.flush()
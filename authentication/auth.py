@@ -31,17 +31,21 @@ class AlpacaAuth(BaseAuth):
     
         
 class EodAuth(BaseAuth):
-    def __init__(self, api_key:str):
+    def __init__(self, api_key:str, baseUrl:str=None):
         super().__init__(api_key, None)
         self.configType = ConfigType.EOD
+        # optional api host, e.g. a local stub server
+        self.baseUrl:str = baseUrl
         
     @classmethod
     def create(cls, rawDict, isPaper=True):
         return cls(
-            api_key=rawDict["api_key"])
+            api_key=rawDict["api_key"],
+            baseUrl=rawDict.get("base_url"))
         
     def __str__(self):
         return str({
             "type": self.configType,
-            "api_key": self.api_key
+            "api_key": self.api_key,
+            "base_url": self.baseUrl
         })
\ No newline at end of file
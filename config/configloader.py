@@ -14,7 +14,15 @@ def configLoader(configType:CONFIG_TYPE) -> Config:
             REFRESH_DATA=configDict["refresh_data"],
             OVERWRITE_FUNDAMENTALS=configDict["overwrite_fundamentals"],
             MAXIMUM_POSITIONS=configDict["maximum_positions"],
-            IS_PAPER=configDict["is_paper"]
+            IS_PAPER=configDict["is_paper"],
+            IO_WORKERS=configDict.get("io_workers", 1),
+            CPU_WORKERS=configDict.get("cpu_workers", 1),
+            EOD_REQUESTS_PER_MINUTE=configDict.get("eod_requests_per_minute", 600),
+            CLUSTERING_MODE=configDict.get("clustering_mode", "exact"),
+            PCA_SOLVER=configDict.get("pca_solver", "full"),
+            PCA_MAX_COMPONENTS=configDict.get("pca_max_components"),
+            STREAM_URL=configDict.get("stream_url"),
+            STREAM_FEED=configDict.get("stream_feed", "sip")
         )
         
     elif configType == CONFIG_TYPE.MACD_TRADING:
@@ -13,6 +13,14 @@ class Config:
     OVERWRITE_FUNDAMENTALS: bool 
     IS_PAPER: bool 
     MAXIMUM_POSITIONS: int = 20
+    IO_WORKERS: int = 1
+    CPU_WORKERS: int = 1
+    EOD_REQUESTS_PER_MINUTE: int = 600
+    CLUSTERING_MODE: str = "exact"
+    PCA_SOLVER: str = "full"
+    PCA_MAX_COMPONENTS: int = None
+    STREAM_URL: str = None
+    STREAM_FEED: str = "sip"
     
     def __repr__(self):
         return str(asdict(self))
@@ -3,19 +3,25 @@ from alpaca.data.requests import StockBarsRequest, StockLatestQuoteRequest, Stoc
 from alpaca.data.models import Quote, Bar
 from alpaca.data.timeframe import TimeFrame
 from alpaca.data.enums import Adjustment, DataFeed
-from lib.dataEngine.common import BarCollection
+from lib.dataEngine.common import BarCollection, MarketSnapshot
+from lib.dataEngine.barstore import BarStore
+from lib.dataEngine.cache import DailyBarCache
 from lib.patterns.singleton import Singleton
 from lib.patterns.retry import retry
 from lib.patterns.base import Base
 
 import pandas as pd 
+import numpy as np
 import logging 
-from datetime import datetime
+from datetime import datetime, date
 from numpy import array
 from dateutil.relativedelta import relativedelta
 
 logger = logging.getLogger(__name__)
 
+# symbols are passed as a comma separated query parameter, keep the url within a safe length
+MAX_SYMBOLS_PER_REQUEST = 200
+
 class AlpacaDataClient(Base, metaclass=Singleton):
     
     def __init__(self, auth):
@@ -23,6 +29,8 @@ class AlpacaDataClient(Base, metaclass=Singleton):
             api_key=auth.api_key,
             secret_key=auth.secret_key
         )   
+        self.barStore:BarStore = BarStore.create()
+        self.dailyCache:DailyBarCache = DailyBarCache.create()
     
     @classmethod
     def create(cls, auth):
@@ -64,19 +72,25 @@ class AlpacaDataClient(Base, metaclass=Singleton):
             )
         ).df 
         
-    @retry(max_retries=3, retry_delay=60, logger=logger)
-    def getDaily(self, symbol:str, endDate:datetime = datetime.today()) -> pd.DataFrame:
-        return self.dataClient.get_stock_bars(
+    @retry(max_retries=3, retry_delay=60, incremental_backoff=2, logger=logger)
+    def _getDailyBars(self, symbol:str, start:datetime, end:datetime=None) -> pd.DataFrame:
+        barSet = self.dataClient.get_stock_bars(
             StockBarsRequest(
                 symbol_or_symbols=symbol,
                 timeframe=TimeFrame.Day,
                 adjustment=Adjustment.ALL,
                 feed=DataFeed.SIP,
-                limit=30,
-                start=endDate - relativedelta(days=30),
-                end=endDate
+                start=start,
+                end=end
             )
-        ).df 
+        )
+        return barSet.df if barSet.data else pd.DataFrame()
+        
+    def getDaily(self, symbol:str, endDate:datetime = datetime.today()) -> pd.DataFrame:
+        # bars up to today are served from the session cache, only the live bar is refetched
+        if endDate.date() == date.today():
+            return self.dailyCache.get(symbol, days=30, fetch=self._getDailyBars)
+        return self._getDailyBars(symbol, endDate - relativedelta(days=30), endDate)
         
     def getHourly(self, symbol:str, endDate:datetime = datetime.now(), days:int = 30) -> pd.DataFrame:
         return self.dataClient.get_stock_bars(
@@ -114,19 +128,10 @@ class AlpacaDataClient(Base, metaclass=Singleton):
         df:pd.DataFrame = self.getDaily(symbol)
         return (df["vwap"] * df["volume"]).mean()
         
-    @retry(max_retries=3, retry_delay=60, incremental_backoff=2, logger=logger)
     def getLongDaily(self, symbol:str, endDate:datetime = datetime.today()) -> pd.DataFrame:
-        return self.dataClient.get_stock_bars(
-            StockBarsRequest(
-                symbol_or_symbols=symbol,
-                timeframe=TimeFrame.Day,
-                adjustment=Adjustment.ALL,
-                feed=DataFeed.SIP,
-                limit=90,
-                start=endDate - relativedelta(days=90),
-                end=endDate
-            )
-        ).df
+        if endDate.date() == date.today():
+            return self.dailyCache.get(symbol, days=90, fetch=self._getDailyBars)
+        return self._getDailyBars(symbol, endDate - relativedelta(days=90), endDate)
         
     def getAllBars(self, symbol:str) -> BarCollection:
         daily:pd.DataFrame = self.getDaily(symbol)
@@ -134,6 +139,206 @@ class AlpacaDataClient(Base, metaclass=Singleton):
         monthly:pd.DataFrame = self.getMonthly(symbol)      
         return BarCollection(daily, weekly, monthly)
     
+    @retry(max_retries=3, retry_delay=60, incremental_backoff=2, logger=logger)
+    def _getBarsChunk(self, symbols:list[str], timeframe:TimeFrame, start:datetime, end:datetime=None) -> pd.DataFrame:
+        barSet = self.dataClient.get_stock_bars(
+            StockBarsRequest(
+                symbol_or_symbols=symbols,
+                timeframe=timeframe,
+                adjustment=Adjustment.ALL,
+                feed=DataFeed.SIP,
+                start=start,
+                end=end
+            )
+        )
+        return barSet.df if barSet.data else pd.DataFrame()
+    
+    def _getBatchBars(self, symbols:list[str], timeframe:TimeFrame, start:datetime, end:datetime=None) -> pd.DataFrame:
+        """
+            fetches bars of many symbols in as few requests as the api allows and returns
+            a single frame indexed by (symbol, timestamp). every chunk request is retried on its
+            own, so a transient error only repeats that chunk
+        """
+        symbols = list(dict.fromkeys(symbols))
+        chunks:list[pd.DataFrame] = [
+            self._getBarsChunk(symbols[i:i+MAX_SYMBOLS_PER_REQUEST], timeframe, start, end) 
+            for i in range(0, len(symbols), MAX_SYMBOLS_PER_REQUEST)
+        ]
+        chunks = [chunk for chunk in chunks if not chunk.empty]
+        if not chunks:
+            return pd.DataFrame()
+        return pd.concat(chunks).sort_index()
+    
+    def _getStoredBatchBars(self, symbols:list[str], timeframe:TimeFrame, start:datetime, end:datetime=None) -> pd.DataFrame:
+        """
+            serves bars from the local bar store and only requests bars from the last two stored bars onwards.
+            the second to last stored bar is complete, so a mismatch on it means the adjusted history 
+            has changed (e.g. a split) and the symbol is refetched in full
+        """
+        partition:str = timeframe.value
+        startTs:pd.Timestamp = pd.Timestamp(start).tz_localize("UTC") if pd.Timestamp(start).tzinfo is None else pd.Timestamp(start)
+        endTs:pd.Timestamp = None
+        if end is not None:
+            endTs = pd.Timestamp(end).tz_localize("UTC") if pd.Timestamp(end).tzinfo is None else pd.Timestamp(end)
+        coverage:dict[str, str] = self.barStore.getCoverage(partition)
+        
+        stored:dict[str, np.ndarray] = {}
+        fetchGroups:dict[pd.Timestamp, list] = {}
+        for symbol in dict.fromkeys(symbols):
+            records:np.ndarray = self.barStore.read(partition, symbol)
+            if len(records) >= 2 and symbol in coverage and pd.Timestamp(coverage[symbol]) <= startTs:
+                stored[symbol] = records
+                fetchGroups.setdefault(pd.Timestamp(int(records["timestamp"][-2]), tz="UTC"), []).append(symbol)
+            else:
+                fetchGroups.setdefault(startTs, []).append(symbol)
+        
+        fetched:dict[str, pd.DataFrame] = {}
+        for fetchFrom, groupSymbols in fetchGroups.items():
+            fetched.update(self.splitBySymbol(self._getBatchBars(groupSymbols, timeframe, fetchFrom.tz_convert(None).to_pydatetime(), end)))
+        
+        stale:list[str] = []
+        for symbol, records in stored.items():
+            if symbol not in fetched:
+                continue
+            newRecords:np.ndarray = BarStore.fromFrame(fetched[symbol])
+            overlap:np.ndarray = newRecords[newRecords["timestamp"] == records["timestamp"][-2]]
+            if len(overlap) == 0 or not np.isclose(overlap["close"][0], records["close"][-2], rtol=1e-6):
+                stale.append(symbol)
+        if stale:
+            logger.info(f"{len(stale)} symbols have revised {partition} history, refetching them in full")
+            for symbol in stale:
+                del stored[symbol]
+                del fetched[symbol]
+            fetched.update(self.splitBySymbol(self._getBatchBars(stale, timeframe, start, end)))
+        
+        res:list[pd.DataFrame] = []
+        for symbol in dict.fromkeys(symbols):
+            if symbol in fetched:
+                newRecords:np.ndarray = BarStore.fromFrame(fetched[symbol])
+                if symbol in stored:
+                    oldRecords:np.ndarray = stored[symbol]
+                    newRecords = np.concatenate([oldRecords[oldRecords["timestamp"] < newRecords["timestamp"][0]], newRecords])
+                    coveredFrom:pd.Timestamp = min(pd.Timestamp(coverage[symbol]), startTs)
+                else:
+                    coveredFrom:pd.Timestamp = startTs
+                self.barStore.write(partition, symbol, newRecords)
+                coverage[symbol] = coveredFrom.isoformat()
+                records:np.ndarray = newRecords
+            elif symbol in stored:
+                records:np.ndarray = stored[symbol]
+            else:
+                continue
+            
+            mask:np.ndarray = records["timestamp"] >= startTs.value
+            if endTs is not None:
+                mask &= records["timestamp"] <= endTs.value
+            if mask.any():
+                res.append(BarStore.toFrame(symbol, records[mask]))
+        
+        self.barStore.setCoverage(partition, coverage)
+        return pd.concat(res) if res else pd.DataFrame()
+    
+    @staticmethod
+    def splitBySymbol(bars:pd.DataFrame) -> dict[str, pd.DataFrame]:
+        """
+            splits a (symbol, timestamp) indexed frame into per-symbol frames, 
+            keeping the two level index that the single symbol getters return
+        """
+        if bars.empty:
+            return {}
+        return {symbol: df for symbol, df in bars.groupby(level=0, sort=False)}
+    
+    def getBatchMonthly(self, symbols:list[str], num_months:int=60) -> pd.DataFrame:
+        return self._getStoredBatchBars(
+            symbols=symbols,
+            timeframe=TimeFrame.Month,
+            start=datetime.today() - relativedelta(months=num_months),
+            end=datetime.today()
+        )
+        
+    def getBatchWeekly(self, symbols:list[str]) -> pd.DataFrame:
+        return self._getStoredBatchBars(
+            symbols=symbols,
+            timeframe=TimeFrame.Week,
+            start=datetime.today() - relativedelta(years=3),
+            end=datetime.today()
+        )
+        
+    def getBatchDaily(self, symbols:list[str], endDate:datetime = datetime.today()) -> pd.DataFrame:
+        # the limit parameter counts bars across all symbols, the 30 day window already bounds each symbol
+        return self._getStoredBatchBars(
+            symbols=symbols,
+            timeframe=TimeFrame.Day,
+            start=endDate - relativedelta(days=30),
+            end=endDate
+        )
+        
+    def getBatchLongDaily(self, symbols:list[str], endDate:datetime = datetime.today()) -> pd.DataFrame:
+        return self._getStoredBatchBars(
+            symbols=symbols,
+            timeframe=TimeFrame.Day,
+            start=endDate - relativedelta(days=90),
+            end=endDate
+        )
+        
+    def getBatchMinutes(self, symbols:list[str], endDate:datetime = datetime.now(), days:int = 1) -> pd.DataFrame:
+        return self._getBatchBars(
+            symbols=symbols,
+            timeframe=TimeFrame.Minute,
+            start=endDate - relativedelta(days=days)
+        )
+        
+    def getBatchMarketCap(self, symbols:list[str]) -> pd.Series:
+        df:pd.DataFrame = self.getBatchDaily(symbols)
+        if df.empty:
+            return pd.Series(dtype=float)
+        return (df["vwap"] * df["volume"]).groupby(level=0).mean()
+    
+    def getBatchAllBars(self, symbols:list[str]) -> dict[str, BarCollection]:
+        daily:dict[str, pd.DataFrame] = self.splitBySymbol(self.getBatchDaily(symbols))
+        weekly:dict[str, pd.DataFrame] = self.splitBySymbol(self.getBatchWeekly(symbols))
+        monthly:dict[str, pd.DataFrame] = self.splitBySymbol(self.getBatchMonthly(symbols))
+        return {
+            symbol: BarCollection(daily[symbol], weekly[symbol], monthly[symbol]) 
+            for symbol in monthly.keys() if symbol in daily and symbol in weekly
+        }
+    
+    @retry(max_retries=3, retry_delay=60, incremental_backoff=2, logger=logger)
+    def _getLatestBarsChunk(self, symbols:list[str]) -> dict[str, Bar]:
+        return self.dataClient.get_stock_latest_bar(
+            StockLatestBarRequest(
+                symbol_or_symbols=symbols,
+                feed=DataFeed.SIP
+            )
+        )
+        
+    @retry(max_retries=3, retry_delay=60, incremental_backoff=2, logger=logger)
+    def _getLatestQuotesChunk(self, symbols:list[str]) -> dict[str, Quote]:
+        return self.dataClient.get_stock_latest_quote(
+            StockLatestQuoteRequest(
+                symbol_or_symbols=symbols,
+                feed=DataFeed.SIP
+            )
+        )
+        
+    def getMarketSnapshot(self, symbols:list[str], withQuotes:bool=False) -> MarketSnapshot:
+        symbols = list(dict.fromkeys(symbols))
+        prices:dict[str, float] = {}
+        quotes:dict[str, Quote] = {}
+        for i in range(0, len(symbols), MAX_SYMBOLS_PER_REQUEST):
+            chunk:list[str] = symbols[i:i+MAX_SYMBOLS_PER_REQUEST]
+            prices.update({symbol: bar.close for symbol, bar in self._getLatestBarsChunk(chunk).items()})
+            if withQuotes:
+                quotes.update(self._getLatestQuotesChunk(chunk))
+        return MarketSnapshot.create(prices, quotes)
+    
+    def getLatestQuotes(self, symbols:list[str]) -> dict[str, Quote]:
+        symbols = list(dict.fromkeys(symbols))
+        quotes:dict[str, Quote] = {}
+        for i in range(0, len(symbols), MAX_SYMBOLS_PER_REQUEST):
+            quotes.update(self._getLatestQuotesChunk(symbols[i:i+MAX_SYMBOLS_PER_REQUEST]))
+        return quotes
+    
     def getLatestQuote(self, symbol:str) -> Quote:
         return self.dataClient.get_stock_latest_quote(
             StockLatestQuoteRequest(
@@ -0,0 +1,79 @@
+from lib.patterns.base import Base
+
+import pandas as pd
+import numpy as np
+import json
+import os
+
+
+class BarStore(Base):
+    """
+        on-disk bar history with one partition (directory) per timeframe.
+        each symbol is kept as a structured numpy file that is read back memory-mapped,
+        and a coverage file records the earliest date each symbol has been fetched from
+    """
+
+    COLUMNS:list[str] = ["open", "high", "low", "close", "volume", "trade_count", "vwap"]
+    DTYPE:np.dtype = np.dtype([("timestamp", "<i8")] + [(col, "<f8") for col in COLUMNS])
+
+    def __init__(self, rootDir:str):
+        self.rootDir:str = rootDir
+
+    @classmethod
+    def create(cls, rootDir:str="saveddata/bars"):
+        return cls(rootDir)
+
+    def _partitionDir(self, partition:str) -> str:
+        path:str = os.path.join(self.rootDir, partition)
+        if not os.path.exists(path):
+            os.makedirs(path)
+        return path
+
+    @staticmethod
+    def _atomicWrite(path:str, writer) -> None:
+        tmpPath:str = f"{path}.tmp"
+        with open(tmpPath, "wb") as outFile:
+            writer(outFile)
+        os.replace(tmpPath, path)
+
+    def getCoverage(self, partition:str) -> dict[str, str]:
+        path:str = os.path.join(self._partitionDir(partition), "coverage.json")
+        if not os.path.exists(path):
+            return {}
+        with open(path, "r") as inFile:
+            return json.load(inFile)
+
+    def setCoverage(self, partition:str, coverage:dict[str, str]) -> None:
+        path:str = os.path.join(self._partitionDir(partition), "coverage.json")
+        self._atomicWrite(path, lambda outFile: outFile.write(json.dumps(coverage).encode()))
+
+    def read(self, partition:str, symbol:str) -> np.ndarray:
+        path:str = os.path.join(self._partitionDir(partition), f"{symbol}.npy")
+        if not os.path.exists(path):
+            return np.empty(0, dtype=self.DTYPE)
+        return np.load(path, mmap_mode="r")
+
+    def write(self, partition:str, symbol:str, records:np.ndarray) -> None:
+        path:str = os.path.join(self._partitionDir(partition), f"{symbol}.npy")
+        self._atomicWrite(path, lambda outFile: np.save(outFile, np.ascontiguousarray(records, dtype=self.DTYPE)))
+
+    @classmethod
+    def fromFrame(cls, bars:pd.DataFrame) -> np.ndarray:
+        """
+            converts a single symbol (symbol, timestamp) indexed frame into store records
+        """
+        records:np.ndarray = np.empty(len(bars), dtype=cls.DTYPE)
+        timestamps = pd.DatetimeIndex(bars.index.get_level_values(-1))
+        timestamps = timestamps.tz_convert("UTC") if timestamps.tz is not None else timestamps.tz_localize("UTC")
+        records["timestamp"] = timestamps.asi8
+        for col in cls.COLUMNS:
+            records[col] = bars[col].to_numpy(dtype=float) if col in bars.columns else np.nan
+        return records
+
+    @classmethod
+    def toFrame(cls, symbol:str, records:np.ndarray) -> pd.DataFrame:
+        index:pd.MultiIndex = pd.MultiIndex.from_arrays(
+            [np.full(len(records), symbol, dtype=object), pd.to_datetime(records["timestamp"], utc=True)],
+            names=["symbol", "timestamp"]
+        )
+        return pd.DataFrame({col: np.asarray(records[col]) for col in cls.COLUMNS}, index=index)
@@ -0,0 +1,84 @@
+from lib.patterns.base import Base
+
+import pandas as pd
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+from datetime import datetime
+from dateutil.relativedelta import relativedelta
+
+
+@dataclass
+class CachedDailyBars:
+    completed: pd.DataFrame
+    live: pd.DataFrame
+    days: int
+    sessionStart: pd.Timestamp
+    liveFetchedAt: float
+
+
+class DailyBarCache(Base):
+    """
+        session cache for daily bars. completed bars are kept for the whole trading session while the
+        live (today's) bar is refreshed at most once every liveTTL seconds. least recently used
+        symbols are evicted once maxSize is reached
+    """
+
+    def __init__(self, maxSize:int, liveTTL:float):
+        self.maxSize:int = maxSize
+        self.liveTTL:float = liveTTL
+        self._entries:OrderedDict[str, CachedDailyBars] = OrderedDict()
+
+    @classmethod
+    def create(cls, maxSize:int=512, liveTTL:float=60):
+        if maxSize < 1 or liveTTL < 0:
+            raise ValueError("cache size must be positive and the live bar ttl must not be negative")
+        return cls(maxSize, liveTTL)
+
+    @staticmethod
+    def _getSessionStart() -> pd.Timestamp:
+        return pd.Timestamp.now(tz="America/New_York").normalize()
+
+    @staticmethod
+    def _toRequestTime(ts:pd.Timestamp) -> datetime:
+        # the data api expects naive utc datetimes
+        return ts.tz_convert("UTC").tz_localize(None).to_pydatetime()
+
+    def get(self, symbol:str, days:int, fetch:Callable[[str, datetime, datetime], pd.DataFrame]) -> pd.DataFrame:
+        """
+            returns the last `days` calendar days of daily bars, `fetch(symbol, start, end)` is only
+            called for the full history once per session and for the live bar once the ttl expires
+        """
+        sessionStart:pd.Timestamp = self._getSessionStart()
+        entry:CachedDailyBars = self._entries.get(symbol)
+
+        if entry is None or entry.sessionStart != sessionStart or entry.days < days:
+            bars:pd.DataFrame = fetch(symbol, self._toRequestTime(sessionStart - relativedelta(days=days)), None)
+            completed, live = bars, bars
+            if not bars.empty:
+                isCompleted = bars.index.get_level_values("timestamp") < sessionStart
+                completed, live = bars[isCompleted], bars[~isCompleted]
+            entry = CachedDailyBars(
+                completed=completed,
+                live=live,
+                days=days,
+                sessionStart=sessionStart,
+                liveFetchedAt=time.monotonic()
+            )
+            self._entries[symbol] = entry
+        elif time.monotonic() - entry.liveFetchedAt >= self.liveTTL:
+            entry.live = fetch(symbol, self._toRequestTime(sessionStart), None)
+            entry.liveFetchedAt = time.monotonic()
+
+        self._entries.move_to_end(symbol)
+        while len(self._entries) > self.maxSize:
+            self._entries.popitem(last=False)
+
+        bars:pd.DataFrame = entry.completed if entry.live.empty else pd.concat([entry.completed, entry.live])
+        if bars.empty:
+            return bars
+        return bars[bars.index.get_level_values("timestamp") >= sessionStart - relativedelta(days=days)]
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -1,4 +1,8 @@
 from pandas import DataFrame 
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import MappingProxyType
+from typing import Mapping
 
 class BarCollection:
     def __init__(
@@ -9,4 +13,33 @@ class BarCollection:
     ):
         self.daily:DataFrame = daily
         self.weekly:DataFrame = weekly
-        self.monthly:DataFrame = monthly
\ No newline at end of file
+        self.monthly:DataFrame = monthly
+
+@dataclass(frozen=True)
+class MarketSnapshot:
+    """
+        immutable view of the latest prices (and optionally quotes) of many symbols,
+        taken in one batched pass so every decision within a tick reads the same prices
+    """
+    timestamp: datetime
+    prices: Mapping[str, float] = field(default_factory=lambda: MappingProxyType({}))
+    quotes: Mapping[str, object] = field(default_factory=lambda: MappingProxyType({}))
+    
+    @classmethod
+    def create(cls, prices:dict[str, float], quotes:dict[str, object]=None):
+        return cls(
+            timestamp=datetime.now(),
+            prices=MappingProxyType(dict(prices)),
+            quotes=MappingProxyType(dict(quotes) if quotes else {})
+        )
+
+
+@dataclass
+class FundamentalsFetchReport:
+    """
+        outcome of a bulk fundamentals fetch, every requested symbol ends up in exactly one of 
+        cached, fetched or failed (symbol -> error message)
+    """
+    cached: list[str] = field(default_factory=list)
+    fetched: list[str] = field(default_factory=list)
+    failed: dict[str, str] = field(default_factory=dict)
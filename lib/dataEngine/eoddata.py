@@ -1,23 +1,134 @@
 from eod import EodHistoricalData
 from authentication.enums import ConfigType
-from lib.patterns import Singleton, Base 
+from lib.patterns import Singleton, Base, RateLimiter
+from lib.dataEngine.fundamentalscache import FundamentalsCache
+from lib.dataEngine.common import FundamentalsFetchReport
+
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
+from tqdm import tqdm
+import threading
+import requests
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
 
 class EodDataClient(Base, metaclass=Singleton):
-    
+
+    BASE_URL:str = "https://eodhistoricaldata.com"
+    TIMEOUT:int = 300
+
     def __init__(self, auth):
-        self.dataClient:EodHistoricalData = EodHistoricalData(auth.api_key)
-        
+        self.dataClient:EodHistoricalData = EodHistoricalData(auth.api_key, timeout=self.TIMEOUT)
+        self.fundamentalsCache:FundamentalsCache = FundamentalsCache.create()
+        self.apiKey:str = auth.api_key
+        self.baseUrl:str = (getattr(auth, "baseUrl", None) or self.BASE_URL).rstrip("/")
+        # requests sessions are not shared between threads, every worker keeps its own connection pool
+        self._local:threading.local = threading.local()
+
     @classmethod
     def create(cls, auth):
         if not cls._isAuthValid(auth):
             raise ValueError("wrong authentication object detected (not belonging to EOD)")
         return cls(auth)
-    
+
     @staticmethod
     def _isAuthValid(auth) -> bool:
         if auth.configType == ConfigType.EOD and auth.api_key:
-            return True 
+            return True
         return False
-    
-    def getFundamentals(self, symbol:str) -> dict:
-        return self.dataClient.get_fundamental_equity(symbol)
\ No newline at end of file
+
+    def _getSession(self) -> requests.Session:
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def _fetchFundamentals(self, symbol:str) -> dict:
+        # the eod sdk keeps the endpoint of the running request on the client, so concurrent
+        # calls through it could overwrite each other's url
+        response:requests.Response = self._getSession().get(
+            f"{self.baseUrl}/api/fundamentals/{symbol.upper()}",
+            params={"api_token": self.apiKey, "fmt": "json"},
+            timeout=self.TIMEOUT
+        )
+        if response.status_code != 200:
+            # raise_for_status would put the url, and with it the api token, into the message
+            raise requests.HTTPError(f"{response.status_code} {response.reason} for {symbol}", response=response)
+        return response.json()
+
+    def getFundamentals(self, symbol:str, forceRefresh:bool=False) -> dict:
+        """
+            fundamentals are served from the cache and only fetched from eod when the cached entry
+            is missing, expired or a new quarterly statement is expected
+        """
+        if not forceRefresh:
+            cached:dict = self.fundamentalsCache.get(symbol)
+            if cached is not None:
+                return cached
+        return self.fundamentalsCache.put(symbol, self._fetchFundamentals(symbol))
+
+    def _downloadFundamentals(self, symbol:str, limiter:RateLimiter, maxRetries:int, retryDelay:float) -> dict:
+        for attempt in range(maxRetries + 1):
+            limiter.acquire()
+            try:
+                # written to the cache right away so a crash does not lose finished downloads
+                return self.fundamentalsCache.put(symbol, self._fetchFundamentals(symbol))
+            except requests.HTTPError as ex:
+                status:int = ex.response.status_code if ex.response is not None else None
+                # client errors other than throttling will not go away on a retry
+                if attempt == maxRetries or (status is not None and 400 <= status < 500 and status != 429):
+                    raise
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == maxRetries:
+                    raise
+            time.sleep(retryDelay * 2 ** attempt)
+
+    def _loadFundamentals(self, symbol:str, forceRefresh:bool, limiter:RateLimiter, maxRetries:int, retryDelay:float) -> (dict, bool):
+        if not forceRefresh:
+            cached:dict = self.fundamentalsCache.get(symbol)
+            if cached is not None:
+                return cached, True
+        return self._downloadFundamentals(symbol, limiter, maxRetries, retryDelay), False
+
+    def getBulkFundamentals(
+        self,
+        symbols:list[str],
+        forceRefresh:bool=False,
+        maxWorkers:int=8,
+        requestsPerMinute:int=600,
+        maxRetries:int=2,
+        retryDelay:float=1
+    ) -> (dict[str, dict], FundamentalsFetchReport):
+        """
+            fundamentals of many symbols with at most maxWorkers requests in flight and at most
+            requestsPerMinute requests started within any minute. fresh cache entries do not count
+            against the budget. symbols that failed are missing from the result and listed in the report
+        """
+        if maxWorkers < 1 or requestsPerMinute < 1 or maxRetries < 0:
+            raise ValueError("the number of workers and the request budget must be positive")
+
+        limiter:RateLimiter = RateLimiter.create(requestsPerMinute, 60)
+        results:dict[str, dict] = {}
+        report:FundamentalsFetchReport = FundamentalsFetchReport()
+
+        with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+            futures:dict[Future, str] = {
+                executor.submit(self._loadFundamentals, symbol, forceRefresh, limiter, maxRetries, retryDelay): symbol
+                for symbol in dict.fromkeys(symbols)
+            }
+            progress:tqdm = tqdm(as_completed(futures), total=len(futures), desc="retrieve fundamentals")
+            for future in progress:
+                symbol:str = futures[future]
+                try:
+                    results[symbol], isCached = future.result()
+                    (report.cached if isCached else report.fetched).append(symbol)
+                except Exception as ex:
+                    report.failed[symbol] = str(ex)
+                    logger.warning(f"{symbol}: failed to retrieve fundamentals ({ex})")
+                progress.set_postfix(fetched=len(report.fetched), cached=len(report.cached), failed=len(report.failed))
+
+        logger.info(
+            f"fundamentals retrieved: {len(report.fetched)} fetched, {len(report.cached)} cached, {len(report.failed)} failed"
+        )
+        return results, report
@@ -0,0 +1,123 @@
+from lib.patterns.base import Base
+
+from datetime import datetime, timedelta
+from dateutil.relativedelta import relativedelta
+import gzip
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class FundamentalsCache(Base):
+    """
+        on-disk cache of raw eod fundamentals, one gzip compressed json record per symbol.
+        records are trimmed to the sections the firm characteristics read. an entry is refetched
+        once its ttl expires or when a new fiscal quarter is expected after the last statement date
+    """
+
+    STATEMENTS:list[str] = ["Income_Statement", "Balance_Sheet", "Cash_Flow"]
+    SUMMARY_SECTIONS:list[str] = ["Highlights", "Technicals", "SharesStats"]
+    GENERAL_FIELDS:list[str] = ["Code", "Name", "Exchange", "Sector", "Industry", "GicSector", "GicGroup", "GicIndustry", "GicSubIndustry"]
+
+    def __init__(self, rootDir:str, ttl:timedelta, filingLag:timedelta, recheckInterval:timedelta):
+        self.rootDir:str = rootDir
+        self.ttl:timedelta = ttl
+        self.filingLag:timedelta = filingLag
+        self.recheckInterval:timedelta = recheckInterval
+
+    @classmethod
+    def create(cls, rootDir:str="saveddata/fundamentals", ttlDays:int=7, filingLagDays:int=45, recheckDays:int=1):
+        if ttlDays <= 0 or filingLagDays < 0 or recheckDays <= 0:
+            raise ValueError("cache ttl and recheck interval must be positive and the filing lag must not be negative")
+        return cls(rootDir, timedelta(days=ttlDays), timedelta(days=filingLagDays), timedelta(days=recheckDays))
+
+    def _path(self, symbol:str) -> str:
+        return os.path.join(self.rootDir, f"{symbol}.json.gz")
+
+    @classmethod
+    def trim(cls, rawFile:dict) -> dict:
+        """
+            keeps the general classification, the summary sections and the quarterly statements
+        """
+        financials:dict = rawFile.get("Financials") or {}
+        return {
+            "General": {field: value for field, value in (rawFile.get("General") or {}).items() if field in cls.GENERAL_FIELDS},
+            **{section: rawFile.get(section) for section in cls.SUMMARY_SECTIONS if section in rawFile},
+            "Financials": {
+                statement: {"quarterly": (financials.get(statement) or {}).get("quarterly") or {}}
+                for statement in cls.STATEMENTS
+            }
+        }
+
+    @classmethod
+    def getLastStatementDate(cls, rawFile:dict) -> datetime:
+        dates:list[str] = [
+            date for statement in cls.STATEMENTS
+            for date in ((rawFile.get("Financials") or {}).get(statement) or {}).get("quarterly", {}).keys()
+        ]
+        try:
+            return datetime.strptime(max(dates), "%Y-%m-%d") if dates else None
+        except ValueError:
+            return None
+
+    def isFresh(self, entry:dict, now:datetime=None) -> bool:
+        now = now or datetime.now()
+        fetchedAt:datetime = datetime.fromisoformat(entry["fetchedAt"])
+        if now - fetchedAt >= self.ttl:
+            return False
+        if not entry.get("lastStatement"):
+            return True
+
+        # the next quarter is due once its fiscal period has ended and the filing lag has passed,
+        # while it has not shown up yet the entry is only rechecked once per recheck interval
+        nextQuarterDue:datetime = datetime.fromisoformat(entry["lastStatement"]) + relativedelta(months=3) + self.filingLag
+        if nextQuarterDue <= now and (fetchedAt < nextQuarterDue or now - fetchedAt >= self.recheckInterval):
+            return False
+        return True
+
+    def read(self, symbol:str) -> dict:
+        path:str = self._path(symbol)
+        if not os.path.exists(path):
+            return None
+        try:
+            with gzip.open(path, "rt") as inFile:
+                return json.load(inFile)
+        except (OSError, ValueError) as ex:
+            logger.warning(f"{symbol}: unreadable fundamentals cache entry ({ex})")
+            return None
+
+    def get(self, symbol:str, now:datetime=None) -> dict:
+        """
+            the cached fundamentals of the symbol, None when missing or due for a refresh
+        """
+        entry:dict = self.read(symbol)
+        if entry is None or not self.isFresh(entry, now):
+            return None
+        return entry["data"]
+
+    def put(self, symbol:str, rawFile:dict, now:datetime=None) -> dict:
+        data:dict = self.trim(rawFile)
+        lastStatement:datetime = self.getLastStatementDate(data)
+        entry:dict = {
+            "fetchedAt": (now or datetime.now()).isoformat(),
+            "lastStatement": lastStatement.date().isoformat() if lastStatement else None,
+            "data": data
+        }
+
+        if not os.path.exists(self.rootDir):
+            os.makedirs(self.rootDir, exist_ok=True)
+        path:str = self._path(symbol)
+        tmpPath:str = f"{path}.tmp"
+        with gzip.open(tmpPath, "wt") as outFile:
+            json.dump(entry, outFile, separators=(",", ":"))
+        os.replace(tmpPath, path)
+        return data
+
+    def clear(self) -> None:
+        if not os.path.exists(self.rootDir):
+            return
+        for fileName in os.listdir(self.rootDir):
+            if fileName.endswith(".json.gz"):
+                os.remove(os.path.join(self.rootDir, fileName))
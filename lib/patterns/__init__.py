@@ -1,3 +1,4 @@
 from .singleton import *
 from .base import * 
-from .retry import * 
\ No newline at end of file
+from .retry import * 
+from .ratelimit import *
\ No newline at end of file
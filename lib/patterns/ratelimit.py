@@ -0,0 +1,38 @@
+from lib.patterns.base import Base
+
+from collections import deque
+import threading
+import time
+
+
+class RateLimiter(Base):
+    """
+        thread-safe sliding window limiter, at most maxCalls acquisitions within any window of period seconds
+    """
+
+    def __init__(self, maxCalls:int, period:float):
+        self.maxCalls:int = maxCalls
+        self.period:float = period
+        self._calls:deque = deque()
+        self._lock:threading.Lock = threading.Lock()
+
+    @classmethod
+    def create(cls, maxCalls:int, period:float=60):
+        if maxCalls < 1 or period <= 0:
+            raise ValueError("the call budget and its period must be positive")
+        return cls(maxCalls, period)
+
+    def acquire(self) -> None:
+        """
+            blocks until a call fits into the budget and records it
+        """
+        while True:
+            with self._lock:
+                now:float = time.monotonic()
+                while self._calls and self._calls[0] <= now - self.period:
+                    self._calls.popleft()
+                if len(self._calls) < self.maxCalls:
+                    self._calls.append(now)
+                    return
+                wait:float = self._calls[0] + self.period - now
+            time.sleep(wait)
@@ -1,11 +1,14 @@
 import time
 import logging
+from functools import wraps
 
 
 def retry(max_retries=3, retry_delay=1, incremental_backoff=2, logger=None):
     def decorator(func):
+        @wraps(func)
         def wrapper(*args, **kwargs):
             retries = 0
+            delay = retry_delay
             while retries < max_retries:
                 try:
                     return func(*args, **kwargs)
@@ -15,8 +18,8 @@ def retry(max_retries=3, retry_delay=1, incremental_backoff=2, logger=None):
                         raise(e)
                     if logger:
                         logger.warning(f"Retryable error caught: {e}. Retrying...")
-                    time.sleep(retry_delay)
-                    retry_delay *= incremental_backoff
+                    time.sleep(delay)
+                    delay *= incremental_backoff
         return wrapper
     return decorator
 
@@ -1,22 +1,42 @@
 from authentication.auth import AlpacaAuth
 from authentication.enums import ConfigType
-from PairTrading.util.read import getRecentlyClosed
+from PairTrading.util.state import TradingStateStore
 from lib.patterns import Singleton, Base 
 
 from alpaca.trading.client import TradingClient
-from alpaca.trading.enums import AssetClass, AssetExchange, AssetStatus, OrderSide, TimeInForce
+from alpaca.trading.enums import AssetClass, AssetExchange, AssetStatus, OrderSide, OrderStatus, TimeInForce
 from alpaca.trading.requests import GetAssetsRequest, MarketOrderRequest, GetOrdersRequest
 from alpaca.trading.models import Order, Position, TradeAccount, Asset, Clock
 
 from datetime import date, datetime, timezone
 from lib.patterns.retry import retry
+from typing import Union
+import asyncio
 import time
 import logging 
 
 logger = logging.getLogger(__name__)
 
+
+class UnpairedLegError(Exception):
+    """
+        one leg of a pair is left open without the other one, orders holds the orders that were
+        executed and symbol the leg that is still open
+    """
+    def __init__(self, message:str, symbol:str, orders:list[Order]):
+        super().__init__(message)
+        self.symbol:str = symbol
+        self.orders:list[Order] = orders
+
+
 class AlpacaTradingClient(Base, metaclass=Singleton):
     
+    # orders in these states will not fill any further
+    FINAL_ORDER_STATES:set = {
+        OrderStatus.FILLED, OrderStatus.CANCELED, OrderStatus.EXPIRED, 
+        OrderStatus.REJECTED, OrderStatus.DONE_FOR_DAY, OrderStatus.STOPPED, OrderStatus.SUSPENDED
+    }
+    
     def __init__(self, auth:AlpacaAuth):
         self.client:TradingClient = TradingClient(
             api_key=auth.api_key,
@@ -62,7 +82,7 @@ class AlpacaTradingClient(Base, metaclass=Singleton):
     
     def getViableStocks(self) -> list[str]:
              
-        recentlyClosed:dict[str, date] = getRecentlyClosed() if getRecentlyClosed() else {}
+        recentlyClosed:dict[str, date] = TradingStateStore.create().recentlyClosed
         validAssets:list[str] = [asset.symbol for asset in self.allTradableStocks if (asset.fractionable==True and \
                                             asset.shortable==True and \
                                             asset.easy_to_borrow==True and \
@@ -111,6 +131,9 @@ class AlpacaTradingClient(Base, metaclass=Singleton):
     @retry(max_retries=3, retry_delay=1, incremental_backoff=3, logger=logger)
     def _closePosition(self, symbol:str) -> Order:
         return self.client.close_position(symbol)
+    
+    def closePosition(self, symbol:str) -> Order:
+        return self._closePosition(symbol)
         
         
     def openMACDPosition(self, symbol:str, entryAmount:float) -> Order:     
@@ -131,39 +154,138 @@ class AlpacaTradingClient(Base, metaclass=Singleton):
     
    
     
-    def openArbitragePositions(self, stockPair:tuple, shortQty:float) -> tuple[Order, Order]:
+    async def _waitForFill(self, orderId, timeout:float=30, initialDelay:float=0.1, backoff:float=2, maxDelay:float=2) -> Order:
+        """
+            polls the order with exponential backoff until it reaches a final state or the timeout
+            passes, the last seen state is returned either way
+        """
+        delay:float = initialDelay
+        deadline:float = time.monotonic() + timeout
+        while True:
+            order:Order = await asyncio.to_thread(self.client.get_order_by_id, orderId)
+            if order.status in self.FINAL_ORDER_STATES or time.monotonic() + delay > deadline:
+                return order
+            await asyncio.sleep(delay)
+            delay = min(delay * backoff, maxDelay)
+    
+    async def _settleOrder(self, orderId, timeout:float=30) -> Order:
+        """
+            waits for the order to fill, an order still working after the timeout is canceled so it 
+            cannot fill later unnoticed. returns the order in its final state
+        """
+        order:Order = await self._waitForFill(orderId, timeout=timeout)
+        if order.status in self.FINAL_ORDER_STATES:
+            return order
+        try:
+            await asyncio.to_thread(self.client.cancel_order_by_id, orderId)
+        except Exception as ex:
+            # the order may have filled in the meantime, its state is read again below
+            logger.warning(f"{order.symbol}: failed to cancel order {orderId} ({ex})")
+        return await self._waitForFill(orderId, timeout=timeout)
+    
+    @staticmethod
+    def _isFilled(order:Order) -> bool:
+        return bool(order.filled_qty) and float(order.filled_qty) > 0
+    
+    async def _unwindLeg(self, stockPair:tuple, shortOrder:Order, reason:str) -> None:
+        """
+            closes the short leg of a pair whose long leg failed, raises if the short stays open
+        """
+        try:
+            await asyncio.to_thread(self._closePosition, stockPair[0])
+        except Exception as ex:
+            raise UnpairedLegError(
+                f"{stockPair[0]} - {stockPair[1]}: long leg failed ({reason}), short leg could not be closed ({ex})",
+                stockPair[0],
+                [shortOrder]
+            )
+        raise ValueError(f"{stockPair[0]} - {stockPair[1]}: long leg failed ({reason}), short leg closed")
+    
+    async def openArbitragePositionsAsync(self, stockPair:tuple, shortQty:float) -> tuple[Order, Order]:
         
         if shortQty < 1:
             raise ValueError(f"{stockPair[0]} - {stockPair[1]}: insufficient shares number forecasted")
         
-        # short the first stock
-        shortOrder:Order = self._submitTrade(
+        # short the first stock, the long leg is sized from its fill as soon as it is known
+        shortOrder:Order = await asyncio.to_thread(
+            self._submitTrade, 
             stockSymbol=stockPair[0], 
             is_notational=False,
             qty=shortQty, 
             side=OrderSide.SELL)
-        
-        time.sleep(1)
-        filledShortOrder:Order = self.client.get_order_by_id(shortOrder.id)
+        # the short order is final before the long leg is sized, a partial fill is not topped up later
+        filledShortOrder:Order = await self._settleOrder(shortOrder.id)
+        if not self._isFilled(filledShortOrder):
+            raise ValueError(f"{stockPair[0]}: short order not filled ({filledShortOrder.status})")
         longNotional:float = float(filledShortOrder.filled_qty) * float(filledShortOrder.filled_avg_price)
         
-        # long the second stock
-        longOrder:Order = self._submitTrade(
-            stockSymbol=stockPair[1], 
-            is_notational=True, 
-            qty=longNotional, 
-            side=OrderSide.BUY)
-
-        time.sleep(1)
-        filledLongOrder:Order = self.client.get_order_by_id(longOrder.id)
+        # long the second stock, without it the short leg is closed again
+        try:
+            longOrder:Order = await asyncio.to_thread(
+                self._submitTrade,
+                stockSymbol=stockPair[1], 
+                is_notational=True, 
+                qty=longNotional, 
+                side=OrderSide.BUY)
+            filledLongOrder:Order = await self._settleOrder(longOrder.id)
+        except Exception as ex:
+            await self._unwindLeg(stockPair, filledShortOrder, str(ex))
+        if not self._isFilled(filledLongOrder):
+            await self._unwindLeg(stockPair, filledShortOrder, f"long order not filled ({filledLongOrder.status})")
         return (filledShortOrder, filledLongOrder)
     
-    def closeArbitragePositions(self, stockPair:tuple) -> tuple[Order, Order]:
-        
-        # closed short position
-        closedShortOrder:Order = self._closePosition(stockPair[0])
-        
-        # closed long position
-        closedLongOrder:Order = self._closePosition(stockPair[1])
+    async def closeArbitragePositionsAsync(self, stockPair:tuple) -> tuple[Order, Order]:
+        # both legs are closed at the same time
+        results:list = await asyncio.gather(
+            asyncio.to_thread(self._closePosition, stockPair[0]),
+            asyncio.to_thread(self._closePosition, stockPair[1]),
+            return_exceptions=True
+        )
+        failed:list[int] = [i for i, result in enumerate(results) if isinstance(result, Exception)]
+        if len(failed) == 2:
+            # nothing was closed, the pair stays as it is
+            raise results[0]
+        if len(failed) == 1:
+            # _closePosition has already retried, the pair cannot be checked with one leg
+            symbol:str = stockPair[failed[0]]
+            raise UnpairedLegError(
+                f"{stockPair[0]} - {stockPair[1]}: {symbol} could not be closed ({results[failed[0]]})",
+                symbol,
+                [results[1 - failed[0]]]
+            )
+        return tuple(results)
+    
+    @staticmethod
+    async def _runBounded(coroutines:list, maxInFlight:int) -> list:
+        semaphore:asyncio.Semaphore = asyncio.Semaphore(maxInFlight)
         
-        return (closedShortOrder, closedLongOrder)
\ No newline at end of file
+        async def bounded(coroutine):
+            async with semaphore:
+                return await coroutine
+        return await asyncio.gather(*[bounded(coroutine) for coroutine in coroutines], return_exceptions=True)
+    
+    def openArbitragePositions(self, stockPair:tuple, shortQty:float) -> tuple[Order, Order]:
+        return asyncio.run(self.openArbitragePositionsAsync(stockPair, shortQty))
+    
+    def closeArbitragePositions(self, stockPair:tuple) -> tuple[Order, Order]:
+        return asyncio.run(self.closeArbitragePositionsAsync(stockPair))
+    
+    def openManyArbitragePositions(self, orders:list[tuple[tuple, float]], maxInFlight:int=4) -> list[Union[tuple[Order, Order], Exception]]:
+        """
+            opens independent (pair, short quantity) orders concurrently with at most maxInFlight 
+            pairs executing at once. every pair gets its orders or the exception it failed with
+        """
+        if maxInFlight < 1:
+            raise ValueError("the number of pairs in flight must be positive")
+        return asyncio.run(self._runBounded(
+            [self.openArbitragePositionsAsync(pair, shortQty) for pair, shortQty in orders], 
+            maxInFlight
+        ))
+    
+    def closeManyArbitragePositions(self, pairs:list[tuple], maxInFlight:int=4) -> list[Union[tuple[Order, Order], Exception]]:
+        if maxInFlight < 1:
+            raise ValueError("the number of pairs in flight must be positive")
+        return asyncio.run(self._runBounded(
+            [self.closeArbitragePositionsAsync(pair) for pair in pairs], 
+            maxInFlight
+        ))
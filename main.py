@@ -1,5 +1,5 @@
 from PairTrading.util import cleanClosedTrades, getPairsFromTrainingJson, writeToJson
-from PairTrading.trading import TradingManager
+from PairTrading.trading import TradingManager, TradingEngine
 from lib.dataEngine import AlpacaDataClient
 from authentication.auth import AlpacaAuth, EodAuth
 from authentication.authLoader import getAuth
@@ -9,7 +9,7 @@ from config.configloader import configLoader
 
 from alpaca.trading.models import Order
 
-from train import getTrainAssign
+from train import getTrainAssign, assignNewStocks
 from config.model import CONFIG_TYPE
 import logging
 from pandas import DataFrame, read_csv
@@ -39,11 +39,14 @@ if __name__ == "__main__":
     if (date.today().day==2 and not todayTrained) or (config.REFRESH_DATA and not todayTrained):
         reason:str = "overdue for training" if (date.today().day==2 and not todayTrained) else "manual decision for new training"
         logger.info(f"new training needs to be conducted -- {reason}")
-        getTrainAssign(alpacaAuth, eodAuth, config.OVERWRITE_FUNDAMENTALS) 
+        getTrainAssign(alpacaAuth, eodAuth, config.OVERWRITE_FUNDAMENTALS, config.IO_WORKERS, config.CPU_WORKERS, config.EOD_REQUESTS_PER_MINUTE, config.CLUSTERING_MODE, config.PCA_SOLVER, config.PCA_MAX_COMPONENTS) 
         # write that the training has been done
         pairsDict["time"] = datetime.today().strftime("%Y-%m-%d")
         pairsDict["final_pairs"] = serializePairData(pairsDict["final_pairs"])
         writeToJson(pairsDict, "saveddata/pairs/pairs.json")
+    elif not todayTrained:
+        # between monthly trainings new stocks only get attached to the existing clusters
+        assignNewStocks(alpacaAuth, eodAuth, config.IO_WORKERS, config.CPU_WORKERS, config.EOD_REQUESTS_PER_MINUTE)
         
     #initialize pair-creator
     logger.info("initializing pair creator")
@@ -76,18 +79,15 @@ if __name__ == "__main__":
     writeToJson(newPairs, "saveddata/pairs/pairs.json")
            
         
-    # start trading
-    while manager.tradingClient.clock.is_open:      
+    def openNewPairs() -> None:
+        newPairs:dict = pairCreator.getFinalPairs(trainDate)
+        writeToJson(newPairs, "saveddata/pairs/pairs.json")
+        logger.info("new pairs created") 
+        manager.openPositions()
         
-        clock = manager.tradingClient.clock
-        if (clock.next_close - clock.timestamp).total_seconds() <= 900:
-            newPairs:dict = pairCreator.getFinalPairs(trainDate)
-            writeToJson(newPairs, "saveddata/pairs/pairs.json")
-            logger.info("new pairs created") 
-            
-            manager.openPositions()
-            time.sleep(10)
-        closed:bool = manager.closePositions()
-        time.sleep(1)
+    # start trading, exits are checked as quotes of the opened legs stream in and
+    # new pairs are opened once per session, within the last 15 minutes before the close
+    engine:TradingEngine = TradingEngine.create(alpacaAuth, manager, streamUrl=config.STREAM_URL, feed=config.STREAM_FEED, onPreClose=openNewPairs)
+    engine.run()
 
         
@@ -0,0 +1,216 @@
+from PairTrading.trading.engine import TradingEngine
+
+from types import SimpleNamespace
+from datetime import datetime, timedelta, timezone
+import threading
+import asyncio
+import time
+
+import msgpack
+import pytest
+import websockets
+
+
+class FakeQuoteStream:
+    """
+        local stand-in for the alpaca market data stream: accepts any credentials, records the
+        quote subscriptions and sends the quotes it is given, once or every interval
+    """
+
+    def __init__(self):
+        self.subscriptions:set[str] = set()
+        self.prices:dict[str, float] = {}
+        self.interval:float = None
+        self._connections:set = set()
+        self._loop:asyncio.AbstractEventLoop = asyncio.new_event_loop()
+        self._started:threading.Event = threading.Event()
+        self._thread:threading.Thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        self._started.wait(5)
+
+    @property
+    def url(self) -> str:
+        return f"ws://127.0.0.1:{self.port}"
+
+    def _serve(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        server = self._loop.run_until_complete(websockets.serve(self._handler, "127.0.0.1", 0))
+        self.port:int = server.sockets[0].getsockname()[1]
+        self._loop.create_task(self._streamPrices())
+        self._started.set()
+        self._loop.run_forever()
+
+    async def _handler(self, ws, path=None) -> None:
+        await ws.send(msgpack.packb([{"T": "success", "msg": "connected"}]))
+        await ws.recv()
+        await ws.send(msgpack.packb([{"T": "success", "msg": "authenticated"}]))
+        self._connections.add(ws)
+        try:
+            async for message in ws:
+                message = msgpack.unpackb(message)
+                if message["action"] == "subscribe":
+                    self.subscriptions.update(message.get("quotes", []))
+                elif message["action"] == "unsubscribe":
+                    self.subscriptions.difference_update(message.get("quotes", []))
+        finally:
+            self._connections.discard(ws)
+            self.subscriptions.clear()
+
+    async def _send(self, symbol:str, bid:float, ask:float) -> None:
+        quote:dict = {
+            "T": "q", "S": symbol, "bp": bid, "ap": ask, "bs": 1, "as": 1, "bx": "V", "ax": "V",
+            "t": msgpack.Timestamp.from_unix_nano(time.time_ns()), "c": ["R"], "z": "C"
+        }
+        for ws in list(self._connections):
+            await ws.send(msgpack.packb([quote], datetime=False))
+
+    async def _streamPrices(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval or 0.01)
+            if self.interval:
+                for symbol in sorted(self.subscriptions):
+                    price:float = self.prices.get(symbol, 10)
+                    await self._send(symbol, price - 0.01, price + 0.01)
+
+    def push(self, symbol:str, bid:float, ask:float) -> None:
+        asyncio.run_coroutine_threadsafe(self._send(symbol, bid, ask), self._loop).result(5)
+
+    def reset(self) -> None:
+        self.interval = None
+        self.prices = {}
+
+
+class FakeTradingClient:
+
+    def __init__(self, openedPositions:dict, openSeconds:float, minutesToClose:float):
+        self.openedPositions:dict = openedPositions
+        self.closesAt:float = time.monotonic() + openSeconds
+        self.minutesToClose:float = minutesToClose
+
+    @property
+    def clock(self) -> SimpleNamespace:
+        now:datetime = datetime.now(timezone.utc)
+        return SimpleNamespace(
+            is_open=time.monotonic() < self.closesAt,
+            timestamp=now,
+            next_close=now + timedelta(minutes=self.minutesToClose)
+        )
+
+
+class FakeManager:
+    """
+        the parts of TradingManager the engine uses, the market stays open for openSeconds
+    """
+
+    def __init__(self, pairs:list[tuple], openSeconds:float=2, minutesToClose:float=120):
+        self.tradingRecord:dict[tuple, float] = {pair: 0.05 for pair in pairs}
+        self.openedPositions:dict = {symbol: SimpleNamespace(symbol=symbol) for pair in pairs for symbol in pair}
+        self.pairInfoRetriever = SimpleNamespace(
+            getCurrentlyOpenedPairs=lambda pairs, openedPositions: {pair: [] for pair in pairs}
+        )
+        self.tradingClient:FakeTradingClient = FakeTradingClient(self.openedPositions, openSeconds, minutesToClose)
+        self.clock:SimpleNamespace = None
+        # (monotonic time, checked pairs, quotes), the pairs are None for a check of all pairs over rest
+        self.checks:list[tuple] = []
+
+    def closeUnpairedLegs(self) -> bool:
+        return False
+
+    def closePositions(self, pairs:set[tuple]=None, quotes:dict=None) -> bool:
+        self.checks.append((time.monotonic(), pairs, quotes))
+        return False
+
+
+@pytest.fixture(scope="module")
+def quoteStream() -> FakeQuoteStream:
+    return FakeQuoteStream()
+
+
+@pytest.fixture
+def stream(quoteStream:FakeQuoteStream) -> FakeQuoteStream:
+    quoteStream.reset()
+    yield quoteStream
+    quoteStream.reset()
+
+
+def createEngine(stream:FakeQuoteStream, manager:FakeManager, **kwargs) -> TradingEngine:
+    auth = SimpleNamespace(api_key="key", secret_key="secret")
+    return TradingEngine.create(auth, manager, streamUrl=stream.url, **kwargs)
+
+
+def runEngine(engine:TradingEngine, timeout:float=20) -> None:
+    runner:threading.Thread = threading.Thread(target=engine.run, daemon=True)
+    runner.start()
+    runner.join(timeout)
+    assert not runner.is_alive(), "the engine did not stop once the market closed"
+
+
+def waitFor(condition, timeout:float=5) -> bool:
+    deadline:float = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_streamed_quotes_mark_their_pairs_dirty(stream:FakeQuoteStream):
+    engine:TradingEngine = createEngine(stream, FakeManager([("AAA", "BBB"), ("CCC", "DDD")]))
+    try:
+        engine._syncSubscriptions()
+        assert waitFor(lambda: stream.subscriptions == {"AAA", "BBB", "CCC", "DDD"})
+
+        stream.push("AAA", 9.99, 10.01)
+        stream.push("BBB", 19.99, 20.01)
+        # a one sided quote cannot price an exit and is dropped
+        stream.push("CCC", 0, 5.01)
+        stream.push("DDD", 4.99, 5.01)
+        assert waitFor(lambda: {"AAA", "BBB", "DDD"} <= set(engine.quotes))
+
+        pairs, quotes = engine._takeDirtyPairs()
+        assert pairs == {("AAA", "BBB")}
+        assert "CCC" not in quotes
+        assert quotes["BBB"].bid_price == 19.99
+        assert engine._takeDirtyPairs()[0] == set()
+    finally:
+        engine.stop()
+
+
+def test_exit_checks_are_batched_per_evaluation_interval(stream:FakeQuoteStream):
+    manager:FakeManager = FakeManager([("AAA", "BBB")], openSeconds=3)
+    engine:TradingEngine = createEngine(stream, manager, clockInterval=0.2, accountInterval=0.2, staleSeconds=0.5)
+    stream.interval = 0.02
+    runEngine(engine)
+
+    streamedChecks:list[float] = [checkedAt for checkedAt, pairs, _ in manager.checks if pairs is not None]
+    # quotes arrive every 20ms, the pairs are still checked at most once per 0.5s
+    assert 3 <= len(streamedChecks) <= 7
+    assert min(later - earlier for earlier, later in zip(streamedChecks, streamedChecks[1:])) >= 0.5 - 0.05
+    assert all(pairs == {("AAA", "BBB")} for _, pairs, _ in manager.checks if pairs is not None)
+    # a live stream never falls back to rest quotes
+    assert all(pairs is not None for _, pairs, _ in manager.checks)
+
+
+def test_stale_stream_falls_back_to_rest_exit_checks(stream:FakeQuoteStream):
+    manager:FakeManager = FakeManager([("AAA", "BBB")], openSeconds=2)
+    engine:TradingEngine = createEngine(stream, manager, clockInterval=0.2, accountInterval=0.2, staleSeconds=0.5)
+    # the stream connects and subscribes but never sends a quote
+    runEngine(engine)
+
+    restChecks:list[float] = [checkedAt for checkedAt, pairs, _ in manager.checks if pairs is None]
+    assert restChecks
+    assert all(pairs is None for _, pairs, _ in manager.checks)
+
+
+def test_stale_seconds_default_to_one_minute(stream:FakeQuoteStream):
+    engine:TradingEngine = createEngine(stream, FakeManager([]))
+    assert engine.staleSeconds == 60
+
+
+@pytest.mark.parametrize("minutesToClose, expectedRuns", [(10, 1), (20, 0)])
+def test_pre_close_runs_once_in_the_last_fifteen_minutes(stream:FakeQuoteStream, minutesToClose:float, expectedRuns:int):
+    runs:list[float] = []
+    manager:FakeManager = FakeManager([], openSeconds=1, minutesToClose=minutesToClose)
+    engine:TradingEngine = createEngine(stream, manager, onPreClose=lambda: runs.append(time.monotonic()), clockInterval=0.05)
+    runEngine(engine)
+    assert len(runs) == expectedRuns
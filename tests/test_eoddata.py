@@ -0,0 +1,232 @@
+from lib.dataEngine import eoddata
+from lib.dataEngine.eoddata import EodDataClient
+from lib.dataEngine.fundamentalscache import FundamentalsCache
+from lib.dataEngine.common import FundamentalsFetchReport
+from lib.patterns import RateLimiter
+from authentication.auth import EodAuth
+
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from datetime import datetime
+import threading
+import json
+import time
+
+import pytest
+
+
+class StubEodServer:
+    """
+        local stand-in for the eod fundamentals endpoint. every symbol answers with its scripted
+        status codes in order and with 200 and a small fundamentals record once they are used up
+    """
+
+    def __init__(self):
+        self.statuses:dict[str, list[int]] = {}
+        # (symbol, api token, client address, monotonic time) of every request
+        self.requests:list[tuple] = []
+        self._lock:threading.Lock = threading.Lock()
+        self.server:ThreadingHTTPServer = ThreadingHTTPServer(("127.0.0.1", 0), self._handlerClass())
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    @staticmethod
+    def fundamentals(symbol:str) -> dict:
+        return {
+            "General": {"Code": symbol, "Sector": "Technology", "Description": "dropped by the cache"},
+            "Highlights": {"MarketCapitalization": 1e9},
+            "Earnings": {"dropped": "by the cache"},
+            "Financials": {
+                "Balance_Sheet": {"quarterly": {"2026-06-30": {"totalAssets": "100"}}, "yearly": {}},
+                "Income_Statement": {"quarterly": {"2026-06-30": {"totalRevenue": "10"}}},
+                "Cash_Flow": {"quarterly": {}},
+            },
+        }
+
+    def _respond(self, symbol:str, token:str, clientAddress:tuple) -> (int, dict):
+        with self._lock:
+            self.requests.append((symbol, token, clientAddress, time.monotonic()))
+            statuses:list[int] = self.statuses.get(symbol, [])
+            status:int = statuses.pop(0) if statuses else 200
+        return status, (self.fundamentals(symbol) if status == 200 else {"error": status})
+
+    def _handlerClass(self) -> type:
+        stub:StubEodServer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # keep-alive, so a reused session shows up as one client address
+            protocol_version:str = "HTTP/1.1"
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                symbol:str = url.path.rsplit("/", 1)[-1]
+                status, payload = stub._respond(symbol, parse_qs(url.query).get("api_token", [None])[0], self.client_address)
+                body:bytes = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def requestsFor(self, symbol:str) -> int:
+        return sum(1 for requested, *_ in self.requests if requested == symbol)
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def server() -> StubEodServer:
+    stub:StubEodServer = StubEodServer()
+    yield stub
+    stub.close()
+
+
+@pytest.fixture
+def client(server:StubEodServer, tmp_path) -> EodDataClient:
+    # the client is a singleton, every test gets a fresh one pointed at the stub server and a temporary cache
+    EodDataClient._instances.pop(EodDataClient, None)
+    eodClient:EodDataClient = EodDataClient.create(EodAuth("test-key", baseUrl=server.url))
+    eodClient.fundamentalsCache = FundamentalsCache.create(rootDir=str(tmp_path / "fundamentals"))
+    yield eodClient
+    EodDataClient._instances.pop(EodDataClient, None)
+
+
+def test_bulk_fetch_accounts_for_every_symbol(client:EodDataClient, server:StubEodServer):
+    server.statuses = {
+        "RETRY": [503],
+        "THROTTLED": [429],
+        "MISSING": [404],
+        "DOWN": [500, 500, 500],
+    }
+    client.fundamentalsCache.put("CACHED", server.fundamentals("CACHED"))
+
+    results, report = client.getBulkFundamentals(
+        ["OK", "RETRY", "THROTTLED", "MISSING", "DOWN", "CACHED", "OK"], maxWorkers=4, maxRetries=2, retryDelay=0.01
+    )
+
+    assert isinstance(report, FundamentalsFetchReport)
+    assert sorted(report.fetched) == ["OK", "RETRY", "THROTTLED"]
+    assert report.cached == ["CACHED"]
+    assert sorted(report.failed) == ["DOWN", "MISSING"]
+    assert "test-key" not in report.failed["DOWN"]
+    assert sorted(results) == ["CACHED", "OK", "RETRY", "THROTTLED"]
+    assert results["OK"]["General"]["Code"] == "OK"
+
+    # server errors and throttling are retried, other client errors are not, fresh cache entries are not requested
+    assert server.requestsFor("OK") == 1
+    assert server.requestsFor("RETRY") == 2
+    assert server.requestsFor("THROTTLED") == 2
+    assert server.requestsFor("MISSING") == 1
+    assert server.requestsFor("DOWN") == 3
+    assert server.requestsFor("CACHED") == 0
+    assert {token for _, token, _, _ in server.requests} == {"test-key"}
+
+
+def test_bulk_fetch_writes_fetched_records_to_the_cache(client:EodDataClient, server:StubEodServer):
+    client.getBulkFundamentals(["AAA", "BBB"], maxWorkers=2)
+    _, report = client.getBulkFundamentals(["AAA", "BBB"], maxWorkers=2)
+
+    assert sorted(report.cached) == ["AAA", "BBB"]
+    assert len(server.requests) == 2
+    # only the sections the firm characteristics read are kept
+    cached:dict = client.fundamentalsCache.get("AAA")
+    assert "Earnings" not in cached and "Description" not in cached["General"]
+    assert "yearly" not in cached["Financials"]["Balance_Sheet"]
+
+
+def test_workers_reuse_their_sessions(client:EodDataClient, server:StubEodServer):
+    symbols:list[str] = [f"S{i:02d}" for i in range(24)]
+    _, report = client.getBulkFundamentals(symbols, maxWorkers=3)
+
+    assert sorted(report.fetched) == symbols
+    # every worker thread keeps one keep-alive connection, so at most one client address per worker
+    assert len({clientAddress for _, _, clientAddress, _ in server.requests}) <= 3
+
+
+def test_session_is_kept_per_thread(client:EodDataClient):
+    sessions:list = []
+    worker:threading.Thread = threading.Thread(target=lambda: sessions.append(client._getSession()))
+    worker.start()
+    worker.join()
+
+    assert client._getSession() is client._getSession()
+    assert sessions[0] is not client._getSession()
+
+
+def test_bulk_fetch_is_paced_by_the_request_budget(client:EodDataClient, server:StubEodServer, monkeypatch):
+    # the budget is given per minute, a half second window keeps the test short
+    monkeypatch.setattr(eoddata.RateLimiter, "create", classmethod(lambda cls, maxCalls, period=60: cls(maxCalls, 0.5)))
+    started:float = time.monotonic()
+    _, report = client.getBulkFundamentals([f"S{i:02d}" for i in range(12)], maxWorkers=6, requestsPerMinute=4)
+
+    assert len(report.fetched) == 12
+    times:list[float] = sorted(requestedAt for *_, requestedAt in server.requests)
+    # 12 requests at 4 per window need three windows, and no window holds more than 4 request starts
+    assert time.monotonic() - started >= 1.0 - 0.05
+    assert all(later - earlier >= 0.5 - 0.05 for earlier, later in zip(times, times[4:]))
+
+
+def test_rate_limiter_keeps_every_window_within_the_budget():
+    limiter:RateLimiter = RateLimiter.create(3, 0.3)
+    times:list[float] = []
+    for _ in range(9):
+        limiter.acquire()
+        times.append(time.monotonic())
+
+    assert times[-1] - times[0] >= 0.6 - 0.02
+    assert all(later - earlier >= 0.3 - 0.02 for earlier, later in zip(times, times[3:]))
+
+
+def test_rate_limiter_rejects_an_empty_budget():
+    with pytest.raises(ValueError):
+        RateLimiter.create(0, 60)
+
+
+@pytest.fixture
+def cache(tmp_path) -> FundamentalsCache:
+    return FundamentalsCache.create(rootDir=str(tmp_path / "fundamentals"), ttlDays=7, filingLagDays=45, recheckDays=1)
+
+
+def test_cache_entry_expires_after_its_ttl(cache:FundamentalsCache):
+    # no statement yet, only the ttl applies
+    cache.put("AAA", {"General": {"Code": "AAA"}}, now=datetime(2026, 10, 1))
+
+    assert cache.get("AAA", now=datetime(2026, 10, 7, 23)) is not None
+    assert cache.get("AAA", now=datetime(2026, 10, 8)) is None
+    assert cache.get("BBB", now=datetime(2026, 10, 1)) is None
+
+
+def test_cache_entry_is_refreshed_once_the_next_quarter_is_due(cache:FundamentalsCache):
+    # the quarter ending 2026-06-30 is followed by the one ending 2026-09-30, due 45 days later on 2026-11-14
+    cache.put("AAA", StubEodServer.fundamentals("AAA"), now=datetime(2026, 11, 10))
+
+    assert cache.get("AAA", now=datetime(2026, 11, 13)) is not None
+    assert cache.get("AAA", now=datetime(2026, 11, 14, 12)) is None
+
+
+def test_overdue_quarter_is_rechecked_once_per_interval(cache:FundamentalsCache):
+    # fetched after the next quarter was due but before it was filed
+    cache.put("AAA", StubEodServer.fundamentals("AAA"), now=datetime(2026, 11, 15))
+
+    assert cache.get("AAA", now=datetime(2026, 11, 15, 20)) is not None
+    assert cache.get("AAA", now=datetime(2026, 11, 16)) is None
+
+
+def test_get_fundamentals_serves_the_cache_until_forced(client:EodDataClient, server:StubEodServer):
+    client.getFundamentals("AAA")
+    client.getFundamentals("AAA")
+    assert server.requestsFor("AAA") == 1
+
+    client.getFundamentals("AAA", forceRefresh=True)
+    assert server.requestsFor("AAA") == 2
@@ -5,21 +5,24 @@ from lib.dataEngine.eoddata import EodDataClient
 from authentication.authLoader import getAuth
 from authentication.base import BaseAuth
 
-from PairTrading.training import Clustering
+from PairTrading.training import Clustering, ClusterModel
 from PairTrading.pairs.createpairs import PairCreator
 from PairTrading.util.write import writeToJson
 from PairTrading.util.clean import cleanClosedTrades
 
 
 import json
-from pandas import DataFrame, read_csv
+import logging
+import os
+from pandas import DataFrame, read_csv, concat
 from datetime import date 
 import warnings
 import numpy as np
 
 warnings.filterwarnings("ignore")
+logger = logging.getLogger(__name__)
 
-def getTrainAssign(alpacaAuth, eodAuth:BaseAuth, useExistingFile:bool=True) -> None:
+def getTrainAssign(alpacaAuth, eodAuth:BaseAuth, useExistingFile:bool=True, ioWorkers:int=1, cpuWorkers:int=1, eodRequestsPerMinute:int=600, clusteringMode:str="exact", pcaSolver:str="full", pcaMaxComponents:int=None) -> None:
     
     # create trading and data clients
     dataClient:AlpacaDataClient = AlpacaDataClient.create(alpacaAuth)
@@ -27,19 +30,63 @@ def getTrainAssign(alpacaAuth, eodAuth:BaseAuth, useExistingFile:bool=True) -> N
     stockList:list = tradingClient.getViableStocks()
 
     # generate technical and fundamental features
-    generator:FeatureGenerator = FeatureGenerator.create(alpacaAuth, eodAuth, stockList)
+    generator:FeatureGenerator = FeatureGenerator.create(alpacaAuth, eodAuth, stockList, ioWorkers, cpuWorkers, eodRequestsPerMinute=eodRequestsPerMinute)
     trainingData:DataFrame = generator.getFeatureData(
         useExistingFiles=useExistingFile,
-        writeToFile=True,
         cleanOldData=True
     )
     trainingData.to_csv("saveddata/training.csv")
-    trainingData = read_csv("saveddata/training.csv", index_col=0)
+    # the incremental pca streams the written matrix from disk instead of standardizing it in memory
+    trainingData = "saveddata/training.csv" if pcaSolver == "incremental" else read_csv("saveddata/training.csv", index_col=0)
     
-    # find clusters using agglomerative clustering
-    ac = Clustering(trainingData)  
+    # find clusters using agglomerative clustering, the sparse mode scales past the dense distance matrix
+    ac = Clustering(trainingData, mode=clusteringMode, pcaSolver=pcaSolver, maxComponents=pcaMaxComponents)  
     clusters:DataFrame = ac.run()
     clusters.to_csv("saveddata/cluster.csv")
+    # the fitted scaler, pca and centroids let later runs assign stocks without reclustering,
+    # measuring idiovol against the training universe's market
+    ac.model.marketReturns = generator.marketReturns
+    ac.model.unassignable = set(stockList) - set(clusters.index)
+    ac.model.save("saveddata/cluster_model.joblib")
+
+
+def assignNewStocks(alpacaAuth, eodAuth:BaseAuth, ioWorkers:int=1, cpuWorkers:int=1, eodRequestsPerMinute:int=600, changedStocks:list=None) -> None:
+    """
+        attaches viable stocks that are missing from cluster.csv (and the given changed stocks) to the
+        nearest cluster of the last training run, the clusters themselves stay as they are. stocks that
+        lacked features at the training or at an assignment since are skipped until the next training
+    """
+    if not os.path.exists("saveddata/cluster_model.joblib"):
+        logger.info("no fitted cluster model found, new stocks are assigned at the next training")
+        return
+    model:ClusterModel = ClusterModel.load("saveddata/cluster_model.joblib")
+    clusters:DataFrame = read_csv("saveddata/cluster.csv", index_col=0)
+    
+    tradingClient:AlpacaTradingClient = AlpacaTradingClient.create(alpacaAuth)
+    stockList:list = [
+        stock for stock in tradingClient.getViableStocks() if stock not in clusters.index and stock not in model.unassignable
+    ]
+    stockList = list(dict.fromkeys(stockList + list(changedStocks or [])))
+    if not stockList:
+        return
+    
+    generator:FeatureGenerator = FeatureGenerator.create(alpacaAuth, eodAuth, stockList, ioWorkers, cpuWorkers, eodRequestsPerMinute=eodRequestsPerMinute)
+    if model.marketReturns is None:
+        logger.warning("the cluster model has no training market returns, idiovol of new stocks is measured against themselves")
+    featureData:DataFrame = generator.getFeatureData(useExistingFiles=True, marketReturns=model.marketReturns)
+    skipped:list = [stock for stock in stockList if stock not in featureData.index]
+    if skipped:
+        logger.info(f"{len(skipped)} stocks lack 4 years of bars or fundamentals and stay unassigned until the next training: {skipped}")
+        model.unassignable.update(skipped)
+        model.save("saveddata/cluster_model.joblib")
+    if featureData.empty:
+        return
+    
+    # singletons of earlier assignments are only recorded in cluster.csv, new ids continue after them
+    assigned:DataFrame = model.assign(featureData, nextId=int(clusters["cluster_id"].max()) + 1 if not clusters.empty else None)
+    clusters = concat([clusters.drop(index=assigned.index, errors="ignore"), assigned])
+    clusters.to_csv("saveddata/cluster.csv")
+    logger.info(f"{len(assigned)} stocks assigned to existing clusters")
     
 
     